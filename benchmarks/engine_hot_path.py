@@ -0,0 +1,226 @@
+"""Engine hot-path benchmarks over synthetic houses.
+
+Run from the repository root:
+
+    python -m benchmarks.engine_hot_path --output bench_output.json
+
+Results are JSON so scaling regressions can be diffed between releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from .synthetic_house import DEFAULT_SIZES, HouseSize, SyntheticHouse, build_house
+
+SCHEMA_VERSION = 1
+
+
+def _summarize(name: str, size: HouseSize, durations_s: list[float], alloc: dict[str, float]) -> dict[str, Any]:
+    ordered = sorted(durations_s)
+    mean_s = statistics.fmean(ordered)
+    return {
+        "benchmark": name,
+        "size": {"rooms": size.rooms, "people": size.people, "zones": size.zones},
+        "iterations": len(ordered),
+        "ops_per_s": round(1 / mean_s, 2) if mean_s > 0 else None,
+        "mean_ms": round(mean_s * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        **alloc,
+    }
+
+
+def _measure_allocations(step: Callable[[], Any], iterations: int) -> dict[str, float]:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(iterations):
+            step()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kib": round((peak - before) / 1024, 2),
+        "alloc_retained_kib_per_op": round((after - before) / 1024 / iterations, 3),
+    }
+
+
+def _time(step: Callable[[], Any], iterations: int) -> list[float]:
+    durations: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        step()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def _run_sync(name: str, house: SyntheticHouse, step: Callable[[], Any], iterations: int) -> dict[str, Any]:
+    step()  # warm up caches and first-evaluation state
+    durations = _time(step, iterations)
+    alloc = _measure_allocations(step, max(1, iterations // 5))
+    return _summarize(name, house.size, durations, alloc)
+
+
+def bench_compute_snapshot_full(house: SyntheticHouse, iterations: int) -> dict[str, Any]:
+    engine = house.engine
+
+    def step() -> None:
+        house.flip_random_room_source()
+        engine._snapshot = engine._compute_snapshot(reason="bench")
+
+    return _run_sync("compute_snapshot_full", house, step, iterations)
+
+
+def bench_compute_snapshot_incremental(house: SyntheticHouse, iterations: int) -> dict[str, Any]:
+    engine = house.engine
+
+    def step() -> None:
+        entity_id = house.flip_random_room_source()
+        engine._snapshot = engine._compute_snapshot(reason="bench", changed_entity_ids={entity_id})
+
+    return _run_sync("compute_snapshot_incremental", house, step, iterations)
+
+
+def bench_build_apply_plan(house: SyntheticHouse, iterations: int) -> dict[str, Any]:
+    engine = house.engine
+    engine._snapshot = engine._compute_snapshot(reason="bench")
+
+    def step() -> None:
+        engine._build_apply_plan(engine._snapshot)
+
+    return _run_sync("build_apply_plan", house, step, iterations)
+
+
+def bench_async_evaluate(house: SyntheticHouse, iterations: int) -> dict[str, Any]:
+    engine = house.engine
+    loop = asyncio.new_event_loop()
+
+    def run(coro: Awaitable[Any]) -> Any:
+        return loop.run_until_complete(coro)
+
+    def step() -> None:
+        entity_id = house.flip_random_room_source()
+        run(
+            engine.async_evaluate(
+                f"state_changed:{entity_id}",
+                changed_entity_ids={entity_id},
+                skip_if_unchanged=True,
+            )
+        )
+
+    try:
+        return _run_sync("async_evaluate", house, step, iterations)
+    finally:
+        loop.close()
+
+
+def bench_normalize_sources(house: SyntheticHouse, iterations: int) -> dict[str, Any]:
+    """Build fresh observations for every source entity, bypassing the memo."""
+    normalizer = house.engine._normalizer
+    entity_ids = [entity_id for entity_id in house.states.entity_ids() if entity_id.startswith("binary_sensor.")]
+
+    def step() -> None:
+        observations = []
+        for entity_id in entity_ids:
+            observations.append(
+                normalizer._truthy_observation("presence", entity_id, house.states.get(entity_id).state)
+            )
+        normalizer.derive(kind="presence", inputs=observations, strategy_cfg={"plugin_id": "builtin.any_of"})
+
+    return _run_sync("normalize_sources", house, step, iterations)
+
+
+def bench_trace_overhead(house: SyntheticHouse, iterations: int) -> dict[str, Any]:
+    """Full snapshot with lazy traces (``trace_mode: off``) against eager traces (``full``)."""
+    results: dict[str, dict[str, Any]] = {}
+    for mode in ("full", "off"):
+        traced = build_house(house.size, trace_mode=mode)
+        engine = traced.engine
+
+        def step(traced: SyntheticHouse = traced, engine: Any = engine) -> None:
+            traced.flip_random_room_source()
+            engine._snapshot = engine._compute_snapshot(reason="bench")
+
+        results[mode] = _run_sync("trace_overhead", traced, step, iterations)
+    lazy, eager = results["off"], results["full"]
+    return {
+        **lazy,
+        "full_trace_mean_ms": eager["mean_ms"],
+        "full_trace_alloc_peak_kib": eager["alloc_peak_kib"],
+        "alloc_peak_saved_kib": round(eager["alloc_peak_kib"] - lazy["alloc_peak_kib"], 2),
+        "mean_ms_saved": round(eager["mean_ms"] - lazy["mean_ms"], 4),
+    }
+
+
+BENCHMARKS: dict[str, Callable[[SyntheticHouse, int], dict[str, Any]]] = {
+    "compute_snapshot_full": bench_compute_snapshot_full,
+    "compute_snapshot_incremental": bench_compute_snapshot_incremental,
+    "build_apply_plan": bench_build_apply_plan,
+    "async_evaluate": bench_async_evaluate,
+    "normalize_sources": bench_normalize_sources,
+    "trace_overhead": bench_trace_overhead,
+}
+
+
+def run_benchmarks(
+    sizes: list[HouseSize],
+    *,
+    iterations: int,
+    names: list[str] | None = None,
+) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    for size in sizes:
+        for name in names or list(BENCHMARKS):
+            # A fresh house per benchmark keeps engine caches from leaking across runs.
+            results.append(BENCHMARKS[name](build_house(size), iterations))
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def _parse_sizes(raw: str | None) -> list[HouseSize]:
+    if not raw:
+        return list(DEFAULT_SIZES)
+    sizes: list[HouseSize] = []
+    for item in raw.split(","):
+        rooms = int(item)
+        sizes.append(HouseSize(rooms=rooms, people=max(1, rooms // 50), zones=max(1, rooms // 10)))
+    return sizes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", help="comma-separated room counts (default: 5,25,100,500)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS))
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(_parse_sizes(args.rooms), iterations=args.iterations, names=args.benchmark)
+    payload = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+"""Replay a recorded Heima traffic log through a fresh engine under a virtual clock.
+
+Record on a live instance with ``heima.command`` / ``start_recording``, then:
+
+    python -m benchmarks.replay <recording.jsonl.gz> [--output report.json]
+
+The engine's own timed rechecks fire at their virtual deadlines. The log is
+replayed as fast as possible, and the decision digest allows behaviour to be
+compared between engine versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Iterable
+
+from custom_components.heima.runtime.clock import VirtualClock
+from custom_components.heima.runtime.engine import HeimaEngine
+from custom_components.heima.runtime.traffic_recorder import (
+    RECORD_JOB,
+    RECORD_REQUEST,
+    RECORD_STATE,
+    read_traffic_log,
+)
+
+from .synthetic_house import FakeStates, _FakeBus, _FakeServices
+
+
+@dataclass
+class ReplayReport:
+    records: int = 0
+    state_changes: int = 0
+    requests: int = 0
+    recorded_scheduler_firings: int = 0
+    engine_scheduler_firings: int = 0
+    evaluations: int = 0
+    skipped_evaluations: int = 0
+    decisions: int = 0
+    apply_steps: int = 0
+    service_calls: int = 0
+    virtual_span_s: float = 0.0
+    wall_s: float = 0.0
+    final_house_state: str = "unknown"
+    _digest: Any = field(default_factory=hashlib.sha256, repr=False)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "records": self.records,
+            "state_changes": self.state_changes,
+            "requests": self.requests,
+            "recorded_scheduler_firings": self.recorded_scheduler_firings,
+            "engine_scheduler_firings": self.engine_scheduler_firings,
+            "evaluations": self.evaluations,
+            "skipped_evaluations": self.skipped_evaluations,
+            "evaluations_per_s": round(self.evaluations / self.wall_s, 2) if self.wall_s else None,
+            "decisions": self.decisions,
+            "decision_digest": self._digest.hexdigest(),
+            "apply_steps": self.apply_steps,
+            "service_calls": self.service_calls,
+            "virtual_span_s": round(self.virtual_span_s, 3),
+            "wall_s": round(self.wall_s, 4),
+            "speedup": round(self.virtual_span_s / self.wall_s, 1) if self.wall_s else None,
+            "final_house_state": self.final_house_state,
+        }
+
+
+class _Replayer:
+    def __init__(self, header: dict[str, Any], clock: VirtualClock) -> None:
+        self.clock = clock
+        self.states = FakeStates()
+        for entity_id, payload in dict(header.get("states", {})).items():
+            if payload is not None:
+                self.states.set(entity_id, payload[0], payload[1])
+        self.services = _FakeServices()
+        hass = SimpleNamespace(states=self.states, services=self.services, bus=_FakeBus())
+        self.engine = HeimaEngine(
+            hass=hass,
+            entry=SimpleNamespace(entry_id=header.get("entry_id", "replay"), options=header["options"]),
+            clock=clock,
+        )
+        self.report = ReplayReport()
+        self._header_inputs = dict(header.get("external_inputs", {}))
+        self._epoch = clock.monotonic()
+        self._loop = asyncio.new_event_loop()
+        self._last_decision: tuple[Any, ...] | None = None
+        self._last_plan_id: str | None = None
+
+    def close(self) -> None:
+        self._loop.close()
+
+    def start(self) -> None:
+        self.engine._build_default_state()
+        self.engine.restore_external_inputs(self._header_inputs)
+        self._evaluate("initialize")
+
+    def _evaluate(self, reason: str, **kwargs: Any) -> None:
+        snapshot = self._loop.run_until_complete(self.engine.async_evaluate(reason, **kwargs))
+        self.report.evaluations += 1
+        plan = self.engine._apply_plan
+        if plan.plan_id != self._last_plan_id:
+            self._last_plan_id = plan.plan_id
+            self.report.apply_steps += len(plan.steps)
+        decision = (
+            snapshot.house_state,
+            snapshot.anyone_home,
+            snapshot.people_count,
+            tuple(snapshot.occupied_rooms),
+            tuple(sorted(snapshot.lighting_intents.items())),
+            snapshot.security_state,
+        )
+        if decision != self._last_decision:
+            self._last_decision = decision
+            self.report.decisions += 1
+            self.report._digest.update(repr((round(self.clock.elapsed_s, 3), decision)).encode())
+
+    def fire_due_jobs(self, until: float) -> None:
+        """Fire engine rechecks whose deadline falls before ``until``, in deadline order."""
+        while True:
+            jobs = self.engine.scheduled_runtime_jobs()
+            if not jobs:
+                return
+            job = min(jobs.values(), key=lambda item: item.due_monotonic)
+            if job.due_monotonic > until:
+                return
+            self.clock.advance_to(job.due_monotonic)
+            self.report.engine_scheduler_firings += 1
+            self._evaluate(f"scheduler:{job.job_id}", skip_if_unchanged=True)
+
+    def apply(self, record: list[Any]) -> None:
+        kind, offset = record[0], float(record[1])
+        target = self._epoch + offset
+        self.fire_due_jobs(target)
+        self.clock.advance_to(target)
+        self.report.records += 1
+        if kind == RECORD_STATE:
+            _, _, entity_id, state, attributes = record
+            self.report.state_changes += 1
+            if state is None:
+                self.states.remove(entity_id)
+            else:
+                self.states.set(entity_id, state, attributes)
+            self._evaluate(
+                f"state_changed:{entity_id}",
+                changed_entity_ids={entity_id},
+                skip_if_unchanged=True,
+            )
+        elif kind == RECORD_REQUEST:
+            _, _, reason, inputs = record
+            self.report.requests += 1
+            self.engine.restore_external_inputs(inputs)
+            self._evaluate(reason)
+        elif kind == RECORD_JOB:
+            # Timed rechecks are driven by the replayed engine's own schedule.
+            self.report.recorded_scheduler_firings += 1
+
+
+def replay_records(header: dict[str, Any], records: Iterable[list[Any]]) -> ReplayReport:
+    clock = VirtualClock()
+    replayer = _Replayer(header, clock)
+    started = time.perf_counter()
+    try:
+        replayer.start()
+        for record in records:
+            replayer.apply(record)
+        replayer.fire_due_jobs(clock.monotonic())
+    finally:
+        replayer.close()
+    report = replayer.report
+    report.wall_s = time.perf_counter() - started
+    report.virtual_span_s = clock.elapsed_s
+    report.service_calls = replayer.services.calls
+    report.final_house_state = replayer.engine.snapshot.house_state
+    report.skipped_evaluations = replayer.engine.diagnostics()["fingerprint"]["hits"]
+    return report
+
+
+def replay_file(path: str) -> ReplayReport:
+    header, records = read_traffic_log(path)
+    return replay_records(header, records)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="path to a .jsonl.gz recording")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    payload = json.dumps(replay_file(args.recording).as_dict(), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+"""Synthetic house generator for engine benchmarks (no live Home Assistant needed)."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any
+
+from custom_components.heima.runtime.clock import Clock
+from custom_components.heima.runtime.engine import HeimaEngine
+
+SOURCES_PER_ROOM = 2
+
+
+@dataclass(frozen=True)
+class HouseSize:
+    """Shape of a generated house."""
+
+    rooms: int
+    people: int
+    zones: int
+
+    @property
+    def label(self) -> str:
+        return f"rooms={self.rooms},people={self.people},zones={self.zones}"
+
+
+DEFAULT_SIZES = (
+    HouseSize(rooms=5, people=2, zones=2),
+    HouseSize(rooms=25, people=4, zones=5),
+    HouseSize(rooms=100, people=6, zones=20),
+    HouseSize(rooms=500, people=10, zones=50),
+)
+
+
+class FakeStates:
+    """Minimal ``hass.states`` registry."""
+
+    def __init__(self, values: dict[str, tuple[str, dict[str, Any]]] | None = None) -> None:
+        self._values = dict(values or {})
+
+    def get(self, entity_id: str):
+        value = self._values.get(entity_id)
+        if value is None:
+            return None
+        state, attributes = value
+        return SimpleNamespace(state=state, attributes=attributes)
+
+    def set(self, entity_id: str, state: str, attributes: dict[str, Any] | None = None) -> None:
+        self._values[entity_id] = (state, dict(attributes or {}))
+
+    def remove(self, entity_id: str) -> None:
+        self._values.pop(entity_id, None)
+
+    def entity_ids(self) -> list[str]:
+        return list(self._values)
+
+
+class _FakeServices:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def has_service(self, domain, service):
+        return False
+
+    async def async_call(self, domain, service, data, blocking=False):
+        self.calls += 1
+        return None
+
+
+class _FakeBus:
+    def async_fire(self, event_type, data):
+        return None
+
+
+def room_source_ids(room_index: int) -> list[str]:
+    return [f"binary_sensor.room_{room_index}_motion_{n}" for n in range(SOURCES_PER_ROOM)]
+
+
+def build_options(size: HouseSize, *, trace_mode: str = "off") -> dict[str, Any]:
+    """Build ``entry.options`` for a house of the given size."""
+    rooms = []
+    lighting_rooms = []
+    for index in range(size.rooms):
+        room_id = f"room_{index}"
+        rooms.append(
+            {
+                "room_id": room_id,
+                "area_id": room_id,
+                "occupancy_mode": "derived",
+                "sources": room_source_ids(index),
+                "logic": "any_of",
+                "on_dwell_s": 0,
+                "off_dwell_s": 0,
+            }
+        )
+        lighting_rooms.append(
+            {
+                "room_id": room_id,
+                "scene_evening": f"scene.{room_id}_evening",
+                "scene_relax": f"scene.{room_id}_relax",
+                "scene_night": f"scene.{room_id}_night",
+                "enable_manual_hold": True,
+            }
+        )
+
+    zones = [
+        {
+            "zone_id": f"zone_{zone}",
+            "rooms": [f"room_{index}" for index in range(zone, size.rooms, max(1, size.zones))],
+        }
+        for zone in range(size.zones)
+    ]
+
+    people = [
+        {
+            "slug": f"person_{index}",
+            "presence_method": "quorum",
+            "sources": [f"device_tracker.person_{index}_phone", f"binary_sensor.person_{index}_ble"],
+            "required": 1,
+        }
+        for index in range(size.people)
+    ]
+
+    return {
+        "engine_enabled": True,
+        "lighting_apply_mode": "scene",
+        "trace_mode": trace_mode,
+        "people_named": people,
+        "people_anonymous": {
+            "enabled": True,
+            "sources": ["binary_sensor.anonymous_presence"],
+            "required": 1,
+        },
+        "rooms": rooms,
+        "lighting_rooms": lighting_rooms,
+        "lighting_zones": zones,
+        "house_signals": {
+            "vacation_mode": "input_boolean.vacation",
+            "guest_mode": "input_boolean.guest",
+            "sleep_window": "binary_sensor.sleep_window",
+        },
+        "heating": {
+            "climate_entity": "climate.house",
+            "apply_mode": "set_temperature",
+            "temperature_step": 0.5,
+            "manual_override_guard": True,
+            "outdoor_temperature_entity": "sensor.outdoor_temperature",
+            "override_branches": {
+                "away": {"branch": "fixed_target", "target_temperature": 17.0},
+            },
+        },
+        "security": {
+            "enabled": True,
+            "security_state_entity": "alarm_control_panel.house",
+        },
+        "notifications": {"routes": [], "dedup_window_s": 60, "rate_limit_per_key_s": 300},
+    }
+
+
+def build_states(size: HouseSize, *, seed: int = 0) -> FakeStates:
+    """Populate every entity referenced by ``build_options`` with plausible states."""
+    rng = random.Random(seed)
+    states = FakeStates()
+    for index in range(size.rooms):
+        for entity_id in room_source_ids(index):
+            states.set(entity_id, "on" if rng.random() < 0.2 else "off")
+        for scene in ("evening", "relax", "night"):
+            states.set(f"scene.room_{index}_{scene}", "scening")
+    for index in range(size.people):
+        states.set(f"device_tracker.person_{index}_phone", "home" if rng.random() < 0.6 else "not_home")
+        states.set(f"binary_sensor.person_{index}_ble", "off")
+    states.set("binary_sensor.anonymous_presence", "off")
+    states.set("input_boolean.vacation", "off")
+    states.set("input_boolean.guest", "off")
+    states.set("binary_sensor.sleep_window", "off")
+    states.set("climate.house", "heat", {"temperature": 19.0, "preset_mode": "none"})
+    states.set("sensor.outdoor_temperature", "8.5")
+    states.set("alarm_control_panel.house", "disarmed")
+    return states
+
+
+@dataclass
+class SyntheticHouse:
+    """A generated engine wired to fake states."""
+
+    size: HouseSize
+    states: FakeStates
+    engine: HeimaEngine
+    rng: random.Random = field(default_factory=lambda: random.Random(1))
+
+    def flip_random_room_source(self) -> str:
+        """Toggle one room motion source; return its entity id."""
+        index = self.rng.randrange(self.size.rooms)
+        entity_id = room_source_ids(index)[0]
+        current = self.states.get(entity_id)
+        self.states.set(entity_id, "off" if current and current.state == "on" else "on")
+        return entity_id
+
+
+def build_house(
+    size: HouseSize,
+    *,
+    seed: int = 0,
+    trace_mode: str = "off",
+    clock: Clock | None = None,
+) -> SyntheticHouse:
+    states = build_states(size, seed=seed)
+    hass = SimpleNamespace(states=states, services=_FakeServices(), bus=_FakeBus())
+    engine = HeimaEngine(
+        hass=hass,
+        entry=SimpleNamespace(entry_id="bench", options=build_options(size, trace_mode=trace_mode)),
+        clock=clock,
+    )
+    engine._build_default_state()
+    return SyntheticHouse(size=size, states=states, engine=engine)
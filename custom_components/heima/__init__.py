@@ -6,9 +6,10 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, PLATFORMS
+from .const import DEFERRED_NOTIFICATIONS_STORAGE_VERSION, DOMAIN, PLATFORMS
 from .coordinator import HeimaCoordinator
 from .services import async_register_services
 
@@ -61,3 +62,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             coordinator: HeimaCoordinator = data["coordinator"]
             await coordinator.async_shutdown()
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored deferred notifications of a deleted config entry."""
+    await Store(
+        hass,
+        DEFERRED_NOTIFICATIONS_STORAGE_VERSION,
+        f"{DOMAIN}.{entry.entry_id}.deferred_notifications",
+    ).async_remove()
@@ -19,19 +19,35 @@ import logging
 
 from .const import (
     CONF_ENGINE_ENABLED,
+    CONF_ENGINE_LATENCY_SENSOR,
+    CONF_EVALUATION_DEBOUNCE_MS,
     CONF_LANGUAGE,
     CONF_TIMEZONE,
+    CONF_TRACE_MODE,
+    CONF_TRACE_SAMPLE_EVERY,
+    DEFAULT_DEFERRED_DELIVERY_CAPACITY,
+    DEFAULT_DEFERRED_DELIVERY_TTL_S,
     DEFAULT_ENGINE_ENABLED,
     DEFAULT_ENABLED_EVENT_CATEGORIES,
+    DEFAULT_ENGINE_LATENCY_SENSOR,
+    DEFAULT_EVALUATION_DEBOUNCE_MS,
     DEFAULT_OCCUPANCY_MISMATCH_MIN_DERIVED_ROOMS,
     DEFAULT_OCCUPANCY_MISMATCH_PERSIST_S,
     DEFAULT_OCCUPANCY_MISMATCH_POLICY,
     DEFAULT_SECURITY_MISMATCH_PERSIST_S,
     DEFAULT_SECURITY_MISMATCH_POLICY,
     DEFAULT_LIGHTING_APPLY_MODE,
+    DEFAULT_NOTIFICATION_DIGEST_BYPASS_SEVERITY,
+    DEFAULT_NOTIFICATION_DIGEST_MODE,
+    DEFAULT_NOTIFICATION_DIGEST_WINDOW_S,
+    DEFAULT_TRACE_MODE,
+    DEFAULT_TRACE_SAMPLE_EVERY,
     DOMAIN,
     HOUSE_SIGNAL_NAMES,
+    EVENT_CATEGORIES_ALL,
     EVENT_CATEGORIES_TOGGLEABLE,
+    NOTIFICATION_DIGEST_BYPASS_SEVERITIES,
+    NOTIFICATION_DIGEST_MODES,
     OCCUPANCY_MISMATCH_POLICIES,
     SECURITY_MISMATCH_POLICIES,
     OPT_HEATING,
@@ -44,6 +60,7 @@ from .const import (
     OPT_PEOPLE_NAMED,
     OPT_ROOMS,
     OPT_SECURITY,
+    TRACE_MODES,
 )
 from .runtime.normalization.config import (
     GROUP_PRESENCE_STRATEGY_CONTRACT,
@@ -362,6 +379,7 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
         data["recipients"] = _parse_multiline_mapping(data.get("recipients"))
         data["recipient_groups"] = _parse_multiline_mapping(data.get("recipient_groups"))
         data["route_targets"] = _parse_multiline_items(data.get("route_targets"))
+        data["category_route_targets"] = _parse_multiline_mapping(data.get("category_route_targets"))
         recipient_ids = set(data["recipients"])
         normalized_groups: dict[str, list[str]] = {}
         for group_id, members in data["recipient_groups"].items():
@@ -374,6 +392,14 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
             for target in data["route_targets"]
             if target in recipient_ids or target in normalized_groups
         ]
+        normalized_category_targets: dict[str, list[str]] = {}
+        for category, targets in data["category_route_targets"].items():
+            if category not in EVENT_CATEGORIES_ALL:
+                continue
+            normalized_category_targets[category] = [
+                target for target in targets if target in recipient_ids or target in normalized_groups
+            ]
+        data["category_route_targets"] = normalized_category_targets
         categories_present = "enabled_event_categories" in data
         categories = self._normalize_multi_value(data.get("enabled_event_categories"))
         if categories_present:
@@ -508,6 +534,16 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
         self.options[OPT_LIGHTING_APPLY_MODE] = user_input.get(
             OPT_LIGHTING_APPLY_MODE, DEFAULT_LIGHTING_APPLY_MODE
         )
+        self.options[CONF_EVALUATION_DEBOUNCE_MS] = int(
+            user_input.get(CONF_EVALUATION_DEBOUNCE_MS, DEFAULT_EVALUATION_DEBOUNCE_MS)
+        )
+        self.options[CONF_ENGINE_LATENCY_SENSOR] = bool(
+            user_input.get(CONF_ENGINE_LATENCY_SENSOR, DEFAULT_ENGINE_LATENCY_SENSOR)
+        )
+        self.options[CONF_TRACE_MODE] = user_input.get(CONF_TRACE_MODE, DEFAULT_TRACE_MODE)
+        self.options[CONF_TRACE_SAMPLE_EVERY] = int(
+            user_input.get(CONF_TRACE_SAMPLE_EVERY, DEFAULT_TRACE_SAMPLE_EVERY)
+        )
         self.options[OPT_HOUSE_SIGNALS] = self._normalize_general_house_signals(user_input)
         return await self.async_step_people_menu()
 
@@ -531,6 +567,26 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
                     OPT_LIGHTING_APPLY_MODE, DEFAULT_LIGHTING_APPLY_MODE
                 ),
             ): vol.In(LIGHTING_APPLY_MODES),
+            vol.Optional(
+                CONF_EVALUATION_DEBOUNCE_MS,
+                default=self.options.get(
+                    CONF_EVALUATION_DEBOUNCE_MS, DEFAULT_EVALUATION_DEBOUNCE_MS
+                ),
+            ): _NON_NEGATIVE_INT,
+            vol.Optional(
+                CONF_ENGINE_LATENCY_SENSOR,
+                default=self.options.get(
+                    CONF_ENGINE_LATENCY_SENSOR, DEFAULT_ENGINE_LATENCY_SENSOR
+                ),
+            ): bool,
+            vol.Optional(
+                CONF_TRACE_MODE,
+                default=self.options.get(CONF_TRACE_MODE, DEFAULT_TRACE_MODE),
+            ): vol.In(TRACE_MODES),
+            vol.Optional(
+                CONF_TRACE_SAMPLE_EVERY,
+                default=self.options.get(CONF_TRACE_SAMPLE_EVERY, DEFAULT_TRACE_SAMPLE_EVERY),
+            ): cv.positive_int,
         }
         house_signals = self._house_signal_bindings()
         for signal_name, label_key in (
@@ -718,6 +774,8 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
                 cv.positive_int,
                 vol.Optional("leave_hold_s", default=defaults.get("leave_hold_s", 120)):
                 cv.positive_int,
+                vol.Optional("source_stale_s", default=defaults.get("source_stale_s")):
+                vol.Any(None, cv.positive_int),
                 vol.Optional("enable_override", default=defaults.get("enable_override", False)): bool,
             }
         )
@@ -933,6 +991,8 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional("off_dwell_s", default=defaults.get("off_dwell_s", 120)): cv.positive_int,
                 vol.Optional("max_on_s", default=defaults.get("max_on_s")):
                 vol.Any(None, cv.positive_int),
+                vol.Optional("source_stale_s", default=defaults.get("source_stale_s")):
+                vol.Any(None, cv.positive_int),
             }
         )
         return self._with_suggested(schema, defaults)
@@ -1464,6 +1524,7 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional("recipients"): _object_selector(),
                 vol.Optional("recipient_groups"): _object_selector(),
                 vol.Optional("route_targets"): _object_selector(),
+                vol.Optional("category_route_targets"): _object_selector(),
                 vol.Optional("enabled_event_categories"): cv.multi_select(
                     EVENT_CATEGORIES_TOGGLEABLE
                 ),
@@ -1472,6 +1533,28 @@ class HeimaOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(
                     "rate_limit_per_key_s", default=defaults.get("rate_limit_per_key_s", 300)
                 ): _NON_NEGATIVE_INT,
+                vol.Optional(
+                    "digest_mode",
+                    default=defaults.get("digest_mode", DEFAULT_NOTIFICATION_DIGEST_MODE),
+                ): vol.In(NOTIFICATION_DIGEST_MODES),
+                vol.Optional(
+                    "digest_window_s",
+                    default=defaults.get("digest_window_s", DEFAULT_NOTIFICATION_DIGEST_WINDOW_S),
+                ): _NON_NEGATIVE_INT,
+                vol.Optional(
+                    "digest_bypass_severity",
+                    default=defaults.get(
+                        "digest_bypass_severity", DEFAULT_NOTIFICATION_DIGEST_BYPASS_SEVERITY
+                    ),
+                ): vol.In(NOTIFICATION_DIGEST_BYPASS_SEVERITIES),
+                vol.Optional(
+                    "deferred_delivery_capacity",
+                    default=defaults.get("deferred_delivery_capacity", DEFAULT_DEFERRED_DELIVERY_CAPACITY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+                vol.Optional(
+                    "deferred_delivery_ttl_s",
+                    default=defaults.get("deferred_delivery_ttl_s", DEFAULT_DEFERRED_DELIVERY_TTL_S),
+                ): _NON_NEGATIVE_INT,
                 vol.Optional(
                     "occupancy_mismatch_policy",
                     default=defaults.get(
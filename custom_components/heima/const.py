@@ -15,6 +15,10 @@ PLATFORMS: list[Platform] = [
 CONF_ENGINE_ENABLED = "engine_enabled"
 CONF_TIMEZONE = "timezone"
 CONF_LANGUAGE = "language"
+CONF_EVALUATION_DEBOUNCE_MS = "evaluation_debounce_ms"
+CONF_ENGINE_LATENCY_SENSOR = "engine_latency_sensor"
+CONF_TRACE_MODE = "trace_mode"
+CONF_TRACE_SAMPLE_EVERY = "trace_sample_every"
 
 OPT_PEOPLE_NAMED = "people_named"
 OPT_PEOPLE_ANON = "people_anonymous"
@@ -37,6 +41,12 @@ HOUSE_SIGNAL_NAMES = [
 
 DEFAULT_ENGINE_ENABLED = True
 DEFAULT_LIGHTING_APPLY_MODE = "scene"
+DEFAULT_EVALUATION_DEBOUNCE_MS = 0
+DEFAULT_ENGINE_LATENCY_SENSOR = False
+DEFAULT_TRACE_MODE = "off"
+DEFAULT_TRACE_SAMPLE_EVERY = 20
+
+TRACE_MODES = ["off", "sampled", "full"]
 
 HOUSE_STATES_CANONICAL = [
     "away",
@@ -82,10 +92,20 @@ SECURITY_MISMATCH_POLICIES = ["off", "smart", "strict"]
 DEFAULT_SECURITY_MISMATCH_POLICY = "smart"
 DEFAULT_SECURITY_MISMATCH_PERSIST_S = 300
 
+NOTIFICATION_DIGEST_MODES = ["off", "evaluation", "window"]
+DEFAULT_NOTIFICATION_DIGEST_MODE = "off"
+DEFAULT_NOTIFICATION_DIGEST_WINDOW_S = 30
+NOTIFICATION_DIGEST_BYPASS_SEVERITIES = ["warn", "error", "none"]
+DEFAULT_NOTIFICATION_DIGEST_BYPASS_SEVERITY = "warn"
+DEFAULT_DEFERRED_DELIVERY_CAPACITY = 1000
+DEFAULT_DEFERRED_DELIVERY_TTL_S = 21600
+DEFERRED_NOTIFICATIONS_STORAGE_VERSION = 1
+
 # Services
 SERVICE_COMMAND = "command"
 SERVICE_SET_MODE = "set_mode"
 SERVICE_SET_OVERRIDE = "set_override"
+SERVICE_QUERY_HISTORY = "query_history"
 
 # Events
 EVENT_HEIMA_EVENT = "heima_event"
@@ -2,16 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    EventStateReportedData,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event, async_track_state_report_event
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .const import (
+    CONF_EVALUATION_DEBOUNCE_MS,
+    DEFAULT_EVALUATION_DEBOUNCE_MS,
+    DEFERRED_NOTIFICATIONS_STORAGE_VERSION,
+    DOMAIN,
+)
 from .models import HeimaRuntimeState
+from .runtime.clock import Clock
 from .runtime.engine import HeimaEngine
+from .runtime.evaluation_queue import EvaluationQueue
+from .runtime.latency import merge_reasons
+from .runtime.normalization import InputNormalizer
 from .runtime.scheduler import RuntimeScheduler
+from .runtime.traffic_recorder import TrafficRecorder, write_traffic_lines
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,7 +42,14 @@ _LOGGER = logging.getLogger(__name__)
 class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
     """Owns the Heima runtime engine instance."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        *,
+        clock: Clock | None = None,
+        normalizer: InputNormalizer | None = None,
+    ) -> None:
         super().__init__(
             hass=hass,
             logger=_LOGGER,
@@ -27,12 +57,26 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
             update_interval=None,  # push-based
         )
         self.entry = entry
-        self.engine = HeimaEngine(hass, entry)
-        self._unsub_state_changed = None
+        self.engine = HeimaEngine(hass, entry, clock=clock, normalizer=normalizer)
+        self._state_unsubs: dict[str, CALLBACK_TYPE] = {}
+        self._report_unsubs: dict[str, CALLBACK_TYPE] = {}
+        self._state_callbacks = 0
+        self._last_subscription_rebuild: dict[str, int] = {"added": 0, "removed": 0}
+        self._changed_state_keys: set[str] | None = None
+        self._entity_writes: dict[str, int] = {"written": 0, "skipped": 0}
+        self._recorder: TrafficRecorder | None = None
+        self._recording_lock = asyncio.Lock()
+        self._deferred_fusion_task: asyncio.Task | None = None
         self._scheduler = RuntimeScheduler(
             hass,
             entry_id=entry.entry_id,
             on_job_due=self._async_handle_scheduled_job,
+            clock=clock,
+        )
+        self._evaluation_queue = EvaluationQueue(
+            hass,
+            run=self._async_run_evaluation,
+            debounce_s=self._evaluation_debounce_s(),
         )
         self.data = HeimaRuntimeState(
             health_ok=True,
@@ -47,15 +91,28 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
     def scheduler(self) -> RuntimeScheduler:
         return self._scheduler
 
+    @property
+    def evaluation_queue(self) -> EvaluationQueue:
+        return self._evaluation_queue
+
     async def _async_update_data(self) -> HeimaRuntimeState:
         """Return current runtime state for coordinator refreshes.
 
         Heima is push-driven: state updates are produced by explicit runtime calls.
+        A full refresh writes every entity, so pending change tracking is dropped.
         """
+        self.engine.state.pop_changed_keys()
         return self.data
 
     async def async_initialize(self) -> None:
         """Initialize runtime and publish base state."""
+        await self.engine.async_restore_deferred_notifications(
+            Store(
+                self.hass,
+                DEFERRED_NOTIFICATIONS_STORAGE_VERSION,
+                f"{DOMAIN}.{self.entry.entry_id}.deferred_notifications",
+            )
+        )
         await self.engine.async_initialize()
         self._subscribe_state_changes()
         self._sync_scheduler()
@@ -72,6 +129,7 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
     async def async_reload_options(self) -> None:
         """Reload options and refresh state."""
         await self.engine.async_reload_options(self.entry)
+        self._evaluation_queue.set_debounce(self._evaluation_debounce_s())
         self._resubscribe_state_changes()
         self._sync_scheduler()
         self.data = HeimaRuntimeState(
@@ -85,8 +143,18 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
         await self.async_refresh()
 
     async def async_request_evaluation(self, reason: str) -> None:
-        """Request an evaluation cycle."""
-        snapshot = await self.engine.async_evaluate(reason=reason)
+        """Request an evaluation cycle and wait for the batch that covers it."""
+        self._record_request(reason)
+        await self._evaluation_queue.async_request(reason)
+
+    async def _async_run_evaluation(self, reasons: tuple[str, ...]) -> None:
+        """Run one coalesced evaluation for every reason merged into the batch."""
+        reason = merge_reasons(reasons)
+        snapshot = await self.engine.async_evaluate(
+            reason=reason,
+            changed_entity_ids=self._changed_entity_ids(reasons),
+            skip_if_unchanged=self._is_passive_batch(reasons),
+        )
         self.data = HeimaRuntimeState(
             health_ok=self.engine.health.ok,
             health_reason=self.engine.health.reason,
@@ -96,7 +164,29 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
             last_action="",
         )
         self._sync_scheduler()
-        await self.async_refresh()
+        self._publish_changed_state()
+
+    @callback
+    def _publish_changed_state(self) -> None:
+        """Notify entities, letting only those with changed canonical state write."""
+        self._changed_state_keys = self.engine.state.pop_changed_keys()
+        try:
+            self.async_update_listeners()
+        finally:
+            self._changed_state_keys = None
+
+    def entity_needs_write(self, key: str | None) -> bool:
+        """Whether the entity bound to ``key`` must write its state on this update."""
+        if self._changed_state_keys is None or key is None:
+            return True
+        if key in self._changed_state_keys:
+            self._entity_writes["written"] += 1
+            return True
+        self._entity_writes["skipped"] += 1
+        return False
+
+    def entity_write_diagnostics(self) -> dict[str, int]:
+        return dict(self._entity_writes)
 
     async def async_emit_event(
         self,
@@ -126,6 +216,7 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
             last_decision=f"{reason}:{'emitted' if emitted else 'suppressed'}",
             last_action="event_emitted" if emitted else "event_suppressed",
         )
+        self._sync_scheduler()
         await self.async_refresh()
         return emitted
 
@@ -155,11 +246,12 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
                 "action": action,
             },
         )
-        snapshot = await self.engine.async_evaluate(reason=f"service:set_mode:{mode}:{enabled}")
+        self._record_request(f"service:set_mode:{mode}:{enabled}")
+        await self._evaluation_queue.async_request(f"service:set_mode:{mode}:{enabled}")
         self.data = HeimaRuntimeState(
             health_ok=self.engine.health.ok,
             health_reason=self.engine.health.reason,
-            house_state=snapshot.house_state,
+            house_state=self.engine.snapshot.house_state,
             house_state_reason=self.engine.state.get_sensor("heima_house_state_reason") or "",
             last_decision=f"evaluation_requested:service:set_mode:{mode}:{enabled}",
             last_action=f"house_state_override:{action}",
@@ -171,35 +263,191 @@ class HeimaCoordinator(DataUpdateCoordinator[HeimaRuntimeState]):
     async def async_shutdown(self) -> None:
         """Shutdown runtime."""
         self._unsubscribe_state_changes()
+        await self.async_stop_recording()
+        await self._evaluation_queue.async_shutdown()
+        task, self._deferred_fusion_task = self._deferred_fusion_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
         await self._scheduler.async_shutdown()
         await self.engine.async_shutdown()
         _LOGGER.debug("Heima runtime shutdown")
 
+    def state_subscription_diagnostics(self) -> dict[str, Any]:
+        """Describe the per-entity state-change subscription."""
+        all_entities = len(self.hass.states.async_entity_ids())
+        tracked = len(self._state_unsubs)
+        return {
+            "tracked_entities": tracked,
+            "entity_ids": sorted(self._state_unsubs),
+            "reported_entity_ids": sorted(self._report_unsubs),
+            "callbacks_received": self._state_callbacks,
+            "untracked_entities": max(0, all_entities - tracked),
+            "last_rebuild": dict(self._last_subscription_rebuild),
+        }
+
+    @property
+    def recording(self) -> bool:
+        return self._recorder is not None
+
+    async def async_start_recording(self) -> str:
+        """Start recording tracked traffic; return the recording path."""
+        if self._recorder is not None:
+            return str(self._recorder.path)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        recorder = TrafficRecorder(
+            path=Path(self.hass.config.path(DOMAIN, "recordings", f"{self.entry.entry_id}-{stamp}.jsonl.gz"))
+        )
+        recorder.header(
+            entry_id=self.entry.entry_id,
+            options=dict(self.entry.options),
+            states={
+                entity_id: self.hass.states.get(entity_id)
+                for entity_id in self.engine.tracked_entity_ids()
+            },
+            external_inputs=self.engine.external_inputs(),
+        )
+        self._recorder = recorder
+        await self._async_flush_recording(recorder)
+        _LOGGER.info("Heima traffic recording started: %s", recorder.path)
+        return str(recorder.path)
+
+    async def async_stop_recording(self) -> str | None:
+        """Stop recording and flush the remaining records; return the recording path."""
+        recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return None
+        await self._async_flush_recording(recorder)
+        _LOGGER.info("Heima traffic recording stopped: %s (%s records)", recorder.path, recorder.records)
+        return str(recorder.path)
+
+    def recording_diagnostics(self) -> dict[str, Any]:
+        return {"active": False} if self._recorder is None else {"active": True, **self._recorder.diagnostics()}
+
+    async def _async_flush_recording(self, recorder: TrafficRecorder) -> None:
+        # The lock keeps executor writes in record order.
+        async with self._recording_lock:
+            await self.hass.async_add_executor_job(
+                write_traffic_lines, recorder.path, recorder.take_buffer()
+            )
+
+    def _record_request(self, reason: str) -> None:
+        recorder = self._recorder
+        if recorder is None:
+            return
+        if reason.startswith("scheduler:"):
+            recorder.record_job(reason.split(":", 1)[1])
+        else:
+            recorder.record_request(reason, self.engine.external_inputs())
+        self._maybe_flush_recording(recorder)
+
+    def _maybe_flush_recording(self, recorder: TrafficRecorder) -> None:
+        if recorder.needs_flush:
+            self.hass.async_create_task(self._async_flush_recording(recorder))
+
     def _resubscribe_state_changes(self) -> None:
-        self._unsubscribe_state_changes()
         self._subscribe_state_changes()
 
     def _unsubscribe_state_changes(self) -> None:
-        if self._unsub_state_changed:
-            self._unsub_state_changed()
-            self._unsub_state_changed = None
+        for unsub in (*self._state_unsubs.values(), *self._report_unsubs.values()):
+            unsub()
+        self._state_unsubs.clear()
+        self._report_unsubs.clear()
+
+    @staticmethod
+    def _changed_entity_ids(reasons: tuple[str, ...]) -> set[str] | None:
+        """Entities behind a pure state-change batch; None requests a full evaluation."""
+        changed: set[str] = set()
+        for reason in reasons:
+            if not reason.startswith(("state_changed:", "state_reported:")):
+                return None
+            changed.add(reason.split(":", 1)[1])
+        return changed
+
+    @staticmethod
+    def _is_passive_batch(reasons: tuple[str, ...]) -> bool:
+        """True when only state changes and timers triggered the batch (no explicit request)."""
+        return all(reason.startswith(("state_changed:", "state_reported:", "scheduler:")) for reason in reasons)
+
+    def _evaluation_debounce_s(self) -> float:
+        try:
+            debounce_ms = int(
+                self.entry.options.get(CONF_EVALUATION_DEBOUNCE_MS, DEFAULT_EVALUATION_DEBOUNCE_MS)
+            )
+        except (TypeError, ValueError):
+            debounce_ms = DEFAULT_EVALUATION_DEBOUNCE_MS
+        return max(0, debounce_ms) / 1000
 
     def _sync_scheduler(self) -> None:
+        """Hand the engine's timed rechecks and queued deferred fusions to their runners."""
         self._scheduler.sync_jobs(self.engine.scheduled_runtime_jobs())
+        task = self._deferred_fusion_task
+        if (task is None or task.done()) and self.engine.has_deferred_fusions:
+            self._deferred_fusion_task = self.hass.async_create_background_task(
+                self._async_run_deferred_fusions(), f"{DOMAIN}_deferred_fusions"
+            )
+
+    async def _async_run_deferred_fusions(self) -> None:
+        """Run queued async/executor fusions; a changed result arms the ``fusion:deferred`` recheck.
+
+        While an executor thread outlives its time budget the runner waits for it
+        and runs again: the thread may bring a late result, and targets it held
+        back are still queued.
+        """
+        try:
+            while True:
+                if await self.engine.async_run_deferred_fusions():
+                    self._scheduler.sync_jobs(self.engine.scheduled_runtime_jobs())
+                if self.engine.has_deferred_fusions_in_flight:
+                    await self.engine.async_wait_deferred_fusions()
+                elif not self.engine.has_deferred_fusions:
+                    break
+        finally:
+            self._deferred_fusion_task = None
 
     async def _async_handle_scheduled_job(self, job_id: str) -> None:
         await self.async_request_evaluation(reason=f"scheduler:{job_id}")
 
     def _subscribe_state_changes(self) -> None:
+        """Track only the engine inputs, diffing against the current subscription."""
         tracked_entities = self.engine.tracked_entity_ids()
+        removed = [entity_id for entity_id in self._state_unsubs if entity_id not in tracked_entities]
+        for entity_id in removed:
+            self._state_unsubs.pop(entity_id)()
 
-        @callback
-        def _handle_state_changed(event: Event) -> None:
-            entity_id = event.data.get("entity_id")
-            if entity_id not in tracked_entities:
-                return
-            self.hass.async_create_task(
-                self.async_request_evaluation(reason=f"state_changed:{entity_id}")
+        added = sorted(entity_id for entity_id in tracked_entities if entity_id not in self._state_unsubs)
+        for entity_id in added:
+            self._state_unsubs[entity_id] = async_track_state_change_event(
+                self.hass, [entity_id], self._handle_state_changed
             )
+        self._last_subscription_rebuild = {"added": len(added), "removed": len(removed)}
+
+        # Same-state reports move only last_reported, which source staleness reads.
+        reported_entities = self.engine.stale_tracked_entity_ids()
+        for entity_id in [entity_id for entity_id in self._report_unsubs if entity_id not in reported_entities]:
+            self._report_unsubs.pop(entity_id)()
+        for entity_id in sorted(entity_id for entity_id in reported_entities if entity_id not in self._report_unsubs):
+            self._report_unsubs[entity_id] = async_track_state_report_event(
+                self.hass, [entity_id], self._handle_state_reported
+            )
+
+    @callback
+    def _handle_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        self._state_callbacks += 1
+        entity_id = event.data["entity_id"]
+        if self._recorder is not None:
+            self._recorder.record_state(entity_id, event.data["new_state"])
+            self._maybe_flush_recording(self._recorder)
+        self._evaluation_queue.request(f"state_changed:{entity_id}")
 
-        self._unsub_state_changed = self.hass.bus.async_listen("state_changed", _handle_state_changed)
+    @callback
+    def _handle_state_reported(self, event: Event[EventStateReportedData]) -> None:
+        self._state_callbacks += 1
+        entity_id = event.data["entity_id"]
+        if self._recorder is not None:
+            self._recorder.record_state(entity_id, event.data["new_state"])
+            self._maybe_flush_recording(self._recorder)
+        self._evaluation_queue.request(f"state_reported:{entity_id}")
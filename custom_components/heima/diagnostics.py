@@ -28,6 +28,12 @@ async def async_get_config_entry_diagnostics(
             "data": getattr(coordinator, "data", None),
             "engine": coordinator.engine.diagnostics() if coordinator else {},
             "scheduler": coordinator.scheduler.diagnostics() if coordinator else {},
+            "evaluation_queue": coordinator.evaluation_queue.diagnostics() if coordinator else {},
+            "state_subscription": (
+                coordinator.state_subscription_diagnostics() if coordinator else {}
+            ),
+            "entity_writes": coordinator.entity_write_diagnostics() if coordinator else {},
+            "recording": coordinator.recording_diagnostics() if coordinator else {},
         },
     }
 
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..coordinator import HeimaCoordinator
@@ -14,6 +15,13 @@ class HeimaEntity(CoordinatorEntity[HeimaCoordinator]):
     def __init__(self, coordinator: HeimaCoordinator, entry: ConfigEntry) -> None:
         super().__init__(coordinator)
         self._entry = entry
+        self._key: str | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if not self.coordinator.entity_needs_write(self._key):
+            return
+        super()._handle_coordinator_update()
 
     @property
     def device_info(self):
@@ -8,6 +8,8 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 
 from ..const import (
+    CONF_ENGINE_LATENCY_SENSOR,
+    DEFAULT_ENGINE_LATENCY_SENSOR,
     OPT_HEATING,
     OPT_LIGHTING_ROOMS,
     OPT_LIGHTING_ZONES,
@@ -147,6 +149,10 @@ def build_registry(entry: ConfigEntry) -> HeimaRegistry:
     sensors.append(_s(_k("heima_last_event"), "Heima Last Event"))
     sensors.append(_s(_k("heima_event_stats"), "Heima Event Stats"))
 
+    # Engine
+    if options.get(CONF_ENGINE_LATENCY_SENSOR, DEFAULT_ENGINE_LATENCY_SENSOR):
+        sensors.append(_s(_k("heima_engine_latency"), "Heima Engine Latency"))
+
     return HeimaRegistry(sensors=sensors, binary_sensors=binaries, selects=selects)
 
 
@@ -0,0 +1,63 @@
+"""Clock abstraction shared by the engine, scheduler and event pipeline."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+
+class Clock(Protocol):
+    """Source of monotonic and wall-clock time."""
+
+    def monotonic(self) -> float: ...
+
+    def utcnow(self) -> datetime: ...
+
+
+class SystemClock:
+    """Real time; looked up on every call so tests can still patch ``time``."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def utcnow(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+
+SYSTEM_CLOCK = SystemClock()
+
+_VIRTUAL_MONOTONIC_START = 1_000_000.0
+
+
+class VirtualClock:
+    """Clock that only moves when told to, for simulations, tests and replays."""
+
+    def __init__(
+        self,
+        *,
+        monotonic_start: float = _VIRTUAL_MONOTONIC_START,
+        utc_start: datetime | None = None,
+    ) -> None:
+        self._start = monotonic_start
+        self._now = monotonic_start
+        self._utc_start = utc_start or datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def utcnow(self) -> datetime:
+        return self._utc_start + timedelta(seconds=self._now - self._start)
+
+    @property
+    def elapsed_s(self) -> float:
+        return self._now - self._start
+
+    def advance(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError("VirtualClock cannot move backwards")
+        self._now += seconds
+
+    def advance_to(self, monotonic: float) -> None:
+        """Move to ``monotonic`` if it lies in the future; never move backwards."""
+        self._now = max(self._now, monotonic)
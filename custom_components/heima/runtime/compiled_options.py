@@ -0,0 +1,423 @@
+"""Immutable runtime view of config entry options, compiled once per options load."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
+
+from ..const import (
+    CONF_TRACE_MODE,
+    CONF_TRACE_SAMPLE_EVERY,
+    DEFAULT_DEFERRED_DELIVERY_CAPACITY,
+    DEFAULT_DEFERRED_DELIVERY_TTL_S,
+    DEFAULT_ENABLED_EVENT_CATEGORIES,
+    DEFAULT_LIGHTING_APPLY_MODE,
+    DEFAULT_NOTIFICATION_DIGEST_BYPASS_SEVERITY,
+    DEFAULT_NOTIFICATION_DIGEST_MODE,
+    DEFAULT_NOTIFICATION_DIGEST_WINDOW_S,
+    DEFAULT_OCCUPANCY_MISMATCH_MIN_DERIVED_ROOMS,
+    DEFAULT_OCCUPANCY_MISMATCH_PERSIST_S,
+    DEFAULT_OCCUPANCY_MISMATCH_POLICY,
+    DEFAULT_SECURITY_MISMATCH_PERSIST_S,
+    DEFAULT_SECURITY_MISMATCH_POLICY,
+    DEFAULT_TRACE_MODE,
+    DEFAULT_TRACE_SAMPLE_EVERY,
+    HOUSE_SIGNAL_NAMES,
+    NOTIFICATION_DIGEST_BYPASS_SEVERITIES,
+    NOTIFICATION_DIGEST_MODES,
+    OPT_HEATING,
+    OPT_HOUSE_SIGNALS,
+    OPT_LIGHTING_APPLY_MODE,
+    OPT_LIGHTING_ROOMS,
+    OPT_LIGHTING_ZONES,
+    OPT_NOTIFICATIONS,
+    OPT_PEOPLE_ANON,
+    OPT_PEOPLE_NAMED,
+    OPT_ROOMS,
+    OPT_SECURITY,
+    TRACE_MODES,
+)
+from .normalization.config import normalize_source_weights
+from .notifications import NotificationRouting, compile_notification_routing
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _frozen(value: Any) -> Mapping[str, Any]:
+    return MappingProxyType(dict(value)) if isinstance(value, dict) else _EMPTY
+
+
+def _weights(value: Any) -> Mapping[str, float]:
+    # Fusion strategy builders type-check for ``dict``; keep a private copy, not a proxy.
+    return {entity_id: max(0.0, weight) for entity_id, weight in normalize_source_weights(value).items()}
+
+
+def _weight_threshold(value: Any) -> float | None:
+    if value in (None, ""):
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _optional_seconds(value: Any) -> int | None:
+    """Positive number of seconds, or None when unset or disabled."""
+    if value in (None, ""):
+        return None
+    seconds = _int(value, 0)
+    return seconds if seconds > 0 else None
+
+
+def _room_occupancy_mode(room_cfg: Mapping[str, Any]) -> str:
+    mode = str(room_cfg.get("occupancy_mode", "derived") or "derived")
+    return mode if mode in {"derived", "none"} else "derived"
+
+
+@dataclass(frozen=True)
+class CompiledPerson:
+    """Named person binding with parsed presence fields."""
+
+    slug: str
+    presence_method: str
+    person_entity: str | None
+    sources: tuple[str, ...]
+    required: int
+    group_strategy: str
+    weight_threshold: float | None
+    source_weights: Mapping[str, float]
+    source_stale_s: int | None = None
+
+
+@dataclass(frozen=True)
+class CompiledAnonymous:
+    """Anonymous presence group with parsed fusion fields."""
+
+    enabled: bool
+    sources: tuple[str, ...]
+    required: int
+    group_strategy: str
+    weight_threshold: float | None
+    source_weights: Mapping[str, float]
+    count_weight: int
+
+    @property
+    def source_label(self) -> str:
+        return ",".join(self.sources) if self.sources else "none"
+
+
+@dataclass(frozen=True)
+class CompiledRoom:
+    """Room occupancy binding with parsed dwell and fusion fields."""
+
+    room_id: str
+    occupancy_mode: str
+    sources: tuple[str, ...]
+    logic: str
+    weight_threshold: float | None
+    source_weights: Mapping[str, float]
+    on_dwell_s: int
+    off_dwell_s: int
+    max_on_s: int | None
+    area_id: str
+    source_stale_s: int | None = None
+
+    @property
+    def source_label(self) -> str:
+        return "none" if self.occupancy_mode == "none" else ",".join(self.sources)
+
+
+@dataclass(frozen=True)
+class CompiledZone:
+    """Lighting zone with its member rooms resolved."""
+
+    zone_id: str
+    rooms: tuple[str, ...]
+    occupancy_capable_rooms: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CompiledSecurity:
+    """Security binding and raw-state mapping."""
+
+    enabled: bool
+    entity_id: str
+    mapping: Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class CompiledMismatchPolicy:
+    """Parsed occupancy/security mismatch policy."""
+
+    policy: str
+    persist_s: int
+    min_derived_rooms: int = 0
+
+
+@dataclass(frozen=True)
+class CompiledNotifications:
+    """Notification routing and event gating config."""
+
+    routes: tuple[str, ...]
+    recipients: Mapping[str, Any]
+    recipient_groups: Mapping[str, Any]
+    route_targets: tuple[str, ...]
+    routing: NotificationRouting
+    dedup_window_s: int
+    rate_limit_per_key_s: int
+    digest_mode: str
+    digest_window_s: int
+    digest_bypass_severity: str
+    deferred_delivery_capacity: int
+    deferred_delivery_ttl_s: int
+    enabled_event_categories: frozenset[str]
+    occupancy_mismatch: CompiledMismatchPolicy
+    security_mismatch: CompiledMismatchPolicy
+
+
+@dataclass(frozen=True)
+class CompiledOptions:
+    """Pre-resolved tables and indexes read by the engine hot path."""
+
+    people: tuple[CompiledPerson, ...]
+    anonymous: CompiledAnonymous
+    rooms: tuple[CompiledRoom, ...]
+    rooms_by_id: Mapping[str, CompiledRoom]
+    zones: tuple[CompiledZone, ...]
+    zone_rooms: Mapping[str, tuple[str, ...]]
+    room_zones: Mapping[str, tuple[str, ...]]
+    lighting_room_maps: Mapping[str, Mapping[str, Any]]
+    lighting_apply_mode: str
+    house_signal_entities: Mapping[str, str]
+    security: CompiledSecurity
+    heating: Mapping[str, Any]
+    notifications: CompiledNotifications
+    trace_mode: str = DEFAULT_TRACE_MODE
+    trace_sample_every: int = DEFAULT_TRACE_SAMPLE_EVERY
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "CompiledOptions":
+        rooms = tuple(
+            _compile_room(room) for room in options.get(OPT_ROOMS, []) if room.get("room_id")
+        )
+        rooms_by_id = {room.room_id: room for room in rooms}
+
+        zones: list[CompiledZone] = []
+        room_zones: dict[str, list[str]] = {}
+        for zone in options.get(OPT_LIGHTING_ZONES, []):
+            zone_id = zone.get("zone_id")
+            if not zone_id:
+                continue
+            members = tuple(str(room_id) for room_id in zone.get("rooms", []))
+            zones.append(
+                CompiledZone(
+                    zone_id=str(zone_id),
+                    rooms=members,
+                    occupancy_capable_rooms=tuple(
+                        room_id
+                        for room_id in members
+                        if room_id not in rooms_by_id or rooms_by_id[room_id].occupancy_mode == "derived"
+                    ),
+                )
+            )
+            for room_id in members:
+                room_zones.setdefault(room_id, []).append(str(zone_id))
+
+        lighting_room_maps = {
+            str(room_map["room_id"]): MappingProxyType(dict(room_map))
+            for room_map in options.get(OPT_LIGHTING_ROOMS, [])
+            if room_map.get("room_id")
+        }
+
+        apply_mode = str(options.get(OPT_LIGHTING_APPLY_MODE, DEFAULT_LIGHTING_APPLY_MODE))
+        if apply_mode not in {"scene", "delegate"}:
+            apply_mode = DEFAULT_LIGHTING_APPLY_MODE
+
+        trace_mode = str(options.get(CONF_TRACE_MODE, DEFAULT_TRACE_MODE))
+        if trace_mode not in TRACE_MODES:
+            trace_mode = DEFAULT_TRACE_MODE
+        try:
+            trace_sample_every = max(1, int(options.get(CONF_TRACE_SAMPLE_EVERY, DEFAULT_TRACE_SAMPLE_EVERY)))
+        except (TypeError, ValueError):
+            trace_sample_every = DEFAULT_TRACE_SAMPLE_EVERY
+
+        security_cfg = options.get(OPT_SECURITY, {})
+        return cls(
+            people=tuple(
+                _compile_person(person)
+                for person in options.get(OPT_PEOPLE_NAMED, [])
+                if person.get("slug")
+            ),
+            anonymous=_compile_anonymous(options.get(OPT_PEOPLE_ANON, {})),
+            rooms=rooms,
+            rooms_by_id=MappingProxyType(rooms_by_id),
+            zones=tuple(zones),
+            zone_rooms=MappingProxyType({zone.zone_id: zone.rooms for zone in zones}),
+            room_zones=MappingProxyType(
+                {room_id: tuple(zone_ids) for room_id, zone_ids in room_zones.items()}
+            ),
+            lighting_room_maps=MappingProxyType(lighting_room_maps),
+            lighting_apply_mode=apply_mode,
+            house_signal_entities=MappingProxyType(
+                _house_signal_entities(options.get(OPT_HOUSE_SIGNALS, {}))
+            ),
+            security=CompiledSecurity(
+                enabled=bool(security_cfg.get("enabled")),
+                entity_id=str(security_cfg.get("security_state_entity", "")),
+                mapping=MappingProxyType(
+                    {
+                        "armed_away_value": security_cfg.get("armed_away_value", "armed_away"),
+                        "armed_home_value": security_cfg.get("armed_home_value", "armed_home"),
+                    }
+                ),
+            ),
+            heating=_frozen(options.get(OPT_HEATING, {})),
+            notifications=_compile_notifications(options.get(OPT_NOTIFICATIONS, {})),
+            trace_mode=trace_mode,
+            trace_sample_every=trace_sample_every,
+        )
+
+    def room_occupancy_mode(self, room_id: str) -> str:
+        """Occupancy mode of a room; rooms without config count as derived."""
+        room = self.rooms_by_id.get(room_id)
+        return room.occupancy_mode if room is not None else "derived"
+
+    def zones_for_rooms(self, room_ids: Iterable[str]) -> set[str]:
+        zones: set[str] = set()
+        for room_id in room_ids:
+            zones.update(self.room_zones.get(room_id, ()))
+        return zones
+
+    @property
+    def derived_room_ids(self) -> list[str]:
+        return [room.room_id for room in self.rooms if room.occupancy_mode == "derived"]
+
+
+def _compile_person(person: Mapping[str, Any]) -> CompiledPerson:
+    person_entity = person.get("person_entity")
+    return CompiledPerson(
+        slug=str(person.get("slug")),
+        presence_method=str(person.get("presence_method", "ha_person")),
+        person_entity=str(person_entity) if person_entity else None,
+        sources=tuple(str(source) for source in person.get("sources", [])),
+        required=_int(person.get("required", 1), 1),
+        group_strategy=str(person.get("group_strategy", "quorum") or "quorum"),
+        weight_threshold=_weight_threshold(person.get("weight_threshold")),
+        source_weights=_weights(person.get("source_weights")),
+        source_stale_s=_optional_seconds(person.get("source_stale_s")),
+    )
+
+
+def _compile_anonymous(anon: Mapping[str, Any]) -> CompiledAnonymous:
+    return CompiledAnonymous(
+        enabled=bool(anon.get("enabled")),
+        sources=tuple(str(source) for source in anon.get("sources", [])),
+        required=_int(anon.get("required", 1), 1),
+        group_strategy=str(anon.get("group_strategy", "quorum") or "quorum"),
+        weight_threshold=_weight_threshold(anon.get("weight_threshold")),
+        source_weights=_weights(anon.get("source_weights")),
+        count_weight=_int(anon.get("anonymous_count_weight", 1), 1),
+    )
+
+
+def _compile_room(room: Mapping[str, Any]) -> CompiledRoom:
+    max_on_s_raw = room.get("max_on_s")
+    return CompiledRoom(
+        room_id=str(room.get("room_id")),
+        occupancy_mode=_room_occupancy_mode(room),
+        sources=tuple(str(source) for source in room.get("sources", [])),
+        logic=str(room.get("logic", "any_of")),
+        weight_threshold=_weight_threshold(room.get("weight_threshold")),
+        source_weights=_weights(room.get("source_weights")),
+        on_dwell_s=_int(room.get("on_dwell_s", 5), 5),
+        off_dwell_s=_int(room.get("off_dwell_s", 120), 120),
+        max_on_s=_int(max_on_s_raw, 0) if max_on_s_raw not in (None, "") else None,
+        area_id=str(room.get("area_id") or "").strip(),
+        source_stale_s=_optional_seconds(room.get("source_stale_s")),
+    )
+
+
+def _house_signal_entities(raw: Any) -> dict[str, str]:
+    if not isinstance(raw, dict):
+        return {}
+    configured: dict[str, str] = {}
+    for signal_name in HOUSE_SIGNAL_NAMES:
+        value = raw.get(signal_name)
+        if value in (None, ""):
+            continue
+        entity_id = str(value).strip()
+        if entity_id:
+            configured[signal_name] = entity_id
+    return configured
+
+
+def _compile_notifications(cfg: Mapping[str, Any]) -> CompiledNotifications:
+    raw_categories = cfg.get("enabled_event_categories")
+    if raw_categories is None:
+        categories = set(DEFAULT_ENABLED_EVENT_CATEGORIES)
+    else:
+        categories = {str(value) for value in list(raw_categories) if str(value)}
+    categories.add("system")  # system is always enabled by spec
+
+    occupancy_policy = str(cfg.get("occupancy_mismatch_policy", DEFAULT_OCCUPANCY_MISMATCH_POLICY))
+    if occupancy_policy not in {"off", "smart", "strict"}:
+        occupancy_policy = DEFAULT_OCCUPANCY_MISMATCH_POLICY
+    security_policy = str(cfg.get("security_mismatch_policy", DEFAULT_SECURITY_MISMATCH_POLICY))
+    if security_policy not in {"off", "smart", "strict"}:
+        security_policy = DEFAULT_SECURITY_MISMATCH_POLICY
+    digest_mode = str(cfg.get("digest_mode", DEFAULT_NOTIFICATION_DIGEST_MODE))
+    if digest_mode not in NOTIFICATION_DIGEST_MODES:
+        digest_mode = DEFAULT_NOTIFICATION_DIGEST_MODE
+    digest_bypass_severity = str(cfg.get("digest_bypass_severity", DEFAULT_NOTIFICATION_DIGEST_BYPASS_SEVERITY))
+    if digest_bypass_severity not in NOTIFICATION_DIGEST_BYPASS_SEVERITIES:
+        digest_bypass_severity = DEFAULT_NOTIFICATION_DIGEST_BYPASS_SEVERITY
+
+    routes = tuple(cfg.get("routes", []))
+    recipients = _frozen(cfg.get("recipients", {}))
+    recipient_groups = _frozen(cfg.get("recipient_groups", {}))
+    route_targets = tuple(cfg.get("route_targets", []))
+    return CompiledNotifications(
+        routes=routes,
+        recipients=recipients,
+        recipient_groups=recipient_groups,
+        route_targets=route_targets,
+        routing=compile_notification_routing(
+            routes=routes,
+            recipients=recipients,
+            recipient_groups=recipient_groups,
+            route_targets=route_targets,
+            category_route_targets=_frozen(cfg.get("category_route_targets", {})),
+        ),
+        dedup_window_s=int(cfg.get("dedup_window_s", 60)),
+        rate_limit_per_key_s=int(cfg.get("rate_limit_per_key_s", 300)),
+        digest_mode=digest_mode,
+        digest_window_s=int(cfg.get("digest_window_s", DEFAULT_NOTIFICATION_DIGEST_WINDOW_S)),
+        digest_bypass_severity=digest_bypass_severity,
+        deferred_delivery_capacity=int(cfg.get("deferred_delivery_capacity", DEFAULT_DEFERRED_DELIVERY_CAPACITY)),
+        deferred_delivery_ttl_s=int(cfg.get("deferred_delivery_ttl_s", DEFAULT_DEFERRED_DELIVERY_TTL_S)),
+        enabled_event_categories=frozenset(categories),
+        occupancy_mismatch=CompiledMismatchPolicy(
+            policy=occupancy_policy,
+            persist_s=int(
+                cfg.get("occupancy_mismatch_persist_s", DEFAULT_OCCUPANCY_MISMATCH_PERSIST_S)
+            ),
+            min_derived_rooms=int(
+                cfg.get(
+                    "occupancy_mismatch_min_derived_rooms",
+                    DEFAULT_OCCUPANCY_MISMATCH_MIN_DERIVED_ROOMS,
+                )
+            ),
+        ),
+        security_mismatch=CompiledMismatchPolicy(
+            policy=security_policy,
+            persist_s=int(cfg.get("security_mismatch_persist_s", DEFAULT_SECURITY_MISMATCH_PERSIST_S)),
+        ),
+    )
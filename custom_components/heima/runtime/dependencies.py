@@ -0,0 +1,98 @@
+"""Input-entity dependency index for incremental engine evaluation."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from .compiled_options import CompiledOptions
+
+NODE_ANONYMOUS = "anonymous"
+NODE_SECURITY = "security"
+NODE_HEATING = "heating"
+NODE_HOUSE_STATE = "house_state"
+
+HEATING_INPUT_KEYS = (
+    "climate_entity",
+    "outdoor_temperature_entity",
+    "vacation_hours_from_start_entity",
+    "vacation_hours_to_end_entity",
+    "vacation_total_hours_entity",
+    "vacation_is_long_entity",
+)
+
+
+def person_node(slug: str) -> str:
+    return f"person:{slug}"
+
+
+def room_node(room_id: str) -> str:
+    return f"room:{room_id}"
+
+
+def zone_node(zone_id: str) -> str:
+    return f"zone:{zone_id}"
+
+
+def house_signal_node(signal_name: str) -> str:
+    return f"house_signal:{signal_name}"
+
+
+def recheck_job_node(job_id: str) -> str | None:
+    """Return the node owning a timed recheck job, or None for always-evaluated checks."""
+    for prefix in ("occupancy:dwell:", "occupancy:max_on:", "occupancy:stale:"):
+        if job_id.startswith(prefix):
+            return room_node(job_id[len(prefix):])
+    if job_id.startswith("presence:stale:"):
+        return person_node(job_id[len("presence:stale:"):])
+    if job_id.startswith("heating:"):
+        return NODE_HEATING
+    return None
+
+
+@dataclass(frozen=True)
+class DependencyIndex:
+    """Maps each input entity to the snapshot nodes that read it."""
+
+    entity_nodes: dict[str, frozenset[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_compiled(cls, config: CompiledOptions) -> "DependencyIndex":
+        entity_nodes: dict[str, set[str]] = {}
+
+        def _bind(entity_id: Any, node: str) -> None:
+            if not entity_id:
+                return
+            entity_nodes.setdefault(str(entity_id), set()).add(node)
+
+        for signal_name, entity_id in config.house_signal_entities.items():
+            _bind(entity_id, house_signal_node(signal_name))
+
+        for person in config.people:
+            _bind(person.person_entity, person_node(person.slug))
+            for source in person.sources:
+                _bind(source, person_node(person.slug))
+
+        for source in config.anonymous.sources:
+            _bind(source, NODE_ANONYMOUS)
+
+        for room in config.rooms:
+            for source in room.sources:
+                _bind(source, room_node(room.room_id))
+
+        _bind(config.security.entity_id, NODE_SECURITY)
+
+        for key in HEATING_INPUT_KEYS:
+            _bind(config.heating.get(key), NODE_HEATING)
+
+        return cls(entity_nodes={entity_id: frozenset(nodes) for entity_id, nodes in entity_nodes.items()})
+
+    def entity_ids(self) -> set[str]:
+        return set(self.entity_nodes)
+
+    def dirty_nodes(self, entity_ids: Iterable[str]) -> set[str]:
+        """Return the nodes that read any of the given entities."""
+        dirty: set[str] = set()
+        for entity_id in entity_ids:
+            dirty.update(self.entity_nodes.get(entity_id, ()))
+        return dirty
@@ -4,39 +4,36 @@ from __future__ import annotations
 
 import json
 import logging
-import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime
+from typing import Any, Iterable, Mapping
 from uuid import uuid4
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ServiceNotFound
+from homeassistant.helpers.storage import Store
 
-from ..const import (
-    DEFAULT_LIGHTING_APPLY_MODE,
-    DEFAULT_ENABLED_EVENT_CATEGORIES,
-    DEFAULT_OCCUPANCY_MISMATCH_MIN_DERIVED_ROOMS,
-    DEFAULT_OCCUPANCY_MISMATCH_PERSIST_S,
-    DEFAULT_OCCUPANCY_MISMATCH_POLICY,
-    DEFAULT_SECURITY_MISMATCH_PERSIST_S,
-    DEFAULT_SECURITY_MISMATCH_POLICY,
-    EVENT_CATEGORIES_ALL,
-    OPT_HEATING,
-    OPT_HOUSE_SIGNALS,
-    OPT_LIGHTING_APPLY_MODE,
-    OPT_LIGHTING_ROOMS,
-    OPT_LIGHTING_ZONES,
-    OPT_NOTIFICATIONS,
-    OPT_PEOPLE_ANON,
-    OPT_PEOPLE_NAMED,
-    OPT_ROOMS,
-    OPT_SECURITY,
-)
+from ..const import EVENT_CATEGORIES_ALL, HOUSE_SIGNAL_NAMES
 from ..entities.registry import build_registry
 from ..models import HeimaOptions
+from .clock import SYSTEM_CLOCK, Clock
+from .compiled_options import CompiledOptions, CompiledPerson, CompiledRoom
 from .contracts import ApplyPlan, ApplyStep, HeimaEvent
+from .dependencies import (
+    NODE_ANONYMOUS,
+    NODE_HEATING,
+    NODE_HOUSE_STATE,
+    NODE_SECURITY,
+    DependencyIndex,
+    house_signal_node,
+    person_node,
+    recheck_job_node,
+    room_node,
+    zone_node,
+)
+from .history import SnapshotDelta, SnapshotHistory
+from .latency import EvaluationLatency, StageClock
 from .lighting import pick_scene_for_intent_with_trace, resolve_zone_intent
 from .normalization.config import (
     GROUP_PRESENCE_STRATEGY_CONTRACT,
@@ -45,17 +42,20 @@ from .normalization.config import (
     SECURITY_CORROBORATION_STRATEGY_CONTRACT,
     build_signal_set_strategy_cfg_for_contract,
 )
-from .normalization.service import InputNormalizer
+from .normalization.contracts import DerivedObservation, NormalizedObservation
+from .normalization.service import CompiledFusion, InputNormalizer, state_reported_at
 from .notifications import HeimaEventPipeline
 from .policy import resolve_house_state
 from .snapshot import DecisionSnapshot
 from .scheduler import ScheduledRuntimeJob
 from .state_store import CanonicalState
+from .trace import LazyTrace, TracePolicy, render_trace
 
 _LOGGER = logging.getLogger(__name__)
 
 _LIGHTING_MIN_SECONDS_BETWEEN_APPLIES = 10
 _HEATING_MIN_SECONDS_BETWEEN_APPLIES = 60
+_KNOWN_EVENT_CATEGORIES = frozenset(EVENT_CATEGORIES_ALL)
 
 
 @dataclass(frozen=True)
@@ -69,9 +69,17 @@ class EngineHealth:
 class HeimaEngine:
     """Core runtime engine with canonical compute pipeline."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        *,
+        clock: Clock | None = None,
+        normalizer: InputNormalizer | None = None,
+    ) -> None:
         self._hass = hass
         self._entry = entry
+        self._clock = clock or SYSTEM_CLOCK
         self._options = HeimaOptions.from_entry(entry)
         self._health = EngineHealth(ok=True, reason="initialized")
         self._snapshot = DecisionSnapshot.empty()
@@ -94,8 +102,8 @@ class HeimaEngine:
         self._house_state_override_set_by: str | None = None
         self._house_state_override_last_change_ts: str | None = None
         self._last_engine_enabled_state: bool | None = None
-        self._events = HeimaEventPipeline(hass)
-        self._normalizer = InputNormalizer(hass)
+        self._events = HeimaEventPipeline(hass, clock=self._clock)
+        self._normalizer = normalizer or InputNormalizer(hass, clock=self._clock)
         self._pending_events: list[HeimaEvent] = []
         self._suppressed_event_categories: dict[str, int] = {}
         self._occupancy_home_no_room_since: float | None = None
@@ -106,14 +114,35 @@ class HeimaEngine:
         self._occupancy_room_candidate_since: dict[str, float] = {}
         self._occupancy_room_effective_state: dict[str, str] = {}
         self._occupancy_room_effective_since: dict[str, float] = {}
-        self._occupancy_room_trace: dict[str, dict[str, Any]] = {}
-        self._group_presence_trace: dict[str, dict[str, Any]] = {}
-        self._house_signals_trace: dict[str, dict[str, Any]] = {}
+        # Observation-bearing traces may be LazyTrace until diagnostics() renders them.
+        self._occupancy_room_trace: dict[str, dict[str, Any] | LazyTrace] = {}
+        self._group_presence_trace: dict[str, dict[str, Any] | LazyTrace] = {}
+        self._house_signals_trace: dict[str, dict[str, Any] | LazyTrace] = {}
         self._timed_rechecks: dict[str, dict[str, Any]] = {}
-        self._security_observation_trace: dict[str, Any] = {}
-        self._security_corroboration_trace: dict[str, Any] = {}
+        self._security_observation_trace: dict[str, Any] | LazyTrace = {}
+        self._security_corroboration_trace: dict[str, Any] | LazyTrace = {}
+        self._trace_policy = TracePolicy()
+        self._history = SnapshotHistory()
         self._security_armed_away_but_home_since: float | None = None
         self._security_armed_away_but_home_emitted: bool = False
+        self._fusions: dict[str, CompiledFusion] = {}
+        self._load_compiled_options()
+        self._node_cache: dict[str, Any] = {}
+        self._eval_dirty_nodes: set[str] | None = None
+        self._eval_recomputed_nodes: list[str] = []
+        self._eval_reused_nodes: list[str] = []
+        self._evaluation_trace: dict[str, Any] = {}
+        self._evaluation_counts: dict[str, int] = {
+            "full": 0,
+            "incremental": 0,
+            "nodes_recomputed": 0,
+            "nodes_reused": 0,
+        }
+        self._input_fingerprint: tuple[Any, ...] | None = None
+        self._fingerprint_counts: dict[str, int] = {"hits": 0, "misses": 0}
+        self._fingerprint_last_result: str | None = None
+        self._latency = EvaluationLatency()
+        self._stage_clock: StageClock | None = None
 
     @property
     def health(self) -> EngineHealth:
@@ -130,18 +159,29 @@ class HeimaEngine:
     async def async_initialize(self) -> None:
         _LOGGER.debug("Heima engine initialize")
         self._options = HeimaOptions.from_entry(self._entry)
+        self._load_compiled_options()
         self._health = EngineHealth(ok=True, reason="initialized")
         self._build_default_state()
         await self.async_evaluate(reason="initialize")
 
     async def async_shutdown(self) -> None:
         _LOGGER.debug("Heima engine shutdown")
+        await self._events.async_shutdown()
         self._health = EngineHealth(ok=True, reason="shutdown")
 
+    async def async_restore_deferred_notifications(self, store: Store) -> None:
+        """Keep deferred notify deliveries in ``store`` and retry the ones saved before a restart."""
+        await self._events.async_restore_deferred(store)
+
+    async def async_drain_notifications(self) -> None:
+        """Wait for queued notify deliveries (deliveries run outside evaluations)."""
+        await self._events.async_drain()
+
     async def async_reload_options(self, entry: ConfigEntry) -> None:
         _LOGGER.debug("Heima engine reload options")
         self._entry = entry
         self._options = HeimaOptions.from_entry(entry)
+        self._load_compiled_options()
         self._house_state_override = None
         self._house_state_override_set_by = None
         self._house_state_override_last_change_ts = None
@@ -170,19 +210,60 @@ class HeimaEngine:
         if action != "noop":
             self._house_state_override = current
             self._house_state_override_set_by = source
-            self._house_state_override_last_change_ts = datetime.now(timezone.utc).isoformat()
+            self._house_state_override_last_change_ts = self._clock.utcnow().isoformat()
 
         return action, previous, current
 
-    async def async_evaluate(self, reason: str) -> DecisionSnapshot:
-        """Evaluate canonical state from configured bindings."""
+    async def async_evaluate(
+        self,
+        reason: str,
+        *,
+        changed_entity_ids: Iterable[str] | None = None,
+        skip_if_unchanged: bool = False,
+    ) -> DecisionSnapshot:
+        """Evaluate canonical state from configured bindings.
+
+        When ``changed_entity_ids`` is given, only the snapshot nodes reading those
+        entities (plus their dependents) are recomputed; ``None`` forces a full pass.
+        With ``skip_if_unchanged`` the whole pass is skipped when the input
+        fingerprint matches the previous evaluation and no timer has matured.
+        ``reason`` may be a coalesced batch built with ``merge_reasons``.
+        """
         _LOGGER.debug("Heima evaluation requested: %s", reason)
-        snapshot = self._compute_snapshot(reason=reason)
+        clock = self._stage_clock = StageClock()
+        try:
+            fingerprint = self._compute_input_fingerprint()
+            if skip_if_unchanged and self._inputs_unchanged(fingerprint):
+                _LOGGER.debug("Heima evaluation skipped, inputs unchanged: %s", reason)
+                return self._snapshot
+            clock.lap("fingerprint")
+            snapshot = await self._async_run_evaluation(
+                reason, fingerprint=fingerprint, changed_entity_ids=changed_entity_ids
+            )
+        finally:
+            self._stage_clock = None
+
+        self._latency.record(reason, clock)
+        if "heima_engine_latency" in self._state.sensors:
+            self._state.set_sensor("heima_engine_latency", round(clock.total_ms(), 1))
+            self._state.set_sensor_attributes("heima_engine_latency", self._latency.sensor_attributes())
+        return snapshot
+
+    async def _async_run_evaluation(
+        self,
+        reason: str,
+        *,
+        fingerprint: tuple[Any, ...],
+        changed_entity_ids: Iterable[str] | None,
+    ) -> DecisionSnapshot:
+        snapshot = self._compute_snapshot(reason=reason, changed_entity_ids=changed_entity_ids)
+        self._history.record(previous=self._snapshot, current=snapshot, reason=reason, at=self._clock.utcnow())
         self._snapshot = snapshot
         self._apply_snapshot_to_canonical_state(snapshot)
 
         plan = self._build_apply_plan(snapshot)
         self._apply_plan = plan
+        self._lap("apply_plan")
         await self._emit_lighting_hold_events()
         await self._emit_queued_events()
 
@@ -200,12 +281,71 @@ class HeimaEngine:
                 )
                 self._sync_event_sensors()
             self._last_engine_enabled_state = self._options.engine_enabled
+        self._flush_notification_digests()
+        self._lap("events")
 
         if self._options.engine_enabled and self._lighting_apply_mode() == "scene":
             await self._execute_apply_plan(plan)
+        self._lap("apply_execution")
 
+        self._input_fingerprint = fingerprint
         return snapshot
 
+    @property
+    def has_deferred_fusions(self) -> bool:
+        """Whether evaluations queued async/executor fusion runs."""
+        return self._normalizer.has_deferred_pending
+
+    @property
+    def has_deferred_fusions_in_flight(self) -> bool:
+        """Whether an executor fusion thread is still running past its run."""
+        return self._normalizer.has_executor_runs_in_flight
+
+    async def async_wait_deferred_fusions(self) -> None:
+        """Wait until a running executor fusion thread returns."""
+        await self._normalizer.async_wait_executor_runs()
+
+    async def async_run_deferred_fusions(self) -> bool:
+        """Run queued async/executor fusion plugins outside any evaluation.
+
+        The coordinator runs this as a background task. When a result changed,
+        the immediate ``fusion:deferred`` recheck is armed and True is returned.
+        """
+        if not await self._normalizer.async_run_deferred():
+            return False
+        self._schedule_timed_recheck_deadline(
+            job_id="fusion:deferred",
+            deadline=self._clock.monotonic(),
+            owner="normalization",
+            label="Deferred fusion results ready",
+        )
+        return True
+
+    def query_history(
+        self,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        room: str | None = None,
+        reason: str | None = None,
+        changed_only: bool = False,
+        limit: int | None = None,
+    ) -> list[SnapshotDelta]:
+        """Return recorded snapshot deltas matching the filters, oldest first."""
+        return self._history.query(
+            since=since,
+            until=until,
+            room=room,
+            reason=reason,
+            changed_only=changed_only,
+            limit=limit,
+        )
+
+    def _lap(self, stage: str) -> None:
+        """Charge elapsed time to ``stage`` when an evaluation is being timed."""
+        if self._stage_clock is not None:
+            self._stage_clock.lap(stage)
+
     async def async_emit_external_event(
         self,
         *,
@@ -227,71 +367,253 @@ class HeimaEngine:
                 context=dict(context or {}),
             )
         )
+        self._flush_notification_digests()
         self._sync_event_sensors()
         return emitted
 
+    def _flush_notification_digests(self) -> None:
+        """Send due digests and arm a recheck for the next digest window to close."""
+        self._events.flush_digests()
+        due = self._events.next_digest_due()
+        if due is not None:
+            self._schedule_timed_recheck_deadline(
+                job_id="notifications:digest",
+                deadline=due,
+                owner="notifications",
+                label="Notification digest window closes",
+            )
+
+    def external_inputs(self) -> dict[str, Any]:
+        """Inputs set by users and services rather than read from HA states."""
+        return {
+            "selects": dict(self._state.selects),
+            "holds": {
+                key: bool(value)
+                for key, value in self._state.binary_sensors.items()
+                if key.startswith("heima_lighting_manual_hold_")
+            },
+            "house_state_override": self._house_state_override,
+        }
+
+    def restore_external_inputs(self, inputs: dict[str, Any]) -> None:
+        """Apply inputs captured by ``external_inputs`` (used by traffic replay)."""
+        for key, value in dict(inputs.get("selects", {})).items():
+            if value is not None:
+                self._state.set_select(key, str(value))
+        for key, value in dict(inputs.get("holds", {})).items():
+            self._state.set_binary(key, bool(value))
+        self._house_state_override = inputs.get("house_state_override")
+
     def tracked_entity_ids(self) -> set[str]:
         """Entities that should trigger recomputation on state change."""
-        options = dict(self._entry.options)
-        tracked: set[str] = set(self._configured_house_signal_entities().values())
-
-        for person in options.get(OPT_PEOPLE_NAMED, []):
-            entity = person.get("person_entity")
-            if entity:
-                tracked.add(str(entity))
-            for source in person.get("sources", []):
-                tracked.add(str(source))
-
-        anon = options.get(OPT_PEOPLE_ANON, {})
-        for source in anon.get("sources", []):
-            tracked.add(str(source))
-
-        for room in options.get(OPT_ROOMS, []):
-            for source in room.get("sources", []):
-                tracked.add(str(source))
-
-        security = options.get(OPT_SECURITY, {})
-        security_entity = security.get("security_state_entity")
-        if security_entity:
-            tracked.add(str(security_entity))
-
-        heating = options.get(OPT_HEATING, {})
-        for key in (
-            "climate_entity",
-            "outdoor_temperature_entity",
-            "vacation_hours_from_start_entity",
-            "vacation_hours_to_end_entity",
-            "vacation_total_hours_entity",
-            "vacation_is_long_entity",
-        ):
-            value = heating.get(key)
-            if value:
-                tracked.add(str(value))
+        return self._dependency_index.entity_ids()
 
-        return tracked
+    def stale_tracked_entity_ids(self) -> frozenset[str]:
+        """Sources with a staleness window; a same-state report must also trigger recomputation."""
+        return self._fingerprint_stale_entity_ids
 
     def _configured_house_signal_entities(self) -> dict[str, str]:
-        raw = self._entry.options.get(OPT_HOUSE_SIGNALS, {})
-        if not isinstance(raw, dict):
+        return dict(self._config.house_signal_entities)
+
+    def _load_compiled_options(self) -> None:
+        """Compile options into the immutable tables read by the hot path."""
+        self._config = CompiledOptions.from_options(self._entry.options)
+        self._dependency_index = DependencyIndex.from_compiled(self._config)
+        self._fingerprint_entity_ids = tuple(sorted(self._dependency_index.entity_ids()))
+        # Staleness reads last_reported, so a re-reported unchanged state must still miss.
+        self._fingerprint_stale_entity_ids = frozenset(
+            entity_id
+            for binding in (*self._config.people, *self._config.rooms)
+            if binding.source_stale_s
+            for entity_id in binding.sources
+        )
+        self._trace_policy = TracePolicy(self._config.trace_mode, self._config.trace_sample_every)
+        self._events.configure_deferred(
+            capacity=self._config.notifications.deferred_delivery_capacity,
+            ttl_s=self._config.notifications.deferred_delivery_ttl_s,
+        )
+        self._compile_fusions()
+
+    def _compile_fusions(self) -> None:
+        """Bind every fusion target to its resolved strategy once per options load."""
+        config = self._config
+        fusions: dict[str, CompiledFusion] = {}
+        for person in config.people:
+            if person.presence_method == "quorum":
+                fusions[f"person:{person.slug}"] = self._compile_group_presence_fusion(
+                    required=person.required,
+                    strategy=person.group_strategy,
+                    weight_threshold=person.weight_threshold,
+                    source_weights=person.source_weights,
+                )
+        anon_cfg = config.anonymous
+        fusions["anonymous"] = self._compile_group_presence_fusion(
+            required=anon_cfg.required,
+            strategy=anon_cfg.group_strategy,
+            weight_threshold=anon_cfg.weight_threshold,
+            source_weights=anon_cfg.source_weights,
+        )
+        for room in config.rooms:
+            fusions[f"room:{room.room_id}"] = self._compile_fusion(
+                kind="presence",
+                strategy_cfg=build_signal_set_strategy_cfg_for_contract(
+                    contract=ROOM_OCCUPANCY_STRATEGY_CONTRACT,
+                    strategy=room.logic,
+                    weight_threshold=room.weight_threshold,
+                    source_weights=room.source_weights,
+                    fallback_state="off",
+                ),
+                context={"room_id": room.room_id},
+            )
+        for signal_name in HOUSE_SIGNAL_NAMES:
+            fusions[f"house_signal:{signal_name}"] = self._compile_fusion(
+                kind="boolean_signal",
+                strategy_cfg=build_signal_set_strategy_cfg_for_contract(
+                    contract=HOUSE_SIGNAL_STRATEGY_CONTRACT,
+                ),
+                context={"source": "house_signal", "signal": signal_name},
+            )
+        fusions["security_corroboration"] = self._compile_fusion(
+            kind="boolean_signal",
+            strategy_cfg=build_signal_set_strategy_cfg_for_contract(
+                contract=SECURITY_CORROBORATION_STRATEGY_CONTRACT,
+            ),
+            context={"source": "security_corroboration"},
+        )
+        self._fusions = fusions
+
+    def _compile_group_presence_fusion(
+        self,
+        *,
+        required: int,
+        strategy: str,
+        weight_threshold: float | None,
+        source_weights: Mapping[str, float] | None,
+    ) -> CompiledFusion:
+        return self._compile_fusion(
+            kind="presence",
+            strategy_cfg=build_signal_set_strategy_cfg_for_contract(
+                contract=GROUP_PRESENCE_STRATEGY_CONTRACT,
+                strategy=str(strategy or "quorum"),
+                required=int(required),
+                weight_threshold=weight_threshold,
+                source_weights=source_weights,
+                fallback_state="off",
+            ),
+            context={"source": "group_presence"},
+        )
+
+    def _compile_fusion(
+        self,
+        *,
+        kind: str,
+        strategy_cfg: dict[str, Any],
+        context: dict[str, Any],
+    ) -> CompiledFusion:
+        return self._normalizer.compile_fusion(kind=kind, strategy_cfg=strategy_cfg, context=context)
+
+    def _fuse_targets(
+        self,
+        targets: Iterable[tuple[str, Iterable[str], int | None]],
+    ) -> dict[str, tuple[list[NormalizedObservation], DerivedObservation]]:
+        """Normalize and fuse presence sources for many targets in one batched call."""
+        pending = [
+            (target, self._presence_observations(sources, stale_after_s))
+            for target, sources, stale_after_s in targets
+        ]
+        if not pending:
             return {}
-        configured: dict[str, str] = {}
-        for signal_name in (
-            "vacation_mode",
-            "guest_mode",
-            "sleep_window",
-            "relax_mode",
-            "work_window",
+        fused = self._normalizer.derive_many(
+            [(self._fusions[target], observations) for target, observations in pending]
+        )
+        return {
+            target: (observations, result)
+            for (target, observations), result in zip(pending, fused)
+        }
+
+    def _presence_observations(
+        self,
+        sources: Iterable[str],
+        stale_after_s: int | None,
+    ) -> list[NormalizedObservation]:
+        if not stale_after_s:
+            return [self._normalizer.presence(entity_id) for entity_id in sources]
+        return [self._normalizer.presence(entity_id, stale_after_s=stale_after_s) for entity_id in sources]
+
+    def _schedule_source_stale_recheck(
+        self,
+        *,
+        job_id: str,
+        sources: Iterable[str],
+        stale_after_s: int | None,
+        owner: str,
+        label: str,
+    ) -> None:
+        """Wake the scheduler when the next still-fresh source crosses its stale threshold."""
+        if not stale_after_s:
+            return
+        delays = [
+            delay
+            for delay in (self._normalizer.seconds_until_stale(entity_id, stale_after_s) for entity_id in sources)
+            if delay is not None
+        ]
+        if delays:
+            self._schedule_timed_recheck_deadline(
+                job_id=job_id,
+                deadline=self._clock.monotonic() + min(delays),
+                owner=owner,
+                label=label,
+            )
+
+    def _compute_input_fingerprint(self) -> tuple[Any, ...]:
+        """Collect every input the snapshot depends on into a comparable tuple."""
+        climate_entity = self._config.heating.get("climate_entity")
+        stale_entity_ids = self._fingerprint_stale_entity_ids
+        raw_states: list[Any] = []
+        for entity_id in self._fingerprint_entity_ids:
+            state = self._hass.states.get(entity_id)
+            if state is None:
+                raw_states.append(None)
+            elif entity_id == climate_entity:
+                attrs = getattr(state, "attributes", {}) or {}
+                raw_states.append((state.state, attrs.get("preset_mode"), attrs.get("temperature")))
+            elif entity_id in stale_entity_ids:
+                raw_states.append((state.state, state_reported_at(state)))
+            else:
+                raw_states.append(state.state)
+        return (
+            tuple(raw_states),
+            tuple(self._state.selects.items()),
+            tuple(self._is_lighting_room_hold_on(room_id) for room_id in self._config.lighting_room_maps),
+            self._house_state_override,
+        )
+
+    def _inputs_unchanged(self, fingerprint: tuple[Any, ...]) -> bool:
+        """Return True when the previous evaluation already covers these inputs.
+
+        Pending dwell/persistence deadlines are not part of the fingerprint: they
+        are re-armed by each evaluation, so a matured deadline forces a miss instead.
+        """
+        if self._input_fingerprint is None:
+            result = "miss:no_previous"
+        elif fingerprint != self._input_fingerprint:
+            result = "miss:inputs_changed"
+        elif any(
+            float(spec["due_monotonic"]) <= self._clock.monotonic() for spec in self._timed_rechecks.values()
         ):
-            value = raw.get(signal_name)
-            if value in (None, ""):
-                continue
-            entity_id = str(value).strip()
-            if entity_id:
-                configured[signal_name] = entity_id
-        return configured
+            result = "miss:timer_matured"
+        elif self._heating_trace.get("apply_allowed"):
+            result = "miss:heating_apply_pending"
+        else:
+            result = "hit"
+        self._fingerprint_last_result = result
+        self._fingerprint_counts["hits" if result == "hit" else "misses"] += 1
+        return result == "hit"
 
     def _build_default_state(self) -> None:
         registry = build_registry(self._entry)
+        self._node_cache = {}
+        self._input_fingerprint = None
         self._state.binary_sensors = {desc.key: False for desc in registry.binary_sensors}
         self._state.sensors = {desc.key: None for desc in registry.sensors}
         self._state.selects = {
@@ -325,19 +647,41 @@ class HeimaEngine:
         if "heima_heating_last_applied_target" in self._state.sensors:
             self._state.sensors["heima_heating_last_applied_target"] = None
 
-    def _compute_snapshot(self, reason: str) -> DecisionSnapshot:
-        options = dict(self._entry.options)
-        now = datetime.now(timezone.utc).isoformat()
-        self._timed_rechecks = {}
+    def _compute_snapshot(
+        self,
+        reason: str,
+        *,
+        changed_entity_ids: Iterable[str] | None = None,
+    ) -> DecisionSnapshot:
+        config = self._config
+        now = self._clock.utcnow().isoformat()
+        if changed_entity_ids is not None:
+            changed_entity_ids = tuple(changed_entity_ids)
+        self._begin_node_evaluation(changed_entity_ids)
+        self._normalizer.begin_evaluation()
+        self._trace_policy.begin_evaluation()
+        previous_house_state = self._snapshot.house_state
 
-        named_people = options.get(OPT_PEOPLE_NAMED, [])
         home_people: list[str] = []
 
-        for person in named_people:
-            slug = person.get("slug")
-            if not slug:
+        pending_people = {
+            person.slug for person in config.people if self._node_needs_compute(person_node(person.slug))
+        }
+        fused_people = self._fuse_targets(
+            (f"person:{person.slug}", person.sources, person.source_stale_s)
+            for person in config.people
+            if person.slug in pending_people and person.presence_method == "quorum"
+        )
+        for person in config.people:
+            slug = person.slug
+            node = person_node(slug)
+            if slug not in pending_people:
+                if self._node_cache[node]:
+                    home_people.append(slug)
                 continue
-            is_home, source, confidence = self._compute_named_person_presence(person)
+            is_home, source, confidence = self._compute_named_person_presence(
+                person, fused_sources=fused_people.get(f"person:{slug}")
+            )
             prev_is_home = self._state.get_binary(f"heima_person_{slug}_home")
             self._state.set_binary(f"heima_person_{slug}_home", is_home)
             self._state.set_sensor(f"heima_person_{slug}_source", source)
@@ -349,30 +693,31 @@ class HeimaEngine:
                 source=source,
                 confidence=confidence,
             )
+            self._node_cache[node] = is_home
             if is_home:
                 home_people.append(slug)
+        self._lap("people")
 
-        anon_cfg = options.get(OPT_PEOPLE_ANON, {})
+        anon_cfg = config.anonymous
         anon_home = False
-        anon_confidence = 0
-        anon_source = "disabled"
         anon_weight = 0
 
-        if anon_cfg.get("enabled"):
-            anon_sources = list(anon_cfg.get("sources", []))
-            required = int(anon_cfg.get("required", 1))
+        if anon_cfg.enabled and not self._node_needs_compute(NODE_ANONYMOUS):
+            anon_home, anon_weight = self._node_cache[NODE_ANONYMOUS]
+        elif anon_cfg.enabled:
             anon_fused, active_count = self._compute_group_presence(
-                anon_sources,
-                required,
-                strategy=str(anon_cfg.get("group_strategy", "quorum") or "quorum"),
-                weight_threshold=anon_cfg.get("weight_threshold"),
-                source_weights=anon_cfg.get("source_weights"),
+                list(anon_cfg.sources),
+                anon_cfg.required,
+                strategy=anon_cfg.group_strategy,
+                weight_threshold=anon_cfg.weight_threshold,
+                source_weights=anon_cfg.source_weights,
                 trace_key="anonymous",
+                fusion=self._fusions["anonymous"],
             )
             anon_home = anon_fused.state == "on"
             anon_confidence = int(anon_fused.confidence)
-            anon_source = ",".join(anon_sources) if anon_sources else "none"
-            anon_weight = int(anon_cfg.get("anonymous_count_weight", 1)) if anon_home else 0
+            anon_source = anon_cfg.source_label
+            anon_weight = anon_cfg.count_weight if anon_home else 0
             prev_anon_home = self._state.get_binary("heima_anonymous_presence")
             self._state.set_binary("heima_anonymous_presence", anon_home)
             self._state.set_sensor("heima_anonymous_presence_confidence", anon_confidence)
@@ -382,49 +727,59 @@ class HeimaEngine:
                 is_on=anon_home,
                 source=anon_source,
                 confidence=anon_confidence,
-                weight=int(anon_cfg.get("anonymous_count_weight", 1)),
+                weight=anon_cfg.count_weight,
             )
+            self._node_cache[NODE_ANONYMOUS] = (anon_home, anon_weight)
             _LOGGER.debug("Anonymous presence active_count=%s", active_count)
+        self._lap("anonymous")
 
         anyone_home = bool(home_people) or anon_home
         people_count = len(home_people) + anon_weight
         people_home_list = home_people + (["anonymous"] if anon_home else [])
 
         occupied_rooms: list[str] = []
-        for room in options.get(OPT_ROOMS, []):
-            room_id = room.get("room_id")
-            if not room_id:
+        changed_rooms: set[str] = set()
+        pending_rooms = {room.room_id for room in config.rooms if self._node_needs_compute(room_node(room.room_id))}
+        fused_rooms = self._fuse_targets(
+            (f"room:{room.room_id}", room.sources, room.source_stale_s)
+            for room in config.rooms
+            if room.room_id in pending_rooms and room.occupancy_mode != "none" and room.sources
+        )
+        for room in config.rooms:
+            room_id = room.room_id
+            node = room_node(room_id)
+            if room_id not in pending_rooms:
+                if self._node_cache[node]:
+                    occupied_rooms.append(room_id)
                 continue
-            is_occupied, occ_trace = self._compute_room_occupancy(room)
+            is_occupied, occ_trace = self._compute_room_occupancy(
+                room, fused_sources=fused_rooms.get(f"room:{room_id}")
+            )
             prev_value = self._state.get_binary(f"heima_occ_{room_id}")
             self._state.set_binary(f"heima_occ_{room_id}", is_occupied)
-            self._state.set_sensor(
-                f"heima_occ_{room_id}_source",
-                "none" if self._room_occupancy_mode(room) == "none" else ",".join(room.get("sources", [])),
-            )
+            self._state.set_sensor(f"heima_occ_{room_id}_source", room.source_label)
             if prev_value != is_occupied:
                 self._state.set_sensor(f"heima_occ_{room_id}_last_change", now)
-            self._occupancy_room_trace[str(room_id)] = occ_trace
+                changed_rooms.add(room_id)
+            self._occupancy_room_trace[room_id] = occ_trace
+            self._node_cache[node] = is_occupied
             if is_occupied:
                 occupied_rooms.append(room_id)
+        self._lap("rooms")
 
-        security_cfg = options.get(OPT_SECURITY, {})
+        security_cfg = config.security
         security_state = "unknown"
         security_reason = "disabled"
-        if security_cfg.get("enabled"):
-            entity_id = str(security_cfg.get("security_state_entity", ""))
-            security_obs = self._normalizer.security(
-                entity_id,
-                {
-                    "armed_away_value": security_cfg.get("armed_away_value", "armed_away"),
-                    "armed_home_value": security_cfg.get("armed_home_value", "armed_home"),
-                },
-            )
+        if security_cfg.enabled and not self._node_needs_compute(NODE_SECURITY):
+            security_state, security_reason = self._node_cache[NODE_SECURITY]
+        elif security_cfg.enabled:
+            security_obs = self._normalizer.security(security_cfg.entity_id, security_cfg.mapping)
             security_state = security_obs.state
             security_reason = security_obs.reason or "normalized"
-            self._security_observation_trace = security_obs.as_dict()
+            self._security_observation_trace = self._trace_policy.trace(security_obs.as_dict)
             self._state.set_sensor("heima_security_state", security_state)
             self._state.set_sensor("heima_security_reason", security_reason)
+            self._node_cache[NODE_SECURITY] = (security_state, security_reason)
         else:
             self._security_observation_trace = {
                 "state": "unknown",
@@ -432,46 +787,32 @@ class HeimaEngine:
                 "available": False,
                 "source_entity_id": None,
             }
+        self._lap("security")
+
+        house_signal_entities = config.house_signal_entities
+        house_signals: dict[str, bool] = {}
+        for signal_name in HOUSE_SIGNAL_NAMES:
+            node = house_signal_node(signal_name)
+            if not self._node_needs_compute(node):
+                house_signals[signal_name] = self._node_cache[node]
+                continue
+            house_signals[signal_name] = self._compute_house_signal(
+                signal_name,
+                [house_signal_entities[signal_name]]
+                if signal_name in house_signal_entities
+                else [],
+            )
+            self._node_cache[node] = house_signals[signal_name]
+        self._lap("house_signals")
 
-        house_signal_entities = self._configured_house_signal_entities()
-        vacation_mode = self._compute_house_signal(
-            "vacation_mode",
-            [house_signal_entities["vacation_mode"]]
-            if "vacation_mode" in house_signal_entities
-            else [],
-        )
-        guest_mode = self._compute_house_signal(
-            "guest_mode",
-            [house_signal_entities["guest_mode"]]
-            if "guest_mode" in house_signal_entities
-            else [],
-        )
-        sleep_window = self._compute_house_signal(
-            "sleep_window",
-            [house_signal_entities["sleep_window"]]
-            if "sleep_window" in house_signal_entities
-            else [],
-        )
-        relax_mode = self._compute_house_signal(
-            "relax_mode",
-            [house_signal_entities["relax_mode"]]
-            if "relax_mode" in house_signal_entities
-            else [],
-        )
-        work_window = self._compute_house_signal(
-            "work_window",
-            [house_signal_entities["work_window"]]
-            if "work_window" in house_signal_entities
-            else [],
-        )
-
+        self._eval_recomputed_nodes.append(NODE_HOUSE_STATE)
         derived_house_state, derived_house_reason = resolve_house_state(
             anyone_home=anyone_home,
-            vacation_mode=vacation_mode,
-            guest_mode=guest_mode,
-            sleep_window=sleep_window,
-            relax_mode=relax_mode,
-            work_window=work_window,
+            vacation_mode=house_signals["vacation_mode"],
+            guest_mode=house_signals["guest_mode"],
+            sleep_window=house_signals["sleep_window"],
+            relax_mode=house_signals["relax_mode"],
+            work_window=house_signals["work_window"],
         )
         if self._house_state_override:
             house_state = self._house_state_override
@@ -480,12 +821,29 @@ class HeimaEngine:
             house_state = derived_house_state
             house_reason = derived_house_reason
 
+        house_state_changed = house_state != previous_house_state
+        if house_state_changed:
+            self._mark_nodes_dirty(zone_node(zone.zone_id) for zone in config.zones)
+            self._mark_nodes_dirty([NODE_HEATING])
+        else:
+            self._mark_nodes_dirty(
+                zone_node(zone_id) for zone_id in config.zones_for_rooms(changed_rooms)
+            )
+        if self._heating_trace.get("apply_allowed"):
+            # An allowed apply must be re-checked against idempotence and rate limits.
+            self._mark_nodes_dirty([NODE_HEATING])
+        self._lap("house_state")
+
         lighting_intents = self._compute_lighting_intents(
             house_state=house_state,
             occupied_rooms=occupied_rooms,
         )
+        self._lap("lighting_intents")
 
-        self._compute_heating_runtime(house_state=house_state)
+        if self._node_needs_compute(NODE_HEATING):
+            self._compute_heating_runtime(house_state=house_state)
+            self._node_cache[NODE_HEATING] = True
+        self._lap("heating")
 
         self._state.set_binary("heima_anyone_home", anyone_home)
         self._state.set_sensor("heima_people_count", people_count)
@@ -505,15 +863,15 @@ class HeimaEngine:
         self._queue_occupancy_consistency_events(
             anyone_home=anyone_home,
             occupied_rooms=occupied_rooms,
-            options=options,
         )
         self._queue_security_consistency_events(
             anyone_home=anyone_home,
             security_state=security_state,
-            options=options,
             people_home_list=people_home_list,
             occupied_rooms=occupied_rooms,
         )
+        self._finish_node_evaluation(changed_entity_ids)
+        self._lap("events")
 
         return DecisionSnapshot(
             snapshot_id=str(uuid4()),
@@ -527,6 +885,52 @@ class HeimaEngine:
             notes=f"reason={reason}",
         )
 
+    def _begin_node_evaluation(self, changed_entity_ids: Iterable[str] | None) -> None:
+        """Select the dirty nodes for this pass; ``None`` means recompute everything."""
+        self._eval_recomputed_nodes = []
+        self._eval_reused_nodes = []
+        if changed_entity_ids is None or not self._node_cache:
+            self._eval_dirty_nodes = None
+            self._timed_rechecks = {}
+            return
+        self._eval_dirty_nodes = self._dependency_index.dirty_nodes(changed_entity_ids)
+        # Rechecks owned by reused nodes stay armed; the rest are re-derived below.
+        self._timed_rechecks = {
+            job_id: spec
+            for job_id, spec in self._timed_rechecks.items()
+            if recheck_job_node(job_id) is not None
+        }
+
+    def _mark_nodes_dirty(self, nodes: Iterable[str]) -> None:
+        if self._eval_dirty_nodes is not None:
+            self._eval_dirty_nodes.update(nodes)
+
+    def _node_needs_compute(self, node: str) -> bool:
+        if (
+            self._eval_dirty_nodes is None
+            or node in self._eval_dirty_nodes
+            or node not in self._node_cache
+        ):
+            self._eval_recomputed_nodes.append(node)
+            for job_id in [job_id for job_id in self._timed_rechecks if recheck_job_node(job_id) == node]:
+                self._timed_rechecks.pop(job_id)
+            return True
+        self._eval_reused_nodes.append(node)
+        return False
+
+    def _finish_node_evaluation(self, changed_entity_ids: Iterable[str] | None) -> None:
+        mode = "full" if self._eval_dirty_nodes is None else "incremental"
+        self._evaluation_counts[mode] += 1
+        self._evaluation_counts["nodes_recomputed"] += len(self._eval_recomputed_nodes)
+        self._evaluation_counts["nodes_reused"] += len(self._eval_reused_nodes)
+        self._evaluation_trace = {
+            "mode": mode,
+            "changed_entity_ids": sorted(changed_entity_ids) if changed_entity_ids is not None else None,
+            "recomputed_nodes": list(self._eval_recomputed_nodes),
+            "reused_nodes": list(self._eval_reused_nodes),
+        }
+        self._eval_dirty_nodes = None
+
     def scheduled_runtime_jobs(self) -> dict[str, ScheduledRuntimeJob]:
         jobs: dict[str, ScheduledRuntimeJob] = {}
         entry_id = str(getattr(self._entry, "entry_id", ""))
@@ -550,7 +954,7 @@ class HeimaEngine:
         if not jobs:
             return None
         next_due = min(job.due_monotonic for job in jobs.values())
-        return max(0.0, next_due - time.monotonic())
+        return max(0.0, next_due - self._clock.monotonic())
 
     def _schedule_timed_recheck_deadline(
         self,
@@ -570,7 +974,7 @@ class HeimaEngine:
         }
 
     def _compute_heating_runtime(self, *, house_state: str) -> None:
-        heating_cfg = dict(self._entry.options.get(OPT_HEATING, {}))
+        heating_cfg = self._config.heating
         if not heating_cfg:
             self._heating_vacation_curve_start_temp = None
             self._heating_trace = {
@@ -740,6 +1144,14 @@ class HeimaEngine:
             vacation_meta=vacation_meta,
             temperature_step=temperature_step,
         )
+        if reason == "apply_rate_limited" and self._heating_last_apply_ts is not None:
+            # Nothing else re-runs heating when the window ends; wake up for the pending apply.
+            self._schedule_timed_recheck_deadline(
+                job_id="heating:rate_limit",
+                deadline=self._heating_last_apply_ts + _HEATING_MIN_SECONDS_BETWEEN_APPLIES,
+                owner="heating",
+                label="Heating apply rate-limit window end",
+            )
 
     def _queue_heating_runtime_events(
         self,
@@ -880,7 +1292,7 @@ class HeimaEngine:
             return
         self._schedule_timed_recheck_deadline(
             job_id="heating:vacation_curve",
-            deadline=time.monotonic() + delay_s,
+            deadline=self._clock.monotonic() + delay_s,
             owner="heating",
             label="Heating vacation curve recheck",
         )
@@ -1000,7 +1412,7 @@ class HeimaEngine:
             return ("idle", "small_delta_skip", False, True, True, False)
 
         if self._heating_last_target_temp == target_temperature and self._heating_last_apply_ts is not None:
-            if (time.monotonic() - self._heating_last_apply_ts) < _HEATING_MIN_SECONDS_BETWEEN_APPLIES:
+            if (self._clock.monotonic() - self._heating_last_apply_ts) < _HEATING_MIN_SECONDS_BETWEEN_APPLIES:
                 return ("idle", "apply_rate_limited", False, True, False, True)
 
         return ("target_active", branch_reason, True, False, False, False)
@@ -1186,32 +1598,28 @@ class HeimaEngine:
         return parsed
 
     def _compute_lighting_intents(self, house_state: str, occupied_rooms: list[str]) -> dict[str, str]:
-        options = dict(self._entry.options)
         occupied = set(occupied_rooms)
-        room_configs = self._room_configs()
         lighting_intents: dict[str, str] = {}
         zone_trace: dict[str, dict[str, Any]] = {}
 
-        for zone in options.get(OPT_LIGHTING_ZONES, []):
-            zone_id = zone.get("zone_id")
-            if not zone_id:
+        for zone in self._config.zones:
+            zone_id = zone.zone_id
+            node = zone_node(zone_id)
+            if not self._node_needs_compute(node):
+                lighting_intents[zone_id] = self._node_cache[node]
+                zone_trace[zone_id] = self._lighting_zone_trace.get(zone_id, {})
                 continue
-            rooms = list(zone.get("rooms", []))
-            occupancy_capable_rooms = [
-                room_id
-                for room_id in rooms
-                if self._room_occupancy_mode(room_configs.get(room_id, {})) == "derived"
-            ]
-            zone_occupied = any(room_id in occupied for room_id in occupancy_capable_rooms)
+            zone_occupied = any(room_id in occupied for room_id in zone.occupancy_capable_rooms)
 
             select_key = f"heima_lighting_intent_{zone_id}"
             requested_intent = self._state.get_select(select_key) or "auto"
             final_intent = resolve_zone_intent(requested_intent, house_state, zone_occupied)
             lighting_intents[zone_id] = final_intent
-            zone_trace[str(zone_id)] = {
-                "zone_id": str(zone_id),
-                "rooms": rooms,
-                "occupancy_capable_rooms": occupancy_capable_rooms,
+            self._node_cache[node] = final_intent
+            zone_trace[zone_id] = {
+                "zone_id": zone_id,
+                "rooms": list(zone.rooms),
+                "occupancy_capable_rooms": list(zone.occupancy_capable_rooms),
                 "zone_occupied": zone_occupied,
                 "requested_intent": requested_intent,
                 "final_intent": final_intent,
@@ -1222,8 +1630,8 @@ class HeimaEngine:
         return lighting_intents
 
     def _build_apply_plan(self, snapshot: DecisionSnapshot) -> ApplyPlan:
-        room_maps = self._lighting_room_maps()
-        room_configs = self._room_configs()
+        room_maps = self._config.lighting_room_maps
+        config = self._config
         steps: list[ApplyStep] = []
         room_trace: dict[str, list[dict[str, Any]]] = {}
         room_winner_by_room: dict[str, dict[str, Any]] = {}
@@ -1311,16 +1719,15 @@ class HeimaEngine:
             return True
 
         for zone_id, intent in snapshot.lighting_intents.items():
-            for room_id in self._zone_rooms(zone_id):
+            for room_id in config.zone_rooms.get(zone_id, ()):
+                room_occupancy_mode = config.room_occupancy_mode(room_id)
                 decision: dict[str, Any] = {
                     "zone_id": zone_id,
                     "room_id": room_id,
                     "intent": intent,
                     "hold": False,
-                    "room_occupancy_mode": self._room_occupancy_mode(room_configs.get(room_id, {})),
-                    "contributes_to_zone_occupancy": (
-                        self._room_occupancy_mode(room_configs.get(room_id, {})) == "derived"
-                    ),
+                    "room_occupancy_mode": room_occupancy_mode,
+                    "contributes_to_zone_occupancy": room_occupancy_mode == "derived",
                     "room_mapping_found": False,
                     "action": None,
                     "action_params": None,
@@ -1347,7 +1754,8 @@ class HeimaEngine:
                 decision["scene_resolution"] = scene_resolution
                 if not scene_entity:
                     if intent == "off":
-                        area_id = str(room_configs.get(room_id, {}).get("area_id") or "").strip()
+                        room_cfg = config.rooms_by_id.get(room_id)
+                        area_id = room_cfg.area_id if room_cfg is not None else ""
                         if area_id:
                             action_fingerprint = f"light.turn_off:area:{area_id}"
                             if not self._should_apply_scene(room_id, action_fingerprint):
@@ -1499,7 +1907,7 @@ class HeimaEngine:
                         if isinstance(step.params.get("temperature"), (int, float))
                         else self._heating_last_target_temp
                     )
-                    self._heating_last_apply_ts = time.monotonic()
+                    self._heating_last_apply_ts = self._clock.monotonic()
                     self._state.set_sensor("heima_heating_last_applied_target", self._heating_last_target_temp)
                     continue
                 except ServiceNotFound:
@@ -1512,7 +1920,7 @@ class HeimaEngine:
                     continue
 
     def _should_apply_scene(self, room_id: str, scene_entity: str) -> bool:
-        now = time.monotonic()
+        now = self._clock.monotonic()
         last_scene = self._lighting_last_scene.get(room_id)
         last_ts = self._lighting_last_ts.get(room_id, 0.0)
 
@@ -1523,25 +1931,7 @@ class HeimaEngine:
 
     def _mark_scene_applied(self, room_id: str, scene_entity: str) -> None:
         self._lighting_last_scene[room_id] = scene_entity
-        self._lighting_last_ts[room_id] = time.monotonic()
-
-    def _lighting_room_maps(self) -> dict[str, dict[str, Any]]:
-        options = dict(self._entry.options)
-        mappings: dict[str, dict[str, Any]] = {}
-        for room_map in options.get(OPT_LIGHTING_ROOMS, []):
-            room_id = room_map.get("room_id")
-            if room_id:
-                mappings[str(room_id)] = dict(room_map)
-        return mappings
-
-    def _room_configs(self) -> dict[str, dict[str, Any]]:
-        options = dict(self._entry.options)
-        configs: dict[str, dict[str, Any]] = {}
-        for room in options.get(OPT_ROOMS, []):
-            room_id = room.get("room_id")
-            if room_id:
-                configs[str(room_id)] = dict(room)
-        return configs
+        self._lighting_last_ts[room_id] = self._clock.monotonic()
 
     def _queue_event(self, event: HeimaEvent) -> None:
         self._pending_events.append(event)
@@ -1614,10 +2004,10 @@ class HeimaEngine:
         )
 
     def _queue_occupancy_consistency_events(
-        self, *, anyone_home: bool, occupied_rooms: list[str], options: dict[str, Any]
+        self, *, anyone_home: bool, occupied_rooms: list[str]
     ) -> None:
-        mismatch_cfg = self._occupancy_mismatch_config()
-        policy = mismatch_cfg["policy"]
+        mismatch_cfg = self._config.notifications.occupancy_mismatch
+        policy = mismatch_cfg.policy
         if policy == "off":
             self._occupancy_home_no_room_since = None
             self._occupancy_home_no_room_emitted = False
@@ -1625,14 +2015,9 @@ class HeimaEngine:
             self._occupancy_room_no_home_emitted.clear()
             return
 
-        derived_rooms = [
-            str(room.get("room_id"))
-            for room in options.get(OPT_ROOMS, [])
-            if room.get("room_id") and self._room_occupancy_mode(room) == "derived"
-        ]
-        derived_room_count = len(derived_rooms)
-        persist_s = mismatch_cfg["persist_s"]
-        min_derived_rooms = mismatch_cfg["min_derived_rooms"]
+        derived_room_count = len(self._config.derived_room_ids)
+        persist_s = mismatch_cfg.persist_s
+        min_derived_rooms = mismatch_cfg.min_derived_rooms
 
         home_no_room_condition = anyone_home and not occupied_rooms
         if policy == "smart" and derived_room_count < min_derived_rooms:
@@ -1660,18 +2045,10 @@ class HeimaEngine:
                 )
             )
 
-        room_sources = {
-            str(room.get("room_id")): list(room.get("sources", []))
-            for room in options.get(OPT_ROOMS, [])
-            if room.get("room_id")
-        }
-
-        room_configs = self._room_configs()
         active_room_no_home = set()
         if occupied_rooms and not anyone_home:
             for room_id in occupied_rooms:
-                room_cfg = room_configs.get(room_id, {})
-                if self._room_occupancy_mode(room_cfg) != "derived":
+                if self._config.room_occupancy_mode(room_id) != "derived":
                     self._reset_persistent_room_condition(room_id)
                     continue
                 active_room_no_home.add(room_id)
@@ -1691,7 +2068,7 @@ class HeimaEngine:
                         context={
                             "room": room_id,
                             "anyone_home": anyone_home,
-                            "source_entities": room_sources.get(room_id, []),
+                            "source_entities": list(self._config.rooms_by_id[room_id].sources),
                             "policy": policy,
                             "persist_s": 0 if policy == "strict" else persist_s,
                         },
@@ -1707,30 +2084,26 @@ class HeimaEngine:
         *,
         anyone_home: bool,
         security_state: str,
-        options: dict[str, Any],
         people_home_list: list[str],
         occupied_rooms: list[str],
     ) -> None:
-        security_cfg = dict(options.get(OPT_SECURITY, {}))
-        if not security_cfg.get("enabled"):
+        if not self._config.security.enabled:
             self._security_armed_away_but_home_since = None
             self._security_armed_away_but_home_emitted = False
             return
 
-        mismatch_cfg = self._security_mismatch_config()
-        policy = mismatch_cfg["policy"]
+        mismatch_cfg = self._config.notifications.security_mismatch
+        policy = mismatch_cfg.policy
         if policy == "off":
             self._security_armed_away_but_home_since = None
             self._security_armed_away_but_home_emitted = False
             return
 
         mismatch_active = security_state == "armed_away" and anyone_home
-        persist_s = 0 if policy == "strict" else mismatch_cfg["persist_s"]
+        persist_s = 0 if policy == "strict" else mismatch_cfg.persist_s
 
-        room_configs = self._room_configs()
         has_room_evidence = any(
-            self._room_occupancy_mode(room_configs.get(room_id, {})) == "derived"
-            for room_id in occupied_rooms
+            self._config.room_occupancy_mode(room_id) == "derived" for room_id in occupied_rooms
         )
         has_anonymous_evidence = bool(self._state.get_binary("heima_anonymous_presence"))
         corroboration_inputs = [
@@ -1745,20 +2118,10 @@ class HeimaEngine:
                 reason="anonymous_presence_on" if has_anonymous_evidence else "anonymous_presence_off",
             ),
         ]
-        corroboration = self._normalizer.derive(
-            kind="boolean_signal",
-            inputs=corroboration_inputs,
-            strategy_cfg=build_signal_set_strategy_cfg_for_contract(
-                contract=SECURITY_CORROBORATION_STRATEGY_CONTRACT,
-            ),
-            context={"source": "security_corroboration"},
+        corroboration = self._fusions["security_corroboration"](corroboration_inputs)
+        self._security_corroboration_trace = self._trace_policy.trace(
+            self._render_fusion_trace, corroboration_inputs, corroboration
         )
-        self._security_corroboration_trace = {
-            "source_observations": [obs.as_dict() for obs in corroboration_inputs],
-            "fused_observation": corroboration.as_dict(),
-            "plugin_id": corroboration.plugin_id,
-            "used_plugin_fallback": corroboration.reason == "plugin_error_fallback",
-        }
         if policy == "smart":
             mismatch_active = mismatch_active and corroboration.state == "on"
 
@@ -1772,7 +2135,7 @@ class HeimaEngine:
                     message="Security is armed away while someone is home.",
                     context={
                         "security_state": security_state,
-                        "security_observation_reason": self._security_observation_trace.get("reason"),
+                        "security_observation_reason": render_trace(self._security_observation_trace).get("reason"),
                         "people_home_list": list(people_home_list),
                         "policy": policy,
                         "persist_s": persist_s,
@@ -1796,57 +2159,27 @@ class HeimaEngine:
         self._sync_event_sensors()
 
     async def _emit_event_obj(self, event: HeimaEvent) -> bool:
-        if not self._event_enabled(event):
-            category = self._event_category(event.type)
+        category = self._event_category(event.type)
+        if not self._category_enabled(category):
             self._suppressed_event_categories[category] = (
                 self._suppressed_event_categories.get(category, 0) + 1
             )
             _LOGGER.debug("Heima event suppressed by category toggle: %s (%s)", event.type, category)
             return False
-        notifications_cfg = self._notifications_config()
+        notifications_cfg = self._config.notifications
         return await self._events.async_emit(
             event,
-            routes=list(notifications_cfg.get("routes", [])),
-            recipients=dict(notifications_cfg.get("recipients", {})),
-            recipient_groups=dict(notifications_cfg.get("recipient_groups", {})),
-            route_targets=list(notifications_cfg.get("route_targets", [])),
-            dedup_window_s=int(notifications_cfg.get("dedup_window_s", 60)),
-            rate_limit_per_key_s=int(notifications_cfg.get("rate_limit_per_key_s", 300)),
+            routing=notifications_cfg.routing,
+            category=category,
+            dedup_window_s=notifications_cfg.dedup_window_s,
+            rate_limit_per_key_s=notifications_cfg.rate_limit_per_key_s,
+            digest_mode=notifications_cfg.digest_mode,
+            digest_window_s=notifications_cfg.digest_window_s,
+            digest_bypass_severity=notifications_cfg.digest_bypass_severity,
         )
 
-    def _notifications_config(self) -> dict[str, Any]:
-        return dict(dict(self._entry.options).get(OPT_NOTIFICATIONS, {}))
-
-    def _occupancy_mismatch_config(self) -> dict[str, Any]:
-        cfg = self._notifications_config()
-        policy = str(cfg.get("occupancy_mismatch_policy", DEFAULT_OCCUPANCY_MISMATCH_POLICY))
-        if policy not in {"off", "smart", "strict"}:
-            policy = DEFAULT_OCCUPANCY_MISMATCH_POLICY
-        return {
-            "policy": policy,
-            "min_derived_rooms": int(
-                cfg.get(
-                    "occupancy_mismatch_min_derived_rooms",
-                    DEFAULT_OCCUPANCY_MISMATCH_MIN_DERIVED_ROOMS,
-                )
-            ),
-            "persist_s": int(
-                cfg.get("occupancy_mismatch_persist_s", DEFAULT_OCCUPANCY_MISMATCH_PERSIST_S)
-            ),
-        }
-
-    def _security_mismatch_config(self) -> dict[str, Any]:
-        cfg = self._notifications_config()
-        policy = str(cfg.get("security_mismatch_policy", DEFAULT_SECURITY_MISMATCH_POLICY))
-        if policy not in {"off", "smart", "strict"}:
-            policy = DEFAULT_SECURITY_MISMATCH_POLICY
-        return {
-            "policy": policy,
-            "persist_s": int(cfg.get("security_mismatch_persist_s", DEFAULT_SECURITY_MISMATCH_PERSIST_S)),
-        }
-
     def _persistent_condition_ready(self, *, key: str, active: bool, persist_s: int) -> bool:
-        now = time.monotonic()
+        now = self._clock.monotonic()
         if key == "home_no_room":
             if not active:
                 self._occupancy_home_no_room_since = None
@@ -1896,7 +2229,7 @@ class HeimaEngine:
         self._occupancy_room_no_home_emitted.discard(room_id)
 
     def _persistent_security_mismatch_ready(self, *, active: bool, persist_s: int) -> bool:
-        now = time.monotonic()
+        now = self._clock.monotonic()
         if not active:
             self._security_armed_away_but_home_since = None
             self._security_armed_away_but_home_emitted = False
@@ -1921,22 +2254,14 @@ class HeimaEngine:
         prefix = str(event_type or "").split(".", 1)[0]
         return prefix or "system"
 
-    def _enabled_event_categories(self) -> set[str]:
-        cfg = self._notifications_config()
-        raw = cfg.get("enabled_event_categories")
-        if raw is None:
-            return set(DEFAULT_ENABLED_EVENT_CATEGORIES) | {"system"}
-        enabled = {str(v) for v in list(raw) if str(v)}
-        enabled.add("system")  # system is always enabled by spec
-        return enabled
+    def _enabled_event_categories(self) -> frozenset[str]:
+        return self._config.notifications.enabled_event_categories
 
-    def _event_enabled(self, event: HeimaEvent) -> bool:
-        category = self._event_category(event.type)
+    def _category_enabled(self, category: str) -> bool:
         if category == "system":
             return True
         # Unknown/custom categories (e.g. debug.manual_test) stay enabled unless explicitly standardized.
-        known_categories = set(EVENT_CATEGORIES_ALL)
-        if category not in known_categories:
+        if category not in _KNOWN_EVENT_CATEGORIES:
             return True
         return category in self._enabled_event_categories()
 
@@ -1968,12 +2293,7 @@ class HeimaEngine:
             )
 
     def _lighting_apply_mode(self) -> str:
-        mode = str(
-            dict(self._entry.options).get(OPT_LIGHTING_APPLY_MODE, DEFAULT_LIGHTING_APPLY_MODE)
-        )
-        if mode not in {"scene", "delegate"}:
-            return DEFAULT_LIGHTING_APPLY_MODE
-        return mode
+        return self._config.lighting_apply_mode
 
     def _is_lighting_room_hold_on(self, room_id: str) -> bool:
         key = f"heima_lighting_manual_hold_{room_id}"
@@ -1981,7 +2301,7 @@ class HeimaEngine:
         return bool(value)
 
     async def _emit_lighting_hold_events(self) -> None:
-        for room_id, room_map in self._lighting_room_maps().items():
+        for room_id, room_map in self._config.lighting_room_maps.items():
             if not room_map.get("enable_manual_hold", True):
                 continue
 
@@ -2009,32 +2329,41 @@ class HeimaEngine:
                 )
             )
 
-    def _compute_named_person_presence(self, person_cfg: dict[str, Any]) -> tuple[bool, str, int]:
-        method = person_cfg.get("presence_method", "ha_person")
+    def _compute_named_person_presence(
+        self,
+        person_cfg: CompiledPerson,
+        *,
+        fused_sources: tuple[list[NormalizedObservation], DerivedObservation] | None = None,
+    ) -> tuple[bool, str, int]:
+        method = person_cfg.presence_method
         if method == "ha_person":
-            entity_id = person_cfg.get("person_entity")
-            is_home = self._is_entity_home(entity_id)
+            is_home = self._is_entity_home(person_cfg.person_entity)
             return is_home, "ha_person", 100 if is_home else 0
 
         if method == "quorum":
-            sources = list(person_cfg.get("sources", []))
-            required = int(person_cfg.get("required", 1))
-            slug = str(person_cfg.get("slug", ""))
-            trace_key = f"person:{slug}" if slug else "person:unknown"
             fused, active_count = self._compute_group_presence(
-                sources,
-                required,
-                strategy=str(person_cfg.get("group_strategy", "quorum") or "quorum"),
-                weight_threshold=person_cfg.get("weight_threshold"),
-                source_weights=person_cfg.get("source_weights"),
-                trace_key=trace_key,
+                list(person_cfg.sources),
+                person_cfg.required,
+                strategy=person_cfg.group_strategy,
+                weight_threshold=person_cfg.weight_threshold,
+                source_weights=person_cfg.source_weights,
+                trace_key=f"person:{person_cfg.slug}",
+                fusion=self._fusions[f"person:{person_cfg.slug}"],
+                fused_sources=fused_sources,
+                stale_after_s=person_cfg.source_stale_s,
+            )
+            self._schedule_source_stale_recheck(
+                job_id=f"presence:stale:{person_cfg.slug}",
+                sources=person_cfg.sources,
+                stale_after_s=person_cfg.source_stale_s,
+                owner="presence",
+                label=f"Presence source staleness ({person_cfg.slug})",
             )
             is_home = fused.state == "on"
             confidence = int(fused.confidence)
             return is_home, "quorum", confidence
 
-        slug = str(person_cfg.get("slug", ""))
-        override = self._state.get_select(f"heima_person_{slug}_override")
+        override = self._state.get_select(f"heima_person_{person_cfg.slug}_override")
         if override == "force_home":
             return True, "manual", 100
         if override == "force_away":
@@ -2047,69 +2376,101 @@ class HeimaEngine:
         required: int,
         *,
         strategy: str = "quorum",
-        weight_threshold: Any = None,
-        source_weights: Any = None,
+        weight_threshold: float | None = None,
+        source_weights: Mapping[str, float] | None = None,
         trace_key: str | None = None,
+        fusion: CompiledFusion | None = None,
+        fused_sources: tuple[list[NormalizedObservation], DerivedObservation] | None = None,
+        stale_after_s: int | None = None,
     ) -> tuple[DerivedObservation, int]:
-        observations = [self._normalizer.presence(entity_id) for entity_id in sources]
-        active_count = sum(1 for obs in observations if obs.state == "on")
         group_strategy = str(strategy or "quorum")
-        strategy_cfg = build_signal_set_strategy_cfg_for_contract(
-            contract=GROUP_PRESENCE_STRATEGY_CONTRACT,
-            strategy=group_strategy,
-            required=int(required),
-            weight_threshold=weight_threshold,
-            source_weights=source_weights,
-            fallback_state="off",
-        )
-        fused = self._normalizer.derive(
-            kind="presence",
-            inputs=observations,
-            strategy_cfg=strategy_cfg,
-            context={"source": "group_presence"},
-        )
+        if fused_sources is not None:
+            observations, fused = fused_sources
+        else:
+            observations = self._presence_observations(sources, stale_after_s)
+            if fusion is None:
+                fusion = self._compile_group_presence_fusion(
+                    required=required,
+                    strategy=group_strategy,
+                    weight_threshold=weight_threshold,
+                    source_weights=source_weights,
+                )
+            fused = fusion(observations)
+        active_count = sum(1 for obs in observations if obs.state == "on" and not obs.stale)
         if trace_key:
-            self._group_presence_trace[trace_key] = {
-                "source_observations": [obs.as_dict() for obs in observations],
-                "fused_observation": fused.as_dict(),
-                "plugin_id": fused.plugin_id,
-                "group_strategy": group_strategy,
-                "required": int(required),
-                "weight_threshold": (
-                    float(weight_threshold)
-                    if group_strategy == "weighted_quorum" and weight_threshold not in (None, "")
-                    else None
-                ),
-                "configured_source_weights": (
-                    dict(source_weights) if group_strategy == "weighted_quorum" and isinstance(source_weights, dict) else {}
-                ),
-                "active_count": active_count,
-                "used_plugin_fallback": fused.reason == "plugin_error_fallback",
-            }
+            self._group_presence_trace[trace_key] = self._trace_policy.trace(
+                self._render_group_presence_trace,
+                observations,
+                fused,
+                group_strategy,
+                required,
+                weight_threshold,
+                source_weights,
+                active_count,
+            )
         return fused, active_count
 
-    def _compute_house_signal(self, trace_key: str, entity_ids: list[str]) -> bool:
-        observations = [self._normalizer.boolean_signal(entity_id) for entity_id in entity_ids]
-        fused = self._normalizer.derive(
-            kind="boolean_signal",
-            inputs=observations,
-            strategy_cfg=build_signal_set_strategy_cfg_for_contract(
-                contract=HOUSE_SIGNAL_STRATEGY_CONTRACT,
-            ),
-            context={"source": "house_signal", "signal": trace_key},
-        )
-        self._house_signals_trace[trace_key] = {
-            "configured_entities": list(entity_ids),
+    @staticmethod
+    def _render_fusion_trace(
+        observations: list[NormalizedObservation],
+        fused: DerivedObservation,
+    ) -> dict[str, Any]:
+        return {
             "source_observations": [obs.as_dict() for obs in observations],
             "fused_observation": fused.as_dict(),
             "plugin_id": fused.plugin_id,
             "used_plugin_fallback": fused.reason == "plugin_error_fallback",
         }
+
+    @staticmethod
+    def _render_group_presence_trace(
+        observations: list[NormalizedObservation],
+        fused: DerivedObservation,
+        group_strategy: str,
+        required: int,
+        weight_threshold: float | None,
+        source_weights: Mapping[str, float] | None,
+        active_count: int,
+    ) -> dict[str, Any]:
+        return {
+            "source_observations": [obs.as_dict() for obs in observations],
+            "fused_observation": fused.as_dict(),
+            "plugin_id": fused.plugin_id,
+            "group_strategy": group_strategy,
+            "required": int(required),
+            "weight_threshold": weight_threshold if group_strategy == "weighted_quorum" else None,
+            "configured_source_weights": (
+                dict(source_weights or {}) if group_strategy == "weighted_quorum" else {}
+            ),
+            "active_count": active_count,
+            "used_plugin_fallback": fused.reason == "plugin_error_fallback",
+        }
+
+    def _compute_house_signal(self, trace_key: str, entity_ids: list[str]) -> bool:
+        observations = [self._normalizer.boolean_signal(entity_id) for entity_id in entity_ids]
+        fused = self._fusions[f"house_signal:{trace_key}"](observations)
+        self._house_signals_trace[trace_key] = self._trace_policy.trace(
+            self._render_house_signal_trace, entity_ids, observations, fused
+        )
         return fused.state == "on"
 
-    def _compute_room_occupancy(self, room_cfg: dict[str, Any]) -> tuple[bool, dict[str, Any]]:
-        room_id = str(room_cfg.get("room_id", ""))
-        mode = self._room_occupancy_mode(room_cfg)
+    @classmethod
+    def _render_house_signal_trace(
+        cls,
+        entity_ids: list[str],
+        observations: list[NormalizedObservation],
+        fused: DerivedObservation,
+    ) -> dict[str, Any]:
+        return {"configured_entities": list(entity_ids), **cls._render_fusion_trace(observations, fused)}
+
+    def _compute_room_occupancy(
+        self,
+        room_cfg: CompiledRoom,
+        *,
+        fused_sources: tuple[list[NormalizedObservation], DerivedObservation] | None = None,
+    ) -> tuple[bool, dict[str, Any] | LazyTrace]:
+        room_id = room_cfg.room_id
+        mode = room_cfg.occupancy_mode
         if mode == "none":
             return False, {
                 "room_id": room_id,
@@ -2127,7 +2488,7 @@ class HeimaEngine:
                 "forced_off_by_max_on": False,
             }
 
-        sources = list(room_cfg.get("sources", []))
+        sources = list(room_cfg.sources)
         if not sources:
             return False, {
                 "room_id": room_id,
@@ -2139,40 +2500,36 @@ class HeimaEngine:
                 "candidate_since": None,
                 "effective_state": "off",
                 "effective_since": None,
-                "on_dwell_s": int(room_cfg.get("on_dwell_s", 5)),
-                "off_dwell_s": int(room_cfg.get("off_dwell_s", 120)),
-                "max_on_s": room_cfg.get("max_on_s"),
+                "on_dwell_s": room_cfg.on_dwell_s,
+                "off_dwell_s": room_cfg.off_dwell_s,
+                "max_on_s": room_cfg.max_on_s,
                 "forced_off_by_max_on": False,
             }
 
-        logic = str(room_cfg.get("logic", "any_of"))
-        observations = [self._normalizer.presence(entity_id) for entity_id in sources]
-        strategy_cfg = build_signal_set_strategy_cfg_for_contract(
-            contract=ROOM_OCCUPANCY_STRATEGY_CONTRACT,
-            strategy=logic,
-            weight_threshold=room_cfg.get("weight_threshold"),
-            source_weights=room_cfg.get("source_weights"),
-            fallback_state="off",
-        )
-        fused = self._normalizer.derive(
-            kind="presence",
-            inputs=observations,
-            strategy_cfg=strategy_cfg,
-            context={"room_id": room_id},
+        if fused_sources is not None:
+            observations, fused = fused_sources
+        else:
+            observations = self._presence_observations(sources, room_cfg.source_stale_s)
+            fused = self._fusions[f"room:{room_id}"](observations)
+        self._schedule_source_stale_recheck(
+            job_id=f"occupancy:stale:{room_id}",
+            sources=sources,
+            stale_after_s=room_cfg.source_stale_s,
+            owner="occupancy",
+            label=f"Occupancy source staleness ({room_id})",
         )
 
         candidate_state = fused.state if fused.state in {"on", "off"} else "unknown"
-        now = time.monotonic()
+        now = self._clock.monotonic()
         previous_candidate = self._occupancy_room_candidate_state.get(room_id)
         if previous_candidate != candidate_state:
             self._occupancy_room_candidate_state[room_id] = candidate_state
             self._occupancy_room_candidate_since[room_id] = now
 
         candidate_since = self._occupancy_room_candidate_since.get(room_id, now)
-        on_dwell_s = int(room_cfg.get("on_dwell_s", 5))
-        off_dwell_s = int(room_cfg.get("off_dwell_s", 120))
-        max_on_s_raw = room_cfg.get("max_on_s")
-        max_on_s = int(max_on_s_raw) if max_on_s_raw not in (None, "") else None
+        on_dwell_s = room_cfg.on_dwell_s
+        off_dwell_s = room_cfg.off_dwell_s
+        max_on_s = room_cfg.max_on_s
 
         effective_state = self._occupancy_room_effective_state.get(room_id)
         if effective_state is None:
@@ -2222,15 +2579,39 @@ class HeimaEngine:
                 )
         effective_since = self._occupancy_room_effective_since.get(room_id, now)
 
-        trace = {
-            "room_id": room_id,
-            "occupancy_mode": mode,
+        trace = self._trace_policy.trace(
+            self._render_room_occupancy_trace,
+            room_cfg,
+            observations,
+            fused,
+            candidate_state,
+            candidate_since,
+            effective_state,
+            effective_since,
+            forced_off_by_max_on,
+        )
+        return effective_state == "on", trace
+
+    @staticmethod
+    def _render_room_occupancy_trace(
+        room_cfg: CompiledRoom,
+        observations: list[NormalizedObservation],
+        fused: DerivedObservation,
+        candidate_state: str,
+        candidate_since: float,
+        effective_state: str,
+        effective_since: float,
+        forced_off_by_max_on: bool,
+    ) -> dict[str, Any]:
+        return {
+            "room_id": room_cfg.room_id,
+            "occupancy_mode": room_cfg.occupancy_mode,
             "source_observations": [obs.as_dict() for obs in observations],
             "fused_observation": fused.as_dict(),
             "plugin_id": fused.plugin_id,
             "used_plugin_fallback": fused.reason == "plugin_error_fallback",
             "configured_source_weights": (
-                dict(room_cfg.get("source_weights", {})) if logic == "weighted_quorum" else {}
+                dict(room_cfg.source_weights or {}) if room_cfg.logic == "weighted_quorum" else {}
             ),
             "effective_source_weights": dict(fused.evidence.get("weights", {}))
             if isinstance(fused.evidence, dict)
@@ -2244,7 +2625,7 @@ class HeimaEngine:
                         if isinstance(fused.evidence, dict)
                         else 1.0
                     ),
-                    "contributes_to_on": obs.state == "on",
+                    "contributes_to_on": obs.state == "on" and not obs.stale,
                 }
                 for obs in observations
             ],
@@ -2252,12 +2633,11 @@ class HeimaEngine:
             "candidate_since": candidate_since,
             "effective_state": effective_state,
             "effective_since": effective_since,
-            "on_dwell_s": on_dwell_s,
-            "off_dwell_s": off_dwell_s,
-            "max_on_s": max_on_s,
+            "on_dwell_s": room_cfg.on_dwell_s,
+            "off_dwell_s": room_cfg.off_dwell_s,
+            "max_on_s": room_cfg.max_on_s,
             "forced_off_by_max_on": forced_off_by_max_on,
         }
-        return effective_state == "on", trace
 
     def _is_entity_home(self, entity_id: str | None) -> bool:
         return self._normalizer.presence(entity_id).state == "on"
@@ -2271,22 +2651,11 @@ class HeimaEngine:
     def _apply_snapshot_to_canonical_state(self, snapshot: DecisionSnapshot) -> None:
         for zone_id in list(snapshot.lighting_intents.keys()):
             key = f"heima_occ_zone_{zone_id}"
-            zone_rooms = self._zone_rooms(zone_id)
+            zone_rooms = self._config.zone_rooms.get(zone_id, ())
             zone_is_on = any(room in snapshot.occupied_rooms for room in zone_rooms)
             if key in self._state.binary_sensors:
                 self._state.set_binary(key, zone_is_on)
 
-    def _zone_rooms(self, zone_id: str) -> list[str]:
-        options = dict(self._entry.options)
-        for zone in options.get(OPT_LIGHTING_ZONES, []):
-            if zone.get("zone_id") == zone_id:
-                return list(zone.get("rooms", []))
-        return []
-
-    def _room_occupancy_mode(self, room_cfg: dict[str, Any]) -> str:
-        mode = str(room_cfg.get("occupancy_mode", "derived") or "derived")
-        return mode if mode in {"derived", "none"} else "derived"
-
     def diagnostics(self) -> dict[str, Any]:
         return {
             "snapshot": self._snapshot.as_dict(),
@@ -2314,18 +2683,20 @@ class HeimaEngine:
             "heating": dict(self._heating_trace),
             "events": self._events.stats.as_dict(),
             "presence": {
-                "group_trace": dict(self._group_presence_trace),
+                "group_trace": {key: render_trace(trace) for key, trace in self._group_presence_trace.items()},
             },
             "house_signals": {
-                "trace": dict(self._house_signals_trace),
+                "trace": {key: render_trace(trace) for key, trace in self._house_signals_trace.items()},
             },
             "occupancy": {
-                "room_trace": dict(self._occupancy_room_trace),
+                "room_trace": {key: render_trace(trace) for key, trace in self._occupancy_room_trace.items()},
             },
             "security": {
-                "observation_trace": dict(self._security_observation_trace),
-                "corroboration_trace": dict(self._security_corroboration_trace),
+                "observation_trace": dict(render_trace(self._security_observation_trace)),
+                "corroboration_trace": dict(render_trace(self._security_corroboration_trace)),
             },
+            "traces": self._trace_policy.diagnostics(),
+            "history": self._history.diagnostics(),
             "house_state_override": {
                 "house_state_override": self._house_state_override,
                 "house_state_override_active": self._house_state_override is not None,
@@ -2333,4 +2704,15 @@ class HeimaEngine:
                 "house_state_override_last_change_ts": self._house_state_override_last_change_ts,
             },
             "normalization": self._normalizer.diagnostics(),
+            "incremental": {
+                "last_evaluation": dict(self._evaluation_trace),
+                "counts": dict(self._evaluation_counts),
+                "indexed_entities": len(self._dependency_index.entity_nodes),
+            },
+            "latency": self._latency.diagnostics(),
+            "fingerprint": {
+                **self._fingerprint_counts,
+                "last_result": self._fingerprint_last_result,
+                "tracked_entities": len(self._fingerprint_entity_ids),
+            },
         }
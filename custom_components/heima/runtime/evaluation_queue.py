@@ -0,0 +1,174 @@
+"""Coalescing single-flight evaluation queue for the Heima coordinator."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _EvaluationBatch:
+    """Triggers merged into one pending evaluation."""
+
+    reasons: dict[str, None] = field(default_factory=dict)
+    waiter: asyncio.Future | None = None
+
+    def add(self, reason: str) -> None:
+        self.reasons.setdefault(reason, None)
+
+    def waiter_future(self) -> asyncio.Future:
+        if self.waiter is None:
+            self.waiter = asyncio.get_running_loop().create_future()
+        return self.waiter
+
+    def resolve(self, exc: BaseException | None = None) -> bool:
+        """Resolve awaiting callers; return False when nobody was waiting."""
+        if self.waiter is None or self.waiter.done():
+            return False
+        if exc is None:
+            self.waiter.set_result(None)
+        elif isinstance(exc, asyncio.CancelledError):
+            self.waiter.cancel()
+        else:
+            self.waiter.set_exception(exc)
+        return True
+
+
+@dataclass
+class EvaluationQueueStats:
+    """Counters exposed in diagnostics."""
+
+    requested: int = 0
+    coalesced: int = 0
+    evaluations: int = 0
+    failures: int = 0
+    max_batch_size: int = 0
+    last_batch_reasons: list[str] = field(default_factory=list)
+    last_duration_ms: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "evaluations": self.evaluations,
+            "failures": self.failures,
+            "max_batch_size": self.max_batch_size,
+            "last_batch_reasons": list(self.last_batch_reasons),
+            "last_duration_ms": self.last_duration_ms,
+        }
+
+
+class EvaluationQueue:
+    """Runs at most one evaluation at a time with at most one pending behind it.
+
+    Triggers that arrive while an evaluation is running are merged into the
+    single pending batch, which records every distinct reason it absorbed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        run: Callable[[tuple[str, ...]], Awaitable[None]],
+        debounce_s: float = 0.0,
+    ) -> None:
+        self._hass = hass
+        self._run = run
+        self._debounce_s = max(0.0, float(debounce_s))
+        self._pending: _EvaluationBatch | None = None
+        self._running: _EvaluationBatch | None = None
+        self._worker: asyncio.Task | None = None
+        self._stats = EvaluationQueueStats()
+
+    @property
+    def debounce_s(self) -> float:
+        return self._debounce_s
+
+    def set_debounce(self, debounce_s: float) -> None:
+        self._debounce_s = max(0.0, float(debounce_s))
+
+    def request(self, reason: str) -> None:
+        """Queue an evaluation without waiting for it (safe from callbacks)."""
+        self._enqueue(reason, wait=False)
+
+    async def async_request(self, reason: str) -> None:
+        """Queue an evaluation and wait until the batch covering it has run."""
+        waiter = self._enqueue(reason, wait=True)
+        if waiter is not None:
+            await waiter
+
+    async def async_shutdown(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.resolve(asyncio.CancelledError())
+        worker, self._worker = self._worker, None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "debounce_s": self._debounce_s,
+            "running": self._running is not None,
+            "running_reasons": list(self._running.reasons) if self._running else [],
+            "pending_reasons": list(self._pending.reasons) if self._pending else [],
+            "stats": self._stats.as_dict(),
+        }
+
+    def _enqueue(self, reason: str, *, wait: bool) -> asyncio.Future | None:
+        self._stats.requested += 1
+        if self._pending is None:
+            self._pending = _EvaluationBatch()
+        else:
+            self._stats.coalesced += 1
+        self._pending.add(reason)
+        # The waiter must exist before the worker starts: tasks may start eagerly.
+        waiter = self._pending.waiter_future() if wait else None
+        if self._worker is None or self._worker.done():
+            self._worker = self._hass.async_create_task(self._async_drain())
+        return waiter
+
+    async def _async_drain(self) -> None:
+        try:
+            while self._pending is not None:
+                if self._debounce_s > 0:
+                    await asyncio.sleep(self._debounce_s)
+                batch, self._pending = self._pending, None
+                if batch is None:
+                    continue
+                await self._async_run_batch(batch)
+        finally:
+            if self._worker is asyncio.current_task():
+                self._worker = None
+
+    async def _async_run_batch(self, batch: _EvaluationBatch) -> None:
+        reasons = tuple(batch.reasons)
+        self._running = batch
+        self._stats.evaluations += 1
+        self._stats.max_batch_size = max(self._stats.max_batch_size, len(reasons))
+        self._stats.last_batch_reasons = list(reasons)
+        started = time.monotonic()
+        try:
+            await self._run(reasons)
+        except asyncio.CancelledError as exc:
+            batch.resolve(exc)
+            raise
+        except Exception as exc:  # noqa: BLE001
+            self._stats.failures += 1
+            if not batch.resolve(exc):
+                _LOGGER.exception("Heima evaluation failed for %s", ", ".join(reasons))
+        else:
+            batch.resolve()
+        finally:
+            self._stats.last_duration_ms = round((time.monotonic() - started) * 1000, 3)
+            self._running = None
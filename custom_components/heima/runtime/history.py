@@ -0,0 +1,142 @@
+"""Bounded in-memory history of decision snapshots, stored as deltas."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable
+
+from .latency import split_reasons
+from .snapshot import DecisionSnapshot
+
+DEFAULT_SNAPSHOT_HISTORY_SIZE = 2000
+
+_NO_ROOMS: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotDelta:
+    """What one evaluation changed compared with the previous snapshot.
+
+    ``house_state`` and ``security_state`` are None when unchanged;
+    ``lighting_intents`` only holds zones whose intent changed.
+    """
+
+    at: datetime
+    reason: str
+    snapshot_id: str
+    house_state: str | None
+    security_state: str | None
+    rooms_occupied: tuple[str, ...]
+    rooms_vacated: tuple[str, ...]
+    lighting_intents: tuple[tuple[str, str], ...]
+    people_count: int
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.house_state is not None
+            or self.security_state is not None
+            or self.rooms_occupied
+            or self.rooms_vacated
+            or self.lighting_intents
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ts": self.at.isoformat(),
+            "reason": self.reason,
+            "snapshot_id": self.snapshot_id,
+            "house_state": self.house_state,
+            "security_state": self.security_state,
+            "rooms_occupied": list(self.rooms_occupied),
+            "rooms_vacated": list(self.rooms_vacated),
+            "lighting_intents": dict(self.lighting_intents),
+            "people_count": self.people_count,
+        }
+
+
+def _room_changes(previous: Iterable[str], current: Iterable[str]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    before, after = set(previous), set(current)
+    if before == after:
+        return _NO_ROOMS, _NO_ROOMS
+    return tuple(sorted(after - before)), tuple(sorted(before - after))
+
+
+class SnapshotHistory:
+    """Ring buffer of the last ``max_entries`` evaluations as snapshot deltas."""
+
+    def __init__(self, max_entries: int = DEFAULT_SNAPSHOT_HISTORY_SIZE) -> None:
+        self._entries: deque[SnapshotDelta] = deque(maxlen=max(1, int(max_entries)))
+        self._recorded = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(
+        self,
+        *,
+        previous: DecisionSnapshot,
+        current: DecisionSnapshot,
+        reason: str,
+        at: datetime,
+    ) -> SnapshotDelta:
+        rooms_occupied, rooms_vacated = _room_changes(previous.occupied_rooms, current.occupied_rooms)
+        previous_intents = previous.lighting_intents
+        delta = SnapshotDelta(
+            at=at,
+            reason=reason,
+            snapshot_id=current.snapshot_id,
+            house_state=current.house_state if current.house_state != previous.house_state else None,
+            security_state=current.security_state if current.security_state != previous.security_state else None,
+            rooms_occupied=rooms_occupied,
+            rooms_vacated=rooms_vacated,
+            lighting_intents=tuple(
+                sorted(
+                    (zone_id, intent)
+                    for zone_id, intent in current.lighting_intents.items()
+                    if previous_intents.get(zone_id) != intent
+                )
+            ),
+            people_count=current.people_count,
+        )
+        self._entries.append(delta)
+        self._recorded += 1
+        return delta
+
+    def query(
+        self,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        room: str | None = None,
+        reason: str | None = None,
+        changed_only: bool = False,
+        limit: int | None = None,
+    ) -> list[SnapshotDelta]:
+        """Return matching entries, oldest first; ``limit`` keeps the newest ones.
+
+        ``reason`` matches as a prefix, e.g. ``scheduler:`` or ``state_changed:binary_sensor.``,
+        against each reason merged into the evaluation.
+        """
+        matches = [
+            entry
+            for entry in self._entries
+            if (since is None or entry.at >= since)
+            and (until is None or entry.at <= until)
+            and (room is None or room in entry.rooms_occupied or room in entry.rooms_vacated)
+            and (reason is None or any(part.startswith(reason) for part in split_reasons(entry.reason)))
+            and (not changed_only or entry.changed)
+        ]
+        if limit is not None and len(matches) > limit:
+            matches = matches[-limit:]
+        return matches
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self._entries.maxlen,
+            "recorded": self._recorded,
+            "oldest": self._entries[0].at.isoformat() if self._entries else None,
+        }
@@ -0,0 +1,160 @@
+"""Per-stage evaluation timing and rolling latency histograms."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Iterable
+
+EVALUATION_STAGES = (
+    "fingerprint",
+    "people",
+    "anonymous",
+    "rooms",
+    "security",
+    "house_signals",
+    "house_state",
+    "lighting_intents",
+    "heating",
+    "apply_plan",
+    "apply_execution",
+    "events",
+)
+
+REASON_PREFIXES = ("state_changed", "state_reported", "scheduler", "service")
+
+# Joins the reasons of one coalesced evaluation batch, in arrival order.
+REASON_SEPARATOR = " + "
+
+DEFAULT_WINDOW = 200
+
+
+def merge_reasons(reasons: Iterable[str]) -> str:
+    """Combine the distinct reasons of a batch into one reason string."""
+    return REASON_SEPARATOR.join(dict.fromkeys(reasons))
+
+
+def split_reasons(reason: str) -> tuple[str, ...]:
+    return tuple(reason.split(REASON_SEPARATOR))
+
+
+def reason_prefix(reason: str) -> str:
+    """Group a trigger reason by its prefix; unknown prefixes fall into ``other``.
+
+    A merged reason maps to its sorted distinct prefixes, e.g. ``service+state_changed``.
+    """
+    prefixes = sorted(
+        {
+            prefix if prefix in REASON_PREFIXES else "other"
+            for prefix in (part.split(":", 1)[0] for part in split_reasons(reason))
+        }
+    )
+    return "+".join(prefixes)
+
+
+class RollingHistogram:
+    """Keeps the last ``window`` samples and reports percentiles over them."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._count = 0
+
+    def add(self, value_ms: float) -> None:
+        self._samples.append(value_ms)
+        self._count += 1
+
+    def percentiles(self) -> dict[str, Any]:
+        ordered = sorted(self._samples)
+        return {
+            "count": self._count,
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "p99": _percentile(ordered, 0.99),
+            "max": round(ordered[-1], 3) if ordered else None,
+        }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float | None:
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return round(ordered[index], 3)
+
+
+class StageClock:
+    """Attributes elapsed time to named stages by lapping a monotonic clock."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._started = clock()
+        self._last = self._started
+        self.stages: dict[str, float] = {}
+
+    def lap(self, stage: str) -> None:
+        """Charge the time since the previous lap to ``stage`` (stages accumulate)."""
+        now = self._clock()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def total_ms(self) -> float:
+        return (self._last - self._started) * 1000
+
+
+class EvaluationLatency:
+    """Rolling p50/p95/p99 per stage and per trigger reason prefix."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._window = window
+        self._stages: dict[str, RollingHistogram] = {}
+        self._reasons: dict[str, dict[str, RollingHistogram]] = {}
+        self._last: dict[str, Any] = {}
+
+    def record(self, reason: str, clock: StageClock) -> None:
+        prefix = reason_prefix(reason)
+        by_reason = self._reasons.setdefault(prefix, {})
+        for stage, duration_ms in clock.stages.items():
+            self._histogram(self._stages, stage).add(duration_ms)
+            self._histogram(by_reason, stage).add(duration_ms)
+        total_ms = clock.total_ms()
+        self._histogram(self._stages, "total").add(total_ms)
+        self._histogram(by_reason, "total").add(total_ms)
+        self._last = {
+            "reason": reason,
+            "reason_prefix": prefix,
+            "total_ms": round(total_ms, 3),
+            "stages_ms": {stage: round(value, 3) for stage, value in clock.stages.items()},
+        }
+
+    def _histogram(self, table: dict[str, RollingHistogram], key: str) -> RollingHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = RollingHistogram(self._window)
+        return histogram
+
+    @property
+    def last(self) -> dict[str, Any]:
+        return dict(self._last)
+
+    def sensor_attributes(self) -> dict[str, Any]:
+        """Compact summary for the optional latency sensor."""
+        total = self._stages.get("total")
+        attrs: dict[str, Any] = dict(total.percentiles()) if total else {}
+        attrs["last_reason"] = self._last.get("reason")
+        attrs["stage_p95_ms"] = {
+            stage: self._stages[stage].percentiles()["p95"]
+            for stage in EVALUATION_STAGES
+            if stage in self._stages
+        }
+        return attrs
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "window": self._window,
+            "last": self.last,
+            "stages": {stage: histogram.percentiles() for stage, histogram in self._stages.items()},
+            "reasons": {
+                prefix: {stage: histogram.percentiles() for stage, histogram in table.items()}
+                for prefix, table in self._reasons.items()
+            },
+        }
@@ -1,10 +1,11 @@
 """Normalization layer public exports (N1 foundation)."""
 
-from .contracts import DerivedObservation, NormalizedObservation
+from .contracts import FUSION_PLUGIN_API_VERSION, DerivedObservation, NormalizedObservation
 from .registry import NormalizationFusionRegistry
 from .service import InputNormalizer
 
 __all__ = [
+    "FUSION_PLUGIN_API_VERSION",
     "DerivedObservation",
     "InputNormalizer",
     "NormalizationFusionRegistry",
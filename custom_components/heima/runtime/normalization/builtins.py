@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import sys
+import time
 from dataclasses import dataclass
 from typing import Any
 
-from .contracts import DerivedObservation, NormalizedObservation
+from .contracts import FUSION_PLUGIN_API_VERSION, DerivedObservation, FusionGroup, NormalizedObservation
 
 
 def _input_refs(inputs: list[NormalizedObservation]) -> list[str]:
@@ -30,35 +32,61 @@ def _mk_derived(
     raw_state: str | None = None,
 ) -> DerivedObservation:
     return DerivedObservation(
-        kind=kind,
-        state=state,
+        kind=sys.intern(kind),
+        state=sys.intern(state),
         confidence=max(0, min(100, int(confidence))),
         raw_state=raw_state,
         source_entity_id=None,
+        # A fused result is as recent as its newest input, on the normalizer's clock.
+        observed_at=max((obs.observed_at for obs in inputs), default=None) or time.time(),
         stale=stale,
         available=available,
-        reason=reason,
+        reason=sys.intern(reason),
         inputs=_input_refs(inputs),
         fusion_strategy=strategy,
         plugin_id=plugin_id,
-        plugin_api_version=1,
-        evidence=dict(evidence or {}),
+        evidence=evidence if evidence is not None else {},
     )
 
 
-def _input_weight(obs: NormalizedObservation, *, index: int, weights: dict[str, Any]) -> float:
-    ref = obs.source_entity_id or f"input_{index}"
-    value = weights.get(ref, weights.get(str(index), 1))
-    try:
-        return max(0.0, float(value))
-    except (TypeError, ValueError):
-        return 1.0
+def _tally_states(groups: list[FusionGroup]) -> list[tuple[int, int, int]]:
+    """Count on/off/stale inputs for every group in one pass over a shared state table.
+
+    Observations shared between groups (the same sensor bound to several
+    rooms or people) are classified once.
+    """
+    table: dict[int, int] = {}
+    counts: list[tuple[int, int, int]] = []
+    for group in groups:
+        on_count = off_count = stale_count = 0
+        for obs in group.inputs:
+            code = table.get(id(obs))
+            if code is None:
+                if obs.stale:
+                    code = 3
+                else:
+                    code = 1 if obs.state == "on" else (2 if obs.state == "off" else 0)
+                table[id(obs)] = code
+            if code == 1:
+                on_count += 1
+            elif code == 2:
+                off_count += 1
+            elif code == 3:
+                stale_count += 1
+        counts.append((on_count, off_count, stale_count))
+    return counts
+
+
+def _input_weight(obs: NormalizedObservation, *, index: int, weights: dict[str, float]) -> float:
+    # Weights are non-negative floats from build_signal_set_strategy_cfg.
+    weight = weights.get(obs.source_entity_id or f"input_{index}")
+    return weights.get(str(index), 1.0) if weight is None else weight
 
 
 @dataclass(frozen=True)
 class DirectFusionPlugin:
     plugin_id: str = "builtin.direct"
-    plugin_api_version: int = 1
+    plugin_api_version: int = FUSION_PLUGIN_API_VERSION
     supported_kinds: tuple[str, ...] = ()
 
     def derive(
@@ -102,7 +130,7 @@ class BooleanSetFusionPlugin:
 
     plugin_id: str
     strategy_name: str
-    plugin_api_version: int = 1
+    plugin_api_version: int = FUSION_PLUGIN_API_VERSION
     supported_kinds: tuple[str, ...] = ("presence", "boolean_signal")
 
     def derive(
@@ -113,7 +141,32 @@ class BooleanSetFusionPlugin:
         strategy_cfg: dict[str, Any] | None = None,
         context: dict[str, Any] | None = None,
     ) -> DerivedObservation:
-        strategy_cfg = dict(strategy_cfg or {})
+        on_count = off_count = stale_count = 0
+        for obs in inputs:
+            if obs.stale:
+                stale_count += 1
+            elif obs.state == "on":
+                on_count += 1
+            elif obs.state == "off":
+                off_count += 1
+        return self._derive_counted(kind, inputs, strategy_cfg or {}, on_count, off_count, stale_count)
+
+    def derive_many(self, *, kind: str, groups: list[FusionGroup]) -> list[DerivedObservation]:
+        return [
+            self._derive_counted(kind, group.inputs, group.strategy_cfg, *counts)
+            for group, counts in zip(groups, _tally_states(groups))
+        ]
+
+    def _derive_counted(
+        self,
+        kind: str,
+        inputs: list[NormalizedObservation],
+        strategy_cfg: dict[str, Any],
+        on_count: int,
+        off_count: int,
+        stale_count: int,
+    ) -> DerivedObservation:
+        """Fuse pre-counted inputs; stale inputs are discounted entirely."""
         if not inputs:
             return _mk_derived(
                 kind=kind,
@@ -126,9 +179,29 @@ class BooleanSetFusionPlugin:
                 available=False,
             )
 
-        on_count = sum(1 for obs in inputs if obs.state == "on")
-        off_count = sum(1 for obs in inputs if obs.state == "off")
-        unknown_count = len(inputs) - on_count - off_count
+        fresh_count = len(inputs) - stale_count
+        unknown_count = fresh_count - on_count - off_count
+        evidence: dict[str, Any] = {
+            "on_count": on_count,
+            "off_count": off_count,
+            "unknown_count": unknown_count,
+            "required": strategy_cfg.get("required"),
+        }
+        if stale_count:
+            evidence["stale_count"] = stale_count
+        if fresh_count == 0:
+            return _mk_derived(
+                kind=kind,
+                state="off",
+                confidence=0,
+                inputs=inputs,
+                strategy=self.strategy_name,
+                plugin_id=self.plugin_id,
+                reason="all_inputs_stale",
+                evidence=evidence,
+                available=all(obs.available for obs in inputs),
+                stale=True,
+            )
 
         if self.strategy_name == "any_of":
             state = "on" if on_count > 0 else ("off" if unknown_count == 0 else "unknown")
@@ -141,7 +214,7 @@ class BooleanSetFusionPlugin:
             if on_count >= required:
                 state = "on"
                 reason = "quorum_reached"
-            elif off_count == len(inputs):
+            elif off_count == fresh_count:
                 state = "off"
                 reason = "all_off"
             else:
@@ -150,7 +223,7 @@ class BooleanSetFusionPlugin:
         else:
             raise ValueError(f"Unsupported built-in boolean fusion strategy: {self.strategy_name}")
 
-        confidence = int((on_count / max(1, len(inputs))) * 100) if state == "on" else (100 if state == "off" else 0)
+        confidence = int((on_count / max(1, fresh_count)) * 100) if state == "on" else (100 if state == "off" else 0)
         return _mk_derived(
             kind=kind,
             state=state,
@@ -159,14 +232,9 @@ class BooleanSetFusionPlugin:
             strategy=self.strategy_name,
             plugin_id=self.plugin_id,
             reason=reason,
-            evidence={
-                "on_count": on_count,
-                "off_count": off_count,
-                "unknown_count": unknown_count,
-                "required": strategy_cfg.get("required"),
-            },
+            evidence=evidence,
             available=all(obs.available for obs in inputs),
-            stale=any(obs.stale for obs in inputs),
+            stale=stale_count > 0,
         )
 
 
@@ -175,7 +243,7 @@ class WeightedQuorumFusionPlugin:
     """Built-in weighted quorum on on/off/unknown observations."""
 
     plugin_id: str = "builtin.weighted_quorum"
-    plugin_api_version: int = 1
+    plugin_api_version: int = FUSION_PLUGIN_API_VERSION
     supported_kinds: tuple[str, ...] = ("presence", "boolean_signal")
 
     def derive(
@@ -186,7 +254,14 @@ class WeightedQuorumFusionPlugin:
         strategy_cfg: dict[str, Any] | None = None,
         context: dict[str, Any] | None = None,
     ) -> DerivedObservation:
-        strategy_cfg = dict(strategy_cfg or {})
+        return self._derive_weighted(kind, inputs, strategy_cfg or {})
+
+    def _derive_weighted(
+        self,
+        kind: str,
+        inputs: list[NormalizedObservation],
+        strategy_cfg: dict[str, Any],
+    ) -> DerivedObservation:
         if not inputs:
             return _mk_derived(
                 kind=kind,
@@ -199,26 +274,32 @@ class WeightedQuorumFusionPlugin:
                 available=False,
             )
 
-        weights_cfg = dict(strategy_cfg.get("weights", {}))
+        weights_cfg = strategy_cfg.get("weights", {})
         weighted_inputs = [
             (obs, _input_weight(obs, index=index, weights=weights_cfg))
             for index, obs in enumerate(inputs)
         ]
-        total_weight = sum(weight for _, weight in weighted_inputs)
-        threshold = strategy_cfg.get("threshold")
-        if threshold is None:
+        on_weight = off_weight = unknown_weight = 0.0
+        stale_count = 0
+        for obs, weight in weighted_inputs:
+            if obs.stale:
+                stale_count += 1
+            elif obs.state == "on":
+                on_weight += weight
+            elif obs.state == "off":
+                off_weight += weight
+            else:
+                unknown_weight += weight
+        # Stale inputs are discounted: they add no weight to the quorum.
+        total_weight = sum(weight for obs, weight in weighted_inputs if not obs.stale)
+        threshold_value = strategy_cfg.get("threshold")
+        if threshold_value is None:
             threshold_value = total_weight / 2.0 if total_weight > 0 else 0.0
-        else:
-            try:
-                threshold_value = max(0.0, float(threshold))
-            except (TypeError, ValueError):
-                threshold_value = total_weight / 2.0 if total_weight > 0 else 0.0
-
-        on_weight = sum(weight for obs, weight in weighted_inputs if obs.state == "on")
-        off_weight = sum(weight for obs, weight in weighted_inputs if obs.state == "off")
-        unknown_weight = sum(weight for obs, weight in weighted_inputs if obs.state not in {"on", "off"})
 
-        if on_weight >= threshold_value:
+        if stale_count == len(weighted_inputs):
+            state = "off"
+            reason = "all_inputs_stale"
+        elif on_weight >= threshold_value:
             state = "on"
             reason = "weighted_threshold_reached"
         elif unknown_weight > 0:
@@ -237,6 +318,19 @@ class WeightedQuorumFusionPlugin:
         else:
             confidence = 0
 
+        evidence: dict[str, Any] = {
+            "total_weight": total_weight,
+            "threshold": threshold_value,
+            "on_weight": on_weight,
+            "off_weight": off_weight,
+            "unknown_weight": unknown_weight,
+            "weights": {
+                (obs.source_entity_id or f"input_{idx}"): weight
+                for idx, (obs, weight) in enumerate(weighted_inputs)
+            },
+        }
+        if stale_count:
+            evidence["stale_count"] = stale_count
         return _mk_derived(
             kind=kind,
             state=state,
@@ -245,19 +339,9 @@ class WeightedQuorumFusionPlugin:
             strategy="weighted_quorum",
             plugin_id=self.plugin_id,
             reason=reason,
-            evidence={
-                "total_weight": total_weight,
-                "threshold": threshold_value,
-                "on_weight": on_weight,
-                "off_weight": off_weight,
-                "unknown_weight": unknown_weight,
-                "weights": {
-                    (obs.source_entity_id or f"input_{idx}"): weight
-                    for idx, (obs, weight) in enumerate(weighted_inputs)
-                },
-            },
+            evidence=evidence,
             available=all(obs.available for obs, _ in weighted_inputs),
-            stale=any(obs.stale for obs, _ in weighted_inputs),
+            stale=stale_count > 0,
         )
 
 
@@ -165,10 +165,11 @@ def build_signal_set_strategy_cfg(
     if plugin_id == "builtin.quorum" and required is not None:
         cfg["required"] = int(required)
     elif plugin_id == "builtin.weighted_quorum" and weight_threshold not in (None, ""):
-        cfg["threshold"] = float(weight_threshold)
+        cfg["threshold"] = max(0.0, float(weight_threshold))
     if plugin_id == "builtin.weighted_quorum" and isinstance(source_weights, dict):
+        # Parsed once here so the plugin reads plain floats on every derive.
         cfg["weights"] = {
-            str(entity_id): float(weight)
+            str(entity_id): max(0.0, float(weight))
             for entity_id, weight in source_weights.items()
             if str(entity_id)
         }
@@ -2,16 +2,52 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
+import copy
+import functools
+import sys
+import time
+import warnings
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
 from typing import Any
 
+# Version 2: observations carry ``observed_at`` (UTC epoch seconds) instead of a ``ts=`` string.
+FUSION_PLUGIN_API_VERSION = 2
 
-def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
 
+def _iso_from_epoch(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
 
-@dataclass(frozen=True)
+
+def _epoch_from_iso(value: str) -> float:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _accept_legacy_ts(cls):
+    """Keep accepting the API v1 ``ts=`` keyword for one release (removed in v3)."""
+    init = cls.__init__
+
+    @functools.wraps(init)
+    def __init__(self, *args: Any, ts: str | None = None, **kwargs: Any) -> None:
+        if ts is not None:
+            warnings.warn(
+                f"{cls.__name__}(ts=...) is deprecated; pass observed_at (UTC epoch seconds) instead",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            if "observed_at" not in kwargs:
+                kwargs["observed_at"] = _epoch_from_iso(ts)
+        init(self, *args, **kwargs)
+
+    cls.__init__ = __init__
+    return cls
+
+
+@_accept_legacy_ts
+@dataclass(frozen=True, slots=True)
 class NormalizedObservation:
     """Canonical normalized observation produced by the normalization layer."""
 
@@ -20,26 +56,50 @@ class NormalizedObservation:
     confidence: int
     raw_state: str | None
     source_entity_id: str | None
-    ts: str = field(default_factory=_utc_now_iso)
+    # Stamped from the normalizer's clock; wall time only when built outside one.
+    observed_at: float = field(default_factory=time.time)
     stale: bool = False
     available: bool = True
     reason: str = ""
 
+    @property
+    def ts(self) -> str:
+        return _iso_from_epoch(self.observed_at)
+
     def as_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        data: dict[str, Any] = {}
+        for item in fields(self):
+            value = getattr(self, item.name)
+            if item.name == "observed_at":
+                data["ts"] = _iso_from_epoch(value)
+            elif isinstance(value, (list, dict)):
+                data[item.name] = copy.deepcopy(value)
+            else:
+                data[item.name] = value
+        return data
 
 
-@dataclass(frozen=True)
+@_accept_legacy_ts
+@dataclass(frozen=True, slots=True)
 class DerivedObservation(NormalizedObservation):
     """Normalized observation produced by a fusion strategy/plugin."""
 
     inputs: list[str] = field(default_factory=list)
     fusion_strategy: str = "direct"
     plugin_id: str = "builtin.direct"
-    plugin_api_version: int = 1
+    plugin_api_version: int = FUSION_PLUGIN_API_VERSION
     evidence: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass(frozen=True, slots=True)
+class FusionGroup:
+    """One target's inputs and strategy config within a batched ``derive_many`` call."""
+
+    inputs: list[NormalizedObservation]
+    strategy_cfg: dict[str, Any] = field(default_factory=dict)
+    context: dict[str, Any] = field(default_factory=dict)
+
+
 def build_observation(
     *,
     kind: str,
@@ -47,19 +107,21 @@ def build_observation(
     confidence: int,
     raw_state: str | None,
     source_entity_id: str | None,
+    observed_at: float | None = None,
     stale: bool = False,
     available: bool = True,
     reason: str = "",
 ) -> NormalizedObservation:
     """Helper to create a normalized observation with clamped confidence."""
     return NormalizedObservation(
-        kind=kind,
-        state=state,
+        kind=sys.intern(kind),
+        state=sys.intern(state),
         confidence=max(0, min(100, int(confidence))),
         raw_state=raw_state,
         source_entity_id=source_entity_id,
+        observed_at=time.time() if observed_at is None else observed_at,
         stale=bool(stale),
         available=bool(available),
-        reason=reason,
+        reason=sys.intern(reason),
     )
 
@@ -5,11 +5,26 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Protocol
 
-from .contracts import DerivedObservation, NormalizedObservation
+from .contracts import DerivedObservation, FusionGroup, NormalizedObservation
+
+FUSION_EXECUTION_INLINE = "inline"
+FUSION_EXECUTION_ASYNC = "async"
+FUSION_EXECUTION_EXECUTOR = "executor"
+FUSION_EXECUTION_MODES = (FUSION_EXECUTION_INLINE, FUSION_EXECUTION_ASYNC, FUSION_EXECUTION_EXECUTOR)
 
 
 class FusionPlugin(Protocol):
-    """Contract for signal-fusion plugins."""
+    """Contract for signal-fusion plugins.
+
+    Plugins may also implement ``derive_many(*, kind, groups)`` to fuse many
+    targets in one call; ``derive_many_with`` adapts plugins that do not.
+
+    Heavy plugins can set ``execution`` to ``"async"`` (and implement
+    ``async_derive`` with the same arguments as ``derive``) or ``"executor"``
+    (``derive`` runs in the HA executor), plus an optional ``time_budget_s``.
+    Such plugins never run inside the snapshot computation; see
+    ``InputNormalizer.async_run_deferred``.
+    """
 
     plugin_id: str
     plugin_api_version: int
@@ -25,11 +40,33 @@ class FusionPlugin(Protocol):
     ) -> DerivedObservation: ...
 
 
+def derive_many_with(plugin: FusionPlugin, *, kind: str, groups: list[FusionGroup]) -> list[DerivedObservation]:
+    """Run a batch through ``plugin.derive_many`` or, if absent, one ``derive`` per group."""
+    derive_many = getattr(plugin, "derive_many", None)
+    if derive_many is not None:
+        results = list(derive_many(kind=kind, groups=groups))
+        if len(results) != len(groups):
+            raise ValueError(
+                f"Fusion plugin '{plugin.plugin_id}' returned {len(results)} results for {len(groups)} groups"
+            )
+        return results
+    return [
+        plugin.derive(kind=kind, inputs=group.inputs, strategy_cfg=group.strategy_cfg, context=group.context)
+        for group in groups
+    ]
+
+
+def plugin_execution(plugin: FusionPlugin) -> str:
+    """Return how ``plugin`` runs: inline (default), async or executor."""
+    return str(getattr(plugin, "execution", FUSION_EXECUTION_INLINE) or FUSION_EXECUTION_INLINE)
+
+
 @dataclass(frozen=True)
 class FusionPluginDescriptor:
     plugin_id: str
     plugin_api_version: int
     supported_kinds: tuple[str, ...]
+    execution: str = FUSION_EXECUTION_INLINE
 
 
 class NormalizationFusionRegistry:
@@ -44,6 +81,11 @@ class NormalizationFusionRegistry:
             raise ValueError("Fusion plugin must define a non-empty plugin_id")
         if plugin_id in self._plugins:
             raise ValueError(f"Fusion plugin already registered: {plugin_id}")
+        execution = plugin_execution(plugin)
+        if execution not in FUSION_EXECUTION_MODES:
+            raise ValueError(f"Fusion plugin '{plugin_id}' has unknown execution mode: {execution}")
+        if execution == FUSION_EXECUTION_ASYNC and not callable(getattr(plugin, "async_derive", None)):
+            raise ValueError(f"Async fusion plugin '{plugin_id}' must implement async_derive")
         self._plugins[plugin_id] = plugin
 
     def get(self, plugin_id: str) -> FusionPlugin:
@@ -52,12 +94,20 @@ class NormalizationFusionRegistry:
             raise KeyError(f"Fusion plugin not found: {plugin_id}")
         return plugin
 
+    def resolve(self, plugin_id: str, kind: str) -> FusionPlugin:
+        """Return the plugin for ``plugin_id`` after checking it supports ``kind``."""
+        plugin = self.get(plugin_id)
+        if tuple(plugin.supported_kinds) and kind not in plugin.supported_kinds:
+            raise ValueError(f"Fusion plugin '{plugin_id}' does not support kind '{kind}'")
+        return plugin
+
     def descriptors(self) -> list[FusionPluginDescriptor]:
         return [
             FusionPluginDescriptor(
                 plugin_id=plugin.plugin_id,
                 plugin_api_version=int(plugin.plugin_api_version),
                 supported_kinds=tuple(plugin.supported_kinds),
+                execution=plugin_execution(plugin),
             )
             for plugin in self._plugins.values()
         ]
@@ -71,9 +121,7 @@ class NormalizationFusionRegistry:
         strategy_cfg: dict[str, Any] | None = None,
         context: dict[str, Any] | None = None,
     ) -> DerivedObservation:
-        plugin = self.get(plugin_id)
-        if tuple(plugin.supported_kinds) and kind not in plugin.supported_kinds:
-            raise ValueError(f"Fusion plugin '{plugin_id}' does not support kind '{kind}'")
+        plugin = self.resolve(plugin_id, kind)
         return plugin.derive(
             kind=kind,
             inputs=list(inputs),
@@ -81,3 +129,11 @@ class NormalizationFusionRegistry:
             context=dict(context or {}),
         )
 
+    def derive_many(
+        self,
+        *,
+        plugin_id: str,
+        kind: str,
+        groups: list[FusionGroup],
+    ) -> list[DerivedObservation]:
+        return derive_many_with(self.resolve(plugin_id, kind), kind=kind, groups=groups)
@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
 
 from homeassistant.core import HomeAssistant
 
+from ..clock import SYSTEM_CLOCK, Clock
 from .builtins import register_builtin_fusion_plugins
-from .contracts import DerivedObservation, NormalizedObservation, build_observation
-from .registry import NormalizationFusionRegistry
+from .contracts import DerivedObservation, FusionGroup, NormalizedObservation, build_observation
+from .registry import (
+    FUSION_EXECUTION_ASYNC,
+    FUSION_EXECUTION_INLINE,
+    FusionPlugin,
+    NormalizationFusionRegistry,
+    derive_many_with,
+    plugin_execution,
+)
 
 _PRESENCE_ON_STATES = {
     "on",
@@ -20,6 +34,55 @@ _PRESENCE_ON_STATES = {
     "1",
 }
 
+DEFAULT_OBSERVATION_MEMO_SIZE = 4096
+DEFAULT_FUSION_TIME_BUDGET_S = 0.5
+
+
+@dataclass(frozen=True, slots=True, eq=False, weakref_slot=True)
+class CompiledFusion:
+    """Fusion strategy resolved once for one target and called on every evaluation.
+
+    The plugin lookup, ``supported_kinds`` check and strategy config parsing
+    happen in ``InputNormalizer.compile_fusion``; calling the instance only runs
+    the plugin. ``strategy_cfg`` and ``context`` are shared across calls and
+    must not be mutated by plugins. ``deferred`` marks async/executor plugins,
+    whose results come from ``InputNormalizer.async_run_deferred``.
+    """
+
+    normalizer: "InputNormalizer"
+    kind: str
+    plugin_id: str
+    plugin: FusionPlugin | None
+    resolve_error: Exception | None
+    strategy_cfg: dict[str, Any]
+    context: dict[str, Any]
+    fallback_state: str
+    deferred: bool = False
+    time_budget_s: float = DEFAULT_FUSION_TIME_BUDGET_S
+
+    def __call__(self, inputs: list[NormalizedObservation]) -> DerivedObservation:
+        return self.normalizer._run_fusion(self, inputs)
+
+
+def state_reported_at(state: Any) -> Any:
+    """When ``state`` was last reported by its source.
+
+    Home Assistant keeps ``last_updated`` when a source reports the same state
+    again and only moves ``last_reported``, so source age must read the latter.
+    """
+    reported = getattr(state, "last_reported", None)
+    return reported if reported is not None else getattr(state, "last_updated", None)
+
+
+def _input_signature(inputs: list[NormalizedObservation]) -> tuple[Any, ...]:
+    return tuple((obs.source_entity_id, obs.state, obs.stale) for obs in inputs)
+
+
+def _consume_result(future: asyncio.Future) -> None:
+    """Retrieve an abandoned executor run's outcome so asyncio does not log it."""
+    if not future.cancelled():
+        future.exception()
+
 
 class InputNormalizer:
     """Single entry point for raw->normalized observations and signal fusion."""
@@ -29,90 +92,125 @@ class InputNormalizer:
         hass: HomeAssistant,
         *,
         fusion_registry: NormalizationFusionRegistry | None = None,
+        observation_memo_size: int = DEFAULT_OBSERVATION_MEMO_SIZE,
+        clock: Clock | None = None,
+        fusion_time_budget_s: float = DEFAULT_FUSION_TIME_BUDGET_S,
     ) -> None:
         self._hass = hass
+        self._clock = clock or SYSTEM_CLOCK
         self._fusion = fusion_registry or NormalizationFusionRegistry()
         if not self._fusion.descriptors():
             register_builtin_fusion_plugins(self._fusion)
         self._derive_calls = 0
         self._derive_fallback_unknown = 0
         self._derive_plugin_errors = 0
+        self._derive_batches = 0
         self._derive_plugin_error_counts: dict[str, int] = {}
         self._last_plugin_error: dict[str, Any] | None = None
-        self._last_derive: dict[str, Any] | None = None
+        self._last_derive: tuple[str, str, DerivedObservation] | None = None
+        self._memo: OrderedDict[tuple[Any, ...], NormalizedObservation] = OrderedDict()
+        self._memo_max_size = max(1, int(observation_memo_size))
+        self._memo_hits = 0
+        self._memo_misses = 0
+        self._memo_evictions = 0
+        self._evaluation_hits = 0
+        self._evaluation_misses = 0
+        self._fusion_time_budget_s = float(fusion_time_budget_s)
+        # Deferred (async/executor) fusions: last result per compiled target with
+        # the input signature it was computed for, and targets awaiting a run.
+        self._deferred_results: weakref.WeakKeyDictionary[
+            CompiledFusion, tuple[tuple[Any, ...], DerivedObservation]
+        ] = weakref.WeakKeyDictionary()
+        self._deferred_pending: dict[CompiledFusion, list[NormalizedObservation]] = {}
+        # Executor threads cannot be cancelled: one run per target until its thread returns.
+        self._executor_in_flight: weakref.WeakKeyDictionary[CompiledFusion, asyncio.Future] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._deferred_hits = 0
+        self._deferred_budget_exceeded = 0
+        self._deferred_in_flight_skips = 0
+        self._deferred_late_results = 0
+        # Set when a timed-out executor run's late result replaced its fallback.
+        self._deferred_late_changed = False
+        self._plugin_latency: dict[str, dict[str, float]] = {}
 
     @property
     def fusion_registry(self) -> NormalizationFusionRegistry:
         return self._fusion
 
-    def presence(self, entity_id: str | None) -> NormalizedObservation:
-        raw = self._read_state(entity_id)
-        if not entity_id:
-            return build_observation(
-                kind="presence",
-                state="unknown",
-                confidence=0,
-                raw_state=None,
-                source_entity_id=None,
-                available=False,
-                reason="missing_entity_id",
-            )
-        if raw is None:
-            return build_observation(
-                kind="presence",
-                state="unknown",
-                confidence=0,
-                raw_state=None,
-                source_entity_id=entity_id,
-                available=False,
-                reason="entity_not_found",
-            )
-        lowered = raw.lower()
-        if lowered in {"unknown", "unavailable"}:
-            return build_observation(
-                kind="presence",
-                state="unknown",
-                confidence=0,
-                raw_state=raw,
-                source_entity_id=entity_id,
-                available=(lowered != "unavailable"),
-                reason=lowered,
-            )
-        if lowered in _PRESENCE_ON_STATES:
-            return build_observation(
-                kind="presence",
-                state="on",
-                confidence=100,
-                raw_state=raw,
-                source_entity_id=entity_id,
-                reason="state_match_on",
-            )
-        try:
-            if float(raw) > 0:
-                return build_observation(
-                    kind="presence",
-                    state="on",
-                    confidence=100,
-                    raw_state=raw,
-                    source_entity_id=entity_id,
-                    reason="numeric_gt_zero",
-                )
-        except ValueError:
-            pass
-        return build_observation(
-            kind="presence",
-            state="off",
-            confidence=100,
-            raw_state=raw,
-            source_entity_id=entity_id,
-            reason="default_off",
-        )
+    def begin_evaluation(self) -> None:
+        """Start a new evaluation; resets the per-evaluation memo counters."""
+        self._evaluation_hits = 0
+        self._evaluation_misses = 0
+
+    def presence(self, entity_id: str | None, *, stale_after_s: float | None = None) -> NormalizedObservation:
+        return self._cached_truthy("presence", entity_id, stale_after_s)
 
     def boolean_signal(self, entity_id: str | None) -> NormalizedObservation:
-        raw = self._read_state(entity_id)
+        return self._cached_truthy("boolean_signal", entity_id, None)
+
+    def seconds_until_stale(self, entity_id: str | None, stale_after_s: float | None) -> float | None:
+        """Seconds until ``entity_id`` turns stale; None if it cannot (or already did)."""
+        age = self._state_age_s(self._hass.states.get(entity_id) if entity_id else None)
+        if age is None or not stale_after_s or age >= stale_after_s:
+            return None
+        return stale_after_s - age
+
+    def _state_age_s(self, state: Any) -> float | None:
+        reported_at = state_reported_at(state)
+        if reported_at is None:
+            return None
+        return (self._clock.utcnow() - reported_at).total_seconds()
+
+    def _cached_truthy(self, kind: str, entity_id: str | None, stale_after_s: float | None) -> NormalizedObservation:
+        state = self._hass.states.get(entity_id) if entity_id else None
+        raw = state.state if state else None
+        stale = False
+        if stale_after_s and raw is not None:
+            age = self._state_age_s(state)
+            stale = age is not None and age >= stale_after_s
+        return self._memoized(
+            (kind, entity_id, getattr(state, "last_updated", None), raw, stale),
+            lambda: self._truthy_observation(kind, entity_id, raw, stale=stale),
+        )
+
+    def _memoized(
+        self,
+        key: tuple[Any, ...],
+        build: Callable[[], NormalizedObservation],
+    ) -> NormalizedObservation:
+        """Return the memoized observation for ``key``, building it on a miss.
+
+        Keys carry ``last_updated`` and the raw state, so only entities that
+        changed since they were last normalized are rebuilt. The memo is an
+        LRU capped at ``observation_memo_size`` entries.
+        """
+        cached = self._memo.get(key)
+        if cached is not None:
+            self._memo.move_to_end(key)
+            self._memo_hits += 1
+            self._evaluation_hits += 1
+            return cached
+        self._memo_misses += 1
+        self._evaluation_misses += 1
+        observation = build()
+        self._memo[key] = observation
+        if len(self._memo) > self._memo_max_size:
+            self._memo.popitem(last=False)
+            self._memo_evictions += 1
+        return observation
+
+    def _truthy_observation(
+        self,
+        kind: str,
+        entity_id: str | None,
+        raw: str | None,
+        *,
+        stale: bool = False,
+    ) -> NormalizedObservation:
         if not entity_id:
-            return build_observation(
-                kind="boolean_signal",
+            return self._build_observation(
+                kind=kind,
                 state="unknown",
                 confidence=0,
                 raw_state=None,
@@ -121,8 +219,8 @@ class InputNormalizer:
                 reason="missing_entity_id",
             )
         if raw is None:
-            return build_observation(
-                kind="boolean_signal",
+            return self._build_observation(
+                kind=kind,
                 state="unknown",
                 confidence=0,
                 raw_state=None,
@@ -132,46 +230,53 @@ class InputNormalizer:
             )
         lowered = raw.lower()
         if lowered in {"unknown", "unavailable"}:
-            return build_observation(
-                kind="boolean_signal",
+            return self._build_observation(
+                kind=kind,
                 state="unknown",
                 confidence=0,
                 raw_state=raw,
+                stale=stale,
                 source_entity_id=entity_id,
                 available=(lowered != "unavailable"),
                 reason=lowered,
             )
-        # Intentionally keep behavior aligned with legacy truthy parser in N1.
+        # Intentionally keep boolean_signal aligned with the legacy truthy parser in N1.
         if lowered in _PRESENCE_ON_STATES:
-            return build_observation(
-                kind="boolean_signal",
+            return self._build_observation(
+                kind=kind,
                 state="on",
                 confidence=100,
                 raw_state=raw,
+                stale=stale,
                 source_entity_id=entity_id,
                 reason="state_match_on",
             )
         try:
             if float(raw) > 0:
-                return build_observation(
-                    kind="boolean_signal",
+                return self._build_observation(
+                    kind=kind,
                     state="on",
                     confidence=100,
                     raw_state=raw,
+                    stale=stale,
                     source_entity_id=entity_id,
                     reason="numeric_gt_zero",
                 )
         except ValueError:
             pass
-        return build_observation(
-            kind="boolean_signal",
+        return self._build_observation(
+            kind=kind,
             state="off",
             confidence=100,
             raw_state=raw,
+            stale=stale,
             source_entity_id=entity_id,
             reason="default_off",
         )
 
+    def _build_observation(self, **kwargs: Any) -> NormalizedObservation:
+        return build_observation(observed_at=self._clock.utcnow().timestamp(), **kwargs)
+
     def boolean_value(
         self,
         value: bool,
@@ -181,7 +286,7 @@ class InputNormalizer:
         confidence: int = 100,
     ) -> NormalizedObservation:
         """Create a normalized boolean observation from a runtime-derived fact."""
-        return build_observation(
+        return self._build_observation(
             kind="boolean_signal",
             state="on" if bool(value) else "off",
             confidence=confidence,
@@ -191,10 +296,32 @@ class InputNormalizer:
         )
 
     def security(self, entity_id: str | None, mapping_cfg: dict[str, Any] | None = None) -> NormalizedObservation:
-        mapping_cfg = dict(mapping_cfg or {})
-        raw = self._read_state(entity_id)
+        mapping_cfg = mapping_cfg or {}
+        armed_away_value = str(mapping_cfg.get("armed_away_value", "armed_away")).lower()
+        armed_home_value = str(mapping_cfg.get("armed_home_value", "armed_home")).lower()
+        state = self._hass.states.get(entity_id) if entity_id else None
+        raw = state.state if state else None
+        return self._memoized(
+            (
+                "security",
+                entity_id,
+                getattr(state, "last_updated", None),
+                raw,
+                armed_away_value,
+                armed_home_value,
+            ),
+            lambda: self._security_observation(entity_id, raw, armed_away_value, armed_home_value),
+        )
+
+    def _security_observation(
+        self,
+        entity_id: str | None,
+        raw: str | None,
+        armed_away_value: str,
+        armed_home_value: str,
+    ) -> NormalizedObservation:
         if not entity_id:
-            return build_observation(
+            return self._build_observation(
                 kind="security",
                 state="unknown",
                 confidence=0,
@@ -204,7 +331,7 @@ class InputNormalizer:
                 reason="missing_entity_id",
             )
         if raw is None:
-            return build_observation(
+            return self._build_observation(
                 kind="security",
                 state="unknown",
                 confidence=0,
@@ -215,9 +342,6 @@ class InputNormalizer:
             )
 
         lowered = raw.lower()
-        armed_away_value = str(mapping_cfg.get("armed_away_value", "armed_away")).lower()
-        armed_home_value = str(mapping_cfg.get("armed_home_value", "armed_home")).lower()
-
         if lowered == "unavailable":
             state, reason, available = "unavailable", "raw_unavailable", False
         elif lowered == "unknown":
@@ -233,7 +357,7 @@ class InputNormalizer:
         else:
             state, reason, available = "unknown", "unmapped_raw_state", True
 
-        return build_observation(
+        return self._build_observation(
             kind="security",
             state=state,
             confidence=100 if state not in {"unknown", "unavailable"} else 0,
@@ -251,66 +375,317 @@ class InputNormalizer:
         strategy_cfg: dict[str, Any] | None = None,
         context: dict[str, Any] | None = None,
     ) -> DerivedObservation:
+        """One-shot fusion; hot paths should hold a ``compile_fusion`` result instead."""
+        return self.compile_fusion(kind=kind, strategy_cfg=strategy_cfg, context=context)(list(inputs))
+
+    def compile_fusion(
+        self,
+        *,
+        kind: str,
+        strategy_cfg: dict[str, Any] | None = None,
+        context: dict[str, Any] | None = None,
+    ) -> CompiledFusion:
+        """Resolve a fusion strategy config into a callable bound to its plugin."""
         cfg = dict(strategy_cfg or {})
         plugin_id = str(cfg.pop("plugin_id", "builtin.direct"))
         fallback_state = self._normalize_fallback_state(cfg.pop("fallback_state", "unknown"))
-        normalized_inputs = list(inputs)
+        plugin: FusionPlugin | None = None
+        resolve_error: Exception | None = None
+        try:
+            plugin = self._fusion.resolve(plugin_id, kind)
+        except Exception as err:  # reported as a plugin error on every call
+            resolve_error = err
+        deferred = plugin is not None and plugin_execution(plugin) != FUSION_EXECUTION_INLINE
+        return CompiledFusion(
+            normalizer=self,
+            kind=kind,
+            plugin_id=plugin_id,
+            plugin=plugin,
+            resolve_error=resolve_error,
+            strategy_cfg=cfg,
+            context=dict(context or {}),
+            fallback_state=fallback_state,
+            deferred=deferred,
+            time_budget_s=self._plugin_time_budget_s(plugin),
+        )
+
+    def _plugin_time_budget_s(self, plugin: FusionPlugin | None) -> float:
+        try:
+            budget = float(getattr(plugin, "time_budget_s", None) or self._fusion_time_budget_s)
+        except (TypeError, ValueError):
+            budget = self._fusion_time_budget_s
+        return budget if budget > 0 else self._fusion_time_budget_s
+
+    def _run_fusion(self, fusion: CompiledFusion, inputs: list[NormalizedObservation]) -> DerivedObservation:
         self._derive_calls += 1
+        if fusion.deferred:
+            return self._deferred_fusion(fusion, inputs)
+        error = fusion.resolve_error
+        if fusion.plugin is not None:
+            try:
+                result = fusion.plugin.derive(
+                    kind=fusion.kind,
+                    inputs=inputs,
+                    strategy_cfg=fusion.strategy_cfg,
+                    context=fusion.context,
+                )
+            except Exception as err:
+                error = err
+        if error is not None:
+            result = self._plugin_error_fallback(fusion, inputs, error)
+
+        self._last_derive = (fusion.plugin_id, fusion.kind, result)
+        return result
+
+    def _plugin_error_fallback(
+        self,
+        fusion: CompiledFusion,
+        inputs: list[NormalizedObservation],
+        error: Exception,
+    ) -> DerivedObservation:
+        plugin_id = fusion.plugin_id
+        self._derive_plugin_errors += 1
+        self._derive_fallback_unknown += 1
+        self._derive_plugin_error_counts[plugin_id] = self._derive_plugin_error_counts.get(plugin_id, 0) + 1
+        self._last_plugin_error = {
+            "plugin_id": plugin_id,
+            "kind": fusion.kind,
+            "error_type": type(error).__name__,
+            "error": str(error),
+        }
+        return self._fallback_derived_unknown(
+            kind=fusion.kind,
+            inputs=inputs,
+            plugin_id=plugin_id,
+            error=error,
+            fallback_state=fusion.fallback_state,
+        )
+
+    def _deferred_fusion(self, fusion: CompiledFusion, inputs: list[NormalizedObservation]) -> DerivedObservation:
+        """Serve a deferred plugin's last result and queue a run when its inputs moved.
+
+        Until the first run completes the target gets its fallback state.
+        """
+        signature = _input_signature(inputs)
+        cached = self._deferred_results.get(fusion)
+        if cached is not None and cached[0] == signature:
+            self._deferred_hits += 1
+            result = cached[1]
+        else:
+            self._deferred_pending[fusion] = list(inputs)
+            result = cached[1] if cached is not None else self._fallback_derived_unknown(
+                kind=fusion.kind,
+                inputs=inputs,
+                plugin_id=fusion.plugin_id,
+                error=None,
+                fallback_state=fusion.fallback_state,
+                reason="plugin_pending_fallback",
+            )
+        self._last_derive = (fusion.plugin_id, fusion.kind, result)
+        return result
+
+    @property
+    def has_deferred_pending(self) -> bool:
+        return bool(self._deferred_pending)
+
+    @property
+    def has_executor_runs_in_flight(self) -> bool:
+        return any(not future.done() for future in self._executor_in_flight.values())
+
+    async def async_wait_executor_runs(self) -> None:
+        """Wait until one of the executor threads still running returns."""
+        futures = [future for future in self._executor_in_flight.values() if not future.done()]
+        if futures:
+            await asyncio.wait(futures, return_when=asyncio.FIRST_COMPLETED)
+
+    async def async_run_deferred(self) -> bool:
+        """Run queued async/executor fusions concurrently, each within its time budget.
+
+        A run that exceeds its budget (or raises) stores the fallback result for
+        those inputs. Executor threads cannot be cancelled and finish in the
+        background: a late result replaces the fallback if its inputs are still
+        current, and while a thread runs its target is not started again and
+        stays queued (see ``async_wait_executor_runs``).
+        Returns True when any target's result changed, i.e. the snapshot that
+        used the previous results should be re-evaluated.
+        """
+        pending, self._deferred_pending = self._deferred_pending, {}
+        late_changed, self._deferred_late_changed = self._deferred_late_changed, False
+        if not pending:
+            return late_changed
+        changed = await asyncio.gather(
+            *(self._async_run_deferred_one(fusion, inputs) for fusion, inputs in pending.items())
+        )
+        return late_changed or any(changed)
+
+    async def _async_run_deferred_one(self, fusion: CompiledFusion, inputs: list[NormalizedObservation]) -> bool:
+        in_flight = self._executor_in_flight.get(fusion)
+        if in_flight is not None and not in_flight.done():
+            self._deferred_in_flight_skips += 1
+            self._deferred_pending.setdefault(fusion, inputs)
+            return False
+        plugin = fusion.plugin
+        kwargs = {
+            "kind": fusion.kind,
+            "inputs": inputs,
+            "strategy_cfg": fusion.strategy_cfg,
+            "context": fusion.context,
+        }
+        signature = _input_signature(inputs)
+        started = time.perf_counter()
+        budget_exceeded = False
         try:
-            result = self._fusion.derive(
-                plugin_id=plugin_id,
-                kind=kind,
-                inputs=normalized_inputs,
-                strategy_cfg=cfg,
-                context=dict(context or {}),
+            if plugin_execution(plugin) == FUSION_EXECUTION_ASYNC:
+                pending = plugin.async_derive(**kwargs)
+            else:
+                pending = self._hass.async_add_executor_job(partial(plugin.derive, **kwargs))
+                pending.add_done_callback(_consume_result)
+                self._executor_in_flight[fusion] = pending
+                # Shielded so a timeout leaves the future tracking the thread until it returns.
+                pending = asyncio.shield(pending)
+            result = await asyncio.wait_for(pending, fusion.time_budget_s)
+        except asyncio.TimeoutError:
+            budget_exceeded = True
+            self._deferred_budget_exceeded += 1
+            in_flight = self._executor_in_flight.get(fusion)
+            if in_flight is not None and not in_flight.done():
+                in_flight.add_done_callback(partial(self._adopt_late_result, fusion, signature))
+            result = self._plugin_error_fallback(
+                fusion,
+                inputs,
+                TimeoutError(f"time budget of {fusion.time_budget_s}s exceeded"),
             )
         except Exception as err:
-            self._derive_plugin_errors += 1
-            self._derive_fallback_unknown += 1
-            self._derive_plugin_error_counts[plugin_id] = self._derive_plugin_error_counts.get(plugin_id, 0) + 1
-            self._last_plugin_error = {
-                "plugin_id": plugin_id,
-                "kind": kind,
-                "error_type": type(err).__name__,
-                "error": str(err),
-            }
-            result = self._fallback_derived_unknown(
-                kind=kind,
-                inputs=normalized_inputs,
-                plugin_id=plugin_id,
-                error=err,
-                fallback_state=fallback_state,
-            )
+            result = self._plugin_error_fallback(fusion, inputs, err)
+        self._record_plugin_latency(fusion.plugin_id, time.perf_counter() - started, budget_exceeded)
+
+        previous = self._deferred_results.get(fusion)
+        self._deferred_results[fusion] = (signature, result)
+        self._last_derive = (fusion.plugin_id, fusion.kind, result)
+        return previous is None or (previous[1].state, previous[1].confidence) != (result.state, result.confidence)
+
+    def _adopt_late_result(self, fusion: CompiledFusion, signature: tuple[Any, ...], future: asyncio.Future) -> None:
+        """Replace a budget fallback with the thread's late result while its inputs are current."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        cached = self._deferred_results.get(fusion)
+        if cached is None or cached[0] != signature:
+            return
+        queued = self._deferred_pending.get(fusion)
+        if queued is not None and _input_signature(queued) != signature:
+            return
+        result = future.result()
+        self._deferred_results[fusion] = (signature, result)
+        self._deferred_late_results += 1
+        if (cached[1].state, cached[1].confidence) != (result.state, result.confidence):
+            self._deferred_late_changed = True
 
-        self._last_derive = {
+    def _record_plugin_latency(self, plugin_id: str, elapsed_s: float, budget_exceeded: bool) -> None:
+        stats = self._plugin_latency.setdefault(
+            plugin_id, {"runs": 0, "budget_exceeded": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0}
+        )
+        elapsed_ms = elapsed_s * 1000
+        stats["runs"] += 1
+        stats["budget_exceeded"] += int(budget_exceeded)
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def derive_many(
+        self,
+        calls: list[tuple[CompiledFusion, list[NormalizedObservation]]],
+    ) -> list[DerivedObservation]:
+        """Run many compiled fusions, batching targets that share a plugin and kind.
+
+        Results come back in call order. If a batch fails, its targets are
+        re-run one by one so a single bad group gets the usual fallback.
+        """
+        results: list[DerivedObservation | None] = [None] * len(calls)
+        batches: dict[tuple[int, str], list[int]] = {}
+        for index, (fusion, inputs) in enumerate(calls):
+            if fusion.plugin is None or fusion.deferred:
+                results[index] = self._run_fusion(fusion, inputs)
+            else:
+                batches.setdefault((id(fusion.plugin), fusion.kind), []).append(index)
+
+        for indexes in batches.values():
+            first = calls[indexes[0]][0]
+            if len(indexes) == 1:
+                results[indexes[0]] = self._run_fusion(first, calls[indexes[0]][1])
+                continue
+            groups = [
+                FusionGroup(inputs=inputs, strategy_cfg=fusion.strategy_cfg, context=fusion.context)
+                for fusion, inputs in (calls[index] for index in indexes)
+            ]
+            try:
+                derived = derive_many_with(first.plugin, kind=first.kind, groups=groups)
+            except Exception:
+                for index in indexes:
+                    results[index] = self._run_fusion(*calls[index])
+                continue
+            self._derive_calls += len(indexes)
+            self._derive_batches += 1
+            for index, result in zip(indexes, derived):
+                results[index] = result
+            self._last_derive = (first.plugin_id, first.kind, derived[-1])
+        return results  # type: ignore[return-value]
+
+    def _last_derive_diagnostics(self) -> dict[str, Any] | None:
+        if self._last_derive is None:
+            return None
+        plugin_id, kind, result = self._last_derive
+        return {
             "plugin_id": plugin_id,
             "kind": kind,
             "result_state": result.state,
             "result_reason": result.reason,
-            "used_fallback": result.reason == "plugin_error_fallback",
+            "used_fallback": result.reason in {"plugin_error_fallback", "plugin_pending_fallback"},
             "fallback_state": result.evidence.get("fallback") if isinstance(result.evidence, dict) else None,
         }
-        return result
-
-    def _read_state(self, entity_id: str | None) -> str | None:
-        if not entity_id:
-            return None
-        state = self._hass.states.get(entity_id)
-        return state.state if state else None
 
     def diagnostics(self) -> dict[str, Any]:
+        lookups = self._memo_hits + self._memo_misses
         return {
             "derive_calls": self._derive_calls,
             "derive_fallback_unknown": self._derive_fallback_unknown,
             "derive_plugin_errors": self._derive_plugin_errors,
+            "derive_batches": self._derive_batches,
             "derive_plugin_error_counts": dict(self._derive_plugin_error_counts),
             "last_plugin_error": dict(self._last_plugin_error) if self._last_plugin_error else None,
-            "last_derive": dict(self._last_derive) if self._last_derive else None,
+            "last_derive": self._last_derive_diagnostics(),
+            "observation_memo": {
+                "hits": self._memo_hits,
+                "misses": self._memo_misses,
+                "hit_rate": round(self._memo_hits / lookups, 3) if lookups else None,
+                "evictions": self._memo_evictions,
+                "size": len(self._memo),
+                "max_size": self._memo_max_size,
+                "last_evaluation": {"hits": self._evaluation_hits, "misses": self._evaluation_misses},
+            },
+            "deferred_fusion": {
+                "pending": len(self._deferred_pending),
+                "hits": self._deferred_hits,
+                "budget_exceeded": self._deferred_budget_exceeded,
+                "in_flight_skips": self._deferred_in_flight_skips,
+                "late_results": self._deferred_late_results,
+                "default_time_budget_s": self._fusion_time_budget_s,
+            },
+            "plugin_latency": {
+                plugin_id: {
+                    "runs": int(stats["runs"]),
+                    "budget_exceeded": int(stats["budget_exceeded"]),
+                    "mean_ms": round(stats["total_ms"] / stats["runs"], 3),
+                    "last_ms": round(stats["last_ms"], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                }
+                for plugin_id, stats in self._plugin_latency.items()
+            },
             "registered_plugins": [
                 {
                     "plugin_id": descriptor.plugin_id,
                     "plugin_api_version": descriptor.plugin_api_version,
                     "supported_kinds": list(descriptor.supported_kinds),
+                    "execution": descriptor.execution,
                 }
                 for descriptor in self._fusion.descriptors()
             ],
@@ -322,27 +697,28 @@ class InputNormalizer:
         kind: str,
         inputs: list[NormalizedObservation],
         plugin_id: str,
-        error: Exception,
+        error: Exception | None,
         fallback_state: str,
+        reason: str = "plugin_error_fallback",
     ) -> DerivedObservation:
+        evidence: dict[str, Any] = {"fallback": fallback_state}
+        if error is not None:
+            evidence["error_type"] = type(error).__name__
+            evidence["error"] = str(error)
         return DerivedObservation(
             kind=kind,
             state=fallback_state,
             confidence=0,
             raw_state=None,
             source_entity_id=None,
+            observed_at=self._clock.utcnow().timestamp(),
             available=False,
             stale=any(obs.stale for obs in inputs),
-            reason="plugin_error_fallback",
+            reason=reason,
             inputs=[obs.source_entity_id or f"{obs.kind}:{obs.state}" for obs in inputs],
             fusion_strategy=f"fallback_{fallback_state}",
             plugin_id=plugin_id,
-            plugin_api_version=1,
-            evidence={
-                "fallback": fallback_state,
-                "error_type": type(error).__name__,
-                "error": str(error),
-            },
+            evidence=evidence,
         )
 
     def _normalize_fallback_state(self, value: Any) -> str:
@@ -2,20 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import time
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_DOMAIN, EVENT_SERVICE_REGISTERED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import ServiceNotFound
+from homeassistant.helpers.storage import Store
 
-from ..const import EVENT_HEIMA_EVENT
+from ..const import DEFAULT_DEFERRED_DELIVERY_CAPACITY, DEFAULT_DEFERRED_DELIVERY_TTL_S, EVENT_HEIMA_EVENT
+from .clock import SYSTEM_CLOCK, Clock
 from .contracts import HeimaEvent
 
 _LOGGER = logging.getLogger(__name__)
-_MAX_DEFERRED_ROUTE_DELIVERIES = 128
+_DEFERRED_SAVE_DELAY_S = 10.0
+_MAX_QUEUED_DELIVERIES = 256
+_MAX_TRACKED_EVENT_KEYS = 1024
+_MAX_DIGEST_EVENTS = 20
+_SEVERITY_RANK = {"debug": 0, "info": 1, "warn": 2, "warning": 2, "error": 3, "critical": 4}
 
 
 @dataclass
@@ -29,8 +37,24 @@ class EventPipelineStats:
     notify_route_errors: int = 0
     notify_target_resolution_errors: int = 0
     notify_route_deferred_dropped: int = 0
+    notify_route_deferred_expired: int = 0
+    notify_route_deferred_restored: int = 0
+    notify_route_deferred_depth: int = 0
     notify_route_delivered: int = 0
     notify_route_retried: int = 0
+    notify_queue_depth: int = 0
+    notify_queue_max_depth: int = 0
+    notify_queue_overflowed: int = 0
+    notify_delivery_count: int = 0
+    notify_delivery_total_ms: float = 0.0
+    notify_delivery_last_ms: float | None = None
+    notify_delivery_max_ms: float = 0.0
+    event_keys_tracked: int = 0
+    event_keys_expired: int = 0
+    event_keys_evicted: int = 0
+    notify_digest_batched: int = 0
+    notify_digest_sent: int = 0
+    notify_digest_calls_saved: int = 0
     last_event: HeimaEvent | None = None
     suppressed_by_key: dict[str, int] = field(default_factory=dict)
 
@@ -43,55 +67,255 @@ class EventPipelineStats:
             "notify_route_errors": self.notify_route_errors,
             "notify_target_resolution_errors": self.notify_target_resolution_errors,
             "notify_route_deferred_dropped": self.notify_route_deferred_dropped,
+            "notify_route_deferred_expired": self.notify_route_deferred_expired,
+            "notify_route_deferred_restored": self.notify_route_deferred_restored,
+            "notify_route_deferred_depth": self.notify_route_deferred_depth,
             "notify_route_delivered": self.notify_route_delivered,
             "notify_route_retried": self.notify_route_retried,
+            "notify_queue_depth": self.notify_queue_depth,
+            "notify_queue_max_depth": self.notify_queue_max_depth,
+            "notify_queue_overflowed": self.notify_queue_overflowed,
+            "notify_delivery_last_ms": (
+                round(self.notify_delivery_last_ms, 3) if self.notify_delivery_last_ms is not None else None
+            ),
+            "notify_delivery_mean_ms": (
+                round(self.notify_delivery_total_ms / self.notify_delivery_count, 3)
+                if self.notify_delivery_count
+                else None
+            ),
+            "notify_delivery_max_ms": round(self.notify_delivery_max_ms, 3),
+            "event_keys_tracked": self.event_keys_tracked,
+            "event_keys_expired": self.event_keys_expired,
+            "event_keys_evicted": self.event_keys_evicted,
+            "notify_digest_batched": self.notify_digest_batched,
+            "notify_digest_sent": self.notify_digest_sent,
+            "notify_digest_calls_saved": self.notify_digest_calls_saved,
             "last_event": self.last_event.as_dict() if self.last_event else None,
             "suppressed_by_key": dict(self.suppressed_by_key),
         }
 
 
-class HeimaEventPipeline:
-    """Deduplicates, rate-limits, and emits Heima events."""
+@dataclass(frozen=True, slots=True)
+class NotificationRouting:
+    """Notify routes resolved once per options load.
+
+    ``routes_by_category`` holds the categories with their own targets; every
+    other event uses ``routes``.
+    """
+
+    routes: tuple[str, ...] = ()
+    routes_by_category: Mapping[str, tuple[str, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    undefined_targets: tuple[str, ...] = ()
+
+    def routes_for(self, category: str | None) -> tuple[str, ...]:
+        return self.routes_by_category.get(category, self.routes)
+
+
+def compile_notification_routing(
+    *,
+    routes: Iterable[str] = (),
+    recipients: Mapping[str, Iterable[str]] | None = None,
+    recipient_groups: Mapping[str, Iterable[str]] | None = None,
+    route_targets: Iterable[str] = (),
+    category_route_targets: Mapping[str, Iterable[str]] | None = None,
+) -> NotificationRouting:
+    """Resolve aliases and groups into deduplicated notify route tuples."""
+    recipients = recipients or {}
+    recipient_groups = recipient_groups or {}
+    undefined: dict[str, None] = {}
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def resolve(direct_routes: Iterable[str], targets: Iterable[str]) -> tuple[str, ...]:
+        resolved: dict[str, None] = dict.fromkeys(route for route in direct_routes if route)
+        for target in targets:
+            if target in recipients:
+                resolved.update(dict.fromkeys(route for route in recipients[target] if route))
+                continue
+            if target in recipient_groups:
+                for recipient_id in recipient_groups[target]:
+                    resolved.update(dict.fromkeys(route for route in recipients.get(recipient_id, ()) if route))
+                continue
+            undefined[target] = None
+        return tuple(resolved)
+
+    default_routes = resolve(routes, route_targets)
+    routes_by_category = {
+        str(category): resolve((), targets) for category, targets in (category_route_targets or {}).items()
+    }
+    for target in undefined:
+        _LOGGER.warning("Heima notification target is undefined and was ignored: %s", target)
+    return NotificationRouting(
+        routes=default_routes,
+        routes_by_category=MappingProxyType(routes_by_category),
+        undefined_targets=tuple(undefined),
+    )
+
+
+@dataclass(slots=True)
+class _KeyWindow:
+    """Dedup/rate-limit timestamps of one event key."""
+
+    touched: float
+    last_seen: float | None = None
+    last_emitted: float | None = None
+
+
+class _EventKeyTable:
+    """Per-key windows kept in touch order, expired by TTL and capped by LRU.
+
+    Entries are moved to the end whenever they are touched, so expiry only
+    has to look at the front of the table.
+    """
+
+    def __init__(self, max_keys: int = _MAX_TRACKED_EVENT_KEYS) -> None:
+        self._entries: OrderedDict[str, _KeyWindow] = OrderedDict()
+        self._max_keys = max(1, int(max_keys))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def touch(self, key: str, now: float) -> tuple[_KeyWindow, str | None]:
+        """Return the window for ``key`` and the key evicted to make room, if any."""
+        window = self._entries.get(key)
+        if window is not None:
+            self._entries.move_to_end(key)
+            window.touched = now
+            return window, None
+        evicted = None
+        if len(self._entries) >= self._max_keys:
+            evicted, _ = self._entries.popitem(last=False)
+        window = self._entries[key] = _KeyWindow(touched=now)
+        return window, evicted
+
+    def expire(self, now: float, ttl_s: float) -> list[str]:
+        """Drop keys untouched for ``ttl_s``; they can no longer suppress anything."""
+        expired: list[str] = []
+        entries = self._entries
+        while entries:
+            key, window = next(iter(entries.items()))
+            if now - window.touched < ttl_s:
+                break
+            entries.popitem(last=False)
+            expired.append(key)
+        return expired
+
+
+class HeimaEventPipeline:
+    """Deduplicates, rate-limits, and emits Heima events.
+
+    ``async_emit`` fires the bus event and enqueues notify deliveries; a
+    worker task owned by the pipeline performs them, so a slow notify
+    integration never delays an evaluation. The worker runs while the
+    queue has items and is restarted by the next enqueue; when the queue is
+    full its oldest delivery moves to the deferred queue.
+
+    With a digest mode, events below the bypass severity are held per route
+    and sent as one combined notification: ``evaluation`` digests are sent
+    by ``flush_digests`` (called by the engine after each evaluation),
+    ``window`` digests by the first ``flush_digests`` once ``digest_window_s``
+    have passed on the clock since their first event; the engine schedules a
+    recheck for ``next_digest_due()``.
+
+    Deliveries to unavailable routes are deferred and retried once per worker
+    run, i.e. with the next emit or when a notify service is registered. Once a ``Store`` is
+    attached by ``async_restore_deferred`` they survive restarts: writes are
+    debounced, entries expire after the TTL, and ``async_shutdown`` saves
+    queued deliveries and open digests along with them.
+    """
+
+    def __init__(self, hass: HomeAssistant, *, clock: Clock | None = None) -> None:
         self._hass = hass
-        self._last_seen_ts: dict[str, float] = {}
-        self._last_emitted_ts: dict[str, float] = {}
+        self._clock = clock or SYSTEM_CLOCK
+        self._keys = _EventKeyTable()
         self._stats = EventPipelineStats()
-        self._deferred_route_deliveries: deque[tuple[HeimaEvent, str]] = deque(
-            maxlen=_MAX_DEFERRED_ROUTE_DELIVERIES
+        # (event, route, deferred_at as a UTC timestamp, so the TTL holds across restarts)
+        self._deferred_route_deliveries: deque[tuple[HeimaEvent, str, float]] = deque(
+            maxlen=DEFAULT_DEFERRED_DELIVERY_CAPACITY
         )
+        self._deferred_ttl_s = DEFAULT_DEFERRED_DELIVERY_TTL_S
+        self._store: Store | None = None
+        self._unsub_service_registered: CALLBACK_TYPE | None = None
+        self._delivery_queue: deque[tuple[HeimaEvent, str, float]] = deque(maxlen=_MAX_QUEUED_DELIVERIES)
+        self._retry_pending = False
+        self._worker: asyncio.Task[None] | None = None
+        self._digests: dict[str, list[HeimaEvent]] = {}
+        # Open window digests: route -> monotonic time the window closes.
+        self._digest_due: dict[str, float] = {}
+        self._routing: NotificationRouting | None = None
 
     @property
     def stats(self) -> EventPipelineStats:
         return self._stats
 
+    def configure_deferred(self, *, capacity: int, ttl_s: int) -> None:
+        """Resize the deferred-delivery queue (keeping the newest entries) and set its TTL."""
+        self._deferred_ttl_s = max(0, int(ttl_s))
+        capacity = max(1, int(capacity))
+        deferred = self._deferred_route_deliveries
+        if capacity == deferred.maxlen:
+            return
+        dropped = max(0, len(deferred) - capacity)
+        self._deferred_route_deliveries = deque(deferred, maxlen=capacity)
+        if dropped:
+            self._stats.notify_route_deferred_dropped += dropped
+            self._deferred_changed()
+
+    async def async_restore_deferred(self, store: Store) -> None:
+        """Persist deferred deliveries in ``store`` and queue the ones it holds for retry.
+
+        Also retries deferred deliveries whenever a notify service is registered,
+        so a route that appears after startup does not wait for the next event.
+        """
+        self._store = store
+        if self._unsub_service_registered is None:
+            self._unsub_service_registered = self._hass.bus.async_listen(
+                EVENT_SERVICE_REGISTERED, self._async_service_registered
+            )
+        data = await store.async_load()
+        restored = _decode_deferred_deliveries((data or {}).get("deliveries", ()))
+        if not restored:
+            return
+        deferred = self._deferred_route_deliveries
+        overflow = max(0, len(restored) + len(deferred) - deferred.maxlen)
+        self._deferred_route_deliveries = deque([*restored, *deferred], maxlen=deferred.maxlen)
+        self._stats.notify_route_deferred_dropped += overflow
+        self._stats.notify_route_deferred_restored += len(restored)
+        self._expire_deferred()
+        self._deferred_changed()
+        self._request_deferred_retry()
+
+    @callback
+    def _async_service_registered(self, event: Event) -> None:
+        if event.data.get(ATTR_DOMAIN) == "notify" and self._deferred_route_deliveries:
+            self._request_deferred_retry()
+
     async def async_emit(
         self,
         event: HeimaEvent,
         *,
-        routes: list[str] | None = None,
-        recipients: dict[str, list[str]] | None = None,
-        recipient_groups: dict[str, list[str]] | None = None,
-        route_targets: list[str] | None = None,
+        routing: NotificationRouting,
+        category: str | None = None,
         dedup_window_s: int,
         rate_limit_per_key_s: int,
+        digest_mode: str = "off",
+        digest_window_s: int = 0,
+        digest_bypass_severity: str = "warn",
     ) -> bool:
-        now = time.monotonic()
+        """Emit ``event`` to the notify routes ``routing`` holds for ``category``."""
+        now = self._clock.monotonic()
+        window = self._touch_key(event.key, now, ttl_s=max(dedup_window_s, rate_limit_per_key_s))
 
         if dedup_window_s > 0:
-            last_seen = self._last_seen_ts.get(event.key)
+            last_seen = window.last_seen
+            window.last_seen = now
             if last_seen is not None and (now - last_seen) < dedup_window_s:
                 self._stats.dropped_dedup += 1
                 self._stats.suppressed_by_key[event.key] = (
                     self._stats.suppressed_by_key.get(event.key, 0) + 1
                 )
-                self._last_seen_ts[event.key] = now
                 return False
-            self._last_seen_ts[event.key] = now
 
         if rate_limit_per_key_s > 0:
-            last_emit = self._last_emitted_ts.get(event.key)
+            last_emit = window.last_emitted
             if last_emit is not None and (now - last_emit) < rate_limit_per_key_s:
                 self._stats.dropped_rate_limited += 1
                 self._stats.suppressed_by_key[event.key] = (
@@ -99,43 +323,224 @@ class HeimaEventPipeline:
                 )
                 return False
 
-        self._last_emitted_ts[event.key] = now
+        window.last_emitted = now
         self._stats.emitted += 1
         self._stats.last_event = event
 
         payload = event.as_dict()
         self._hass.bus.async_fire(EVENT_HEIMA_EVENT, payload)
 
-        await self._flush_deferred_route_deliveries()
-
-        effective_routes = self._resolve_routes(
-            routes=routes or [],
-            recipients=recipients or {},
-            recipient_groups=recipient_groups or {},
-            route_targets=route_targets or [],
-        )
+        if routing is not self._routing:
+            # Undefined targets are counted once per routing table, not per event.
+            self._routing = routing
+            self._stats.notify_target_resolution_errors += len(routing.undefined_targets)
+        effective_routes = routing.routes_for(category)
+        digest = digest_mode != "off" and not _bypasses_digest(event.severity, digest_bypass_severity)
+        queued = False
         for route in effective_routes:
-            if not route:
+            if digest:
+                self._add_to_digest(route, event, window_s=digest_window_s if digest_mode == "window" else None)
                 continue
-            await self._deliver_or_defer_route(event=event, route=route, is_retry=False)
+            self._enqueue_delivery((event, route, now))
+            queued = True
+        if not queued and self._deferred_route_deliveries:
+            self._request_deferred_retry()
 
         return True
 
+    def _touch_key(self, key: str, now: float, *, ttl_s: float) -> _KeyWindow:
+        stats = self._stats
+        suppressed = stats.suppressed_by_key
+        for expired_key in self._keys.expire(now, ttl_s):
+            suppressed.pop(expired_key, None)
+            stats.event_keys_expired += 1
+        window, evicted_key = self._keys.touch(key, now)
+        if evicted_key is not None:
+            suppressed.pop(evicted_key, None)
+            stats.event_keys_evicted += 1
+        stats.event_keys_tracked = len(self._keys)
+        return window
+
+    def _add_to_digest(self, route: str, event: HeimaEvent, *, window_s: int | None) -> None:
+        events = self._digests.setdefault(route, [])
+        events.append(event)
+        self._stats.notify_digest_batched += 1
+        if len(events) >= _MAX_DIGEST_EVENTS:
+            self._flush_digest(route)
+        elif window_s is not None and route not in self._digest_due:
+            self._digest_due[route] = self._clock.monotonic() + window_s
+
+    def flush_digests(self) -> None:
+        """Send evaluation digests, and window digests whose window has closed on the clock."""
+        now = self._clock.monotonic()
+        for route in [route for route in self._digests if self._digest_due.get(route, now) <= now]:
+            self._flush_digest(route)
+
+    def next_digest_due(self) -> float | None:
+        """Monotonic time the earliest open digest window closes, or None."""
+        return min(self._digest_due.values(), default=None)
+
+    def _flush_digest(self, route: str) -> None:
+        item = self._pop_digest(route)
+        if item is not None:
+            self._enqueue_delivery(item)
+
+    def _pop_digest(self, route: str) -> tuple[HeimaEvent, str, float] | None:
+        self._digest_due.pop(route, None)
+        events = self._digests.pop(route, None)
+        if not events:
+            return None
+        if len(events) == 1:
+            return events[0], route, self._clock.monotonic()
+        self._stats.notify_digest_sent += 1
+        self._stats.notify_digest_calls_saved += len(events) - 1
+        return _digest_event(route, events), route, self._clock.monotonic()
+
+    def _enqueue_delivery(self, item: tuple[HeimaEvent, str, float]) -> None:
+        queue = self._delivery_queue
+        if len(queue) == queue.maxlen:
+            # Keep the latest deliveries; the oldest waits in the persisted deferred queue.
+            event, route, _enqueued_at = queue.popleft()
+            self._defer_route_delivery(event, route)
+            self._stats.notify_queue_overflowed += 1
+        queue.append(item)
+        self._stats.notify_queue_depth = len(queue)
+        self._stats.notify_queue_max_depth = max(self._stats.notify_queue_max_depth, len(queue))
+        self._ensure_worker()
+
+    def _request_deferred_retry(self) -> None:
+        # One flag, not a queue item: repeated requests collapse into one retry.
+        self._retry_pending = True
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            return
+        self._worker = self._hass.async_create_background_task(
+            self._async_delivery_worker(), "heima_notify_delivery"
+        )
+
+    async def _async_delivery_worker(self) -> None:
+        queue = self._delivery_queue
+        # Deferred deliveries are retried once per drain, before the fresh ones.
+        self._retry_pending = bool(self._deferred_route_deliveries)
+        while self._retry_pending or queue:
+            if self._retry_pending:
+                self._retry_pending = False
+                try:
+                    await self._flush_deferred_route_deliveries()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:  # pragma: no cover - the worker must survive any delivery bug
+                    _LOGGER.exception("Heima notify delivery worker failed while retrying deferred deliveries")
+                continue
+            item = queue.popleft()
+            self._stats.notify_queue_depth = len(queue)
+            try:
+                event, route, enqueued_at = item
+                await self._deliver_or_defer_route(event=event, route=route, is_retry=False)
+                self._record_delivery_latency((self._clock.monotonic() - enqueued_at) * 1000)
+            except asyncio.CancelledError:
+                # Shutdown: put the item back so async_shutdown can defer it.
+                queue.appendleft(item)
+                raise
+            except Exception:  # pragma: no cover - the worker must survive any delivery bug
+                _LOGGER.exception("Heima notify delivery worker failed on a queued delivery")
+
+    def _record_delivery_latency(self, elapsed_ms: float) -> None:
+        stats = self._stats
+        stats.notify_delivery_count += 1
+        stats.notify_delivery_total_ms += elapsed_ms
+        stats.notify_delivery_last_ms = elapsed_ms
+        stats.notify_delivery_max_ms = max(stats.notify_delivery_max_ms, elapsed_ms)
+
+    async def async_drain(self) -> None:
+        """Wait until every queued delivery has been attempted."""
+        while self._worker is not None and not self._worker.done():
+            await asyncio.shield(self._worker)
+
+    async def async_shutdown(self) -> None:
+        """Stop the delivery worker and save what it has not delivered yet.
+
+        Queued deliveries and open digests (whatever their window) are moved to
+        the deferred queue before it is written, so they are retried after the
+        restart instead of being lost.
+        """
+        if self._unsub_service_registered is not None:
+            self._unsub_service_registered()
+            self._unsub_service_registered = None
+        worker, self._worker = self._worker, None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        pending = list(self._delivery_queue)
+        self._delivery_queue.clear()
+        self._retry_pending = False
+        self._stats.notify_queue_depth = 0
+        for route in list(self._digests):
+            item = self._pop_digest(route)
+            if item is not None:
+                pending.append(item)
+        for event, route, _enqueued_at in pending:
+            self._append_deferred(event, route)
+        self._stats.notify_route_deferred_depth = len(self._deferred_route_deliveries)
+        if self._store is not None:
+            await self._store.async_save(self._deferred_store_data())
+
     async def _flush_deferred_route_deliveries(self) -> None:
         if not self._deferred_route_deliveries:
             return
 
-        remaining: deque[tuple[HeimaEvent, str]] = deque(maxlen=_MAX_DEFERRED_ROUTE_DELIVERIES)
+        expired = self._expire_deferred()
+        pending = len(self._deferred_route_deliveries)
+        remaining: deque[tuple[HeimaEvent, str, float]] = deque(maxlen=self._deferred_route_deliveries.maxlen)
+        # Each route is looked up once per flush, however many deliveries wait for it.
+        availability: dict[str, bool] = {}
         while self._deferred_route_deliveries:
-            event, route = self._deferred_route_deliveries.popleft()
-            delivered = await self._try_deliver_route(event=event, route=route, is_retry=True)
+            item = self._deferred_route_deliveries.popleft()
+            event, route, _deferred_at = item
+            try:
+                delivered = await self._try_deliver_route(
+                    event=event, route=route, is_retry=True, availability=availability
+                )
+            except asyncio.CancelledError:
+                # Shutdown: restore the queue as it was so nothing pending is lost.
+                self._deferred_route_deliveries.appendleft(item)
+                self._deferred_route_deliveries.extendleft(reversed(remaining))
+                raise
             if not delivered:
                 if len(remaining) == remaining.maxlen:
                     self._stats.notify_route_deferred_dropped += 1
                     continue
-                remaining.append((event, route))
+                remaining.append(item)
 
         self._deferred_route_deliveries = remaining
+        if expired or len(remaining) != pending:
+            self._deferred_changed()
+
+    def _expire_deferred(self) -> int:
+        if not self._deferred_ttl_s:
+            return 0
+        cutoff = self._clock.utcnow().timestamp() - self._deferred_ttl_s
+        deferred = self._deferred_route_deliveries
+        expired = 0
+        # Entries are appended in deferral order, so the oldest are at the front.
+        while deferred and deferred[0][2] < cutoff:
+            deferred.popleft()
+            expired += 1
+        self._stats.notify_route_deferred_expired += expired
+        return expired
+
+    def _deferred_changed(self) -> None:
+        self._stats.notify_route_deferred_depth = len(self._deferred_route_deliveries)
+        if self._store is not None:
+            self._store.async_delay_save(self._deferred_store_data, _DEFERRED_SAVE_DELAY_S)
+
+    def _deferred_store_data(self) -> dict[str, Any]:
+        return {"deliveries": [_encode_deferred_delivery(item) for item in self._deferred_route_deliveries]}
 
     async def _deliver_or_defer_route(self, *, event: HeimaEvent, route: str, is_retry: bool) -> None:
         delivered = await self._try_deliver_route(event=event, route=route, is_retry=is_retry)
@@ -143,8 +548,15 @@ class HeimaEventPipeline:
             return
         self._defer_route_delivery(event, route)
 
-    async def _try_deliver_route(self, *, event: HeimaEvent, route: str, is_retry: bool) -> bool:
-        if not self._notify_service_available(route):
+    async def _try_deliver_route(
+        self,
+        *,
+        event: HeimaEvent,
+        route: str,
+        is_retry: bool,
+        availability: dict[str, bool] | None = None,
+    ) -> bool:
+        if not self._notify_service_available(route, availability):
             self._stats.notify_route_unavailable += 1
             _LOGGER.debug("Heima notify route unavailable (deferred): notify.%s", route)
             return False
@@ -159,6 +571,8 @@ class HeimaEventPipeline:
         except ServiceNotFound:
             # Race condition: service disappeared between availability check and call.
             self._stats.notify_route_unavailable += 1
+            if availability is not None:
+                availability[route] = False
             _LOGGER.warning("Heima notify route missing at dispatch time (deferred): notify.%s", route)
             return False
         except Exception:  # pragma: no cover - defensive runtime protection
@@ -172,21 +586,24 @@ class HeimaEventPipeline:
         return True
 
     def _defer_route_delivery(self, event: HeimaEvent, route: str) -> None:
-        item = (event, route)
+        self._append_deferred(event, route)
+        self._deferred_changed()
+
+    def _append_deferred(self, event: HeimaEvent, route: str) -> None:
+        item = (event, route, self._clock.utcnow().timestamp())
         # Keep latest attempts; bounded queue avoids unbounded growth during long outages.
         if len(self._deferred_route_deliveries) == self._deferred_route_deliveries.maxlen:
             self._stats.notify_route_deferred_dropped += 1
         self._deferred_route_deliveries.append(item)
 
-    def _notify_service_available(self, route: str) -> bool:
-        services_obj = getattr(self._hass, "services", None)
-        if services_obj is None:
-            return False
-        async_services = getattr(services_obj, "async_services", None)
-        if not callable(async_services):
-            return False
-        notify_services = async_services().get("notify", {})
-        return route in notify_services
+    def _notify_service_available(self, route: str, availability: dict[str, bool] | None = None) -> bool:
+        """Whether ``notify.<route>`` is registered; ``availability`` caches answers for one flush."""
+        if availability is None:
+            return self._hass.services.has_service("notify", route)
+        available = availability.get(route)
+        if available is None:
+            available = availability[route] = self._hass.services.has_service("notify", route)
+        return available
 
     def _notify_payload(self, event: HeimaEvent) -> dict[str, Any]:
         return {
@@ -200,37 +617,72 @@ class HeimaEventPipeline:
             },
         }
 
-    def _resolve_routes(
-        self,
-        *,
-        routes: list[str],
-        recipients: dict[str, list[str]],
-        recipient_groups: dict[str, list[str]],
-        route_targets: list[str],
-    ) -> list[str]:
-        resolved: list[str] = []
-        seen: set[str] = set()
-
-        def add_route(route: str) -> None:
-            if not route or route in seen:
-                return
-            seen.add(route)
-            resolved.append(route)
-
-        for route in routes:
-            add_route(route)
-
-        for target in route_targets:
-            if target in recipients:
-                for route in recipients[target]:
-                    add_route(route)
-                continue
-            if target in recipient_groups:
-                for recipient_id in recipient_groups[target]:
-                    for route in recipients.get(recipient_id, []):
-                        add_route(route)
-                continue
-            self._stats.notify_target_resolution_errors += 1
-            _LOGGER.warning("Heima notification target is undefined and was ignored: %s", target)
 
-        return resolved
+def _bypasses_digest(severity: str, bypass_severity: str) -> bool:
+    if bypass_severity == "none":
+        return False
+    # Unknown severities are delivered immediately rather than held back.
+    return _SEVERITY_RANK.get(severity, len(_SEVERITY_RANK)) >= _SEVERITY_RANK.get(bypass_severity, 0)
+
+
+def _digest_event(route: str, events: list[HeimaEvent]) -> HeimaEvent:
+    severity = max((event.severity for event in events), key=lambda value: _SEVERITY_RANK.get(value, 0))
+    return HeimaEvent(
+        type="system.notification_digest",
+        key=f"system.notification_digest.{route}",
+        severity=severity,
+        title=f"Heima: {len(events)} events",
+        message="\n".join(f"{event.title}: {event.message}" if event.message else event.title for event in events),
+        context={
+            "events": [
+                {
+                    "type": event.type,
+                    "key": event.key,
+                    "severity": event.severity,
+                    "title": event.title,
+                    "event_id": event.event_id,
+                }
+                for event in events
+            ]
+        },
+    )
+
+
+def _encode_deferred_delivery(item: tuple[HeimaEvent, str, float]) -> list[Any]:
+    # Positional rows keep the stored queue compact; see _decode_deferred_deliveries.
+    event, route, deferred_at = item
+    row: list[Any] = [
+        route,
+        round(deferred_at, 1),
+        event.type,
+        event.key,
+        event.severity,
+        event.title,
+        event.message,
+        event.event_id,
+        event.ts,
+    ]
+    if event.context:
+        row.append(event.context)
+    return row
+
+
+def _decode_deferred_deliveries(rows: Iterable[Any]) -> list[tuple[HeimaEvent, str, float]]:
+    decoded: list[tuple[HeimaEvent, str, float]] = []
+    for row in rows:
+        try:
+            route, deferred_at, event_type, key, severity, title, message, event_id, ts, *rest = row
+            event = HeimaEvent(
+                type=str(event_type),
+                key=str(key),
+                severity=str(severity),
+                title=str(title),
+                message=str(message),
+                context=dict(rest[0]) if rest else {},
+                event_id=str(event_id),
+                ts=str(ts),
+            )
+            decoded.append((event, str(route), float(deferred_at)))
+        except (TypeError, ValueError):
+            _LOGGER.debug("Heima ignored a malformed stored notify delivery: %r", row)
+    return decoded
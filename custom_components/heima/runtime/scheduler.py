@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import time
 from dataclasses import dataclass
 from typing import Awaitable, Callable
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import async_call_later
 
+from .clock import SYSTEM_CLOCK, Clock
+
 
 @dataclass(frozen=True)
 class ScheduledRuntimeJob:
@@ -30,8 +31,10 @@ class RuntimeScheduler:
         *,
         entry_id: str,
         on_job_due: Callable[[str], Awaitable[None]],
+        clock: Clock | None = None,
     ) -> None:
         self._hass = hass
+        self._clock = clock or SYSTEM_CLOCK
         self._entry_id = entry_id
         self._on_job_due = on_job_due
         self._jobs: dict[str, ScheduledRuntimeJob] = {}
@@ -64,11 +67,28 @@ class RuntimeScheduler:
                 continue
             self.cancel(job_id)
 
+    async def async_run_due_jobs(self) -> list[str]:
+        """Fire every job already due on the clock, in deadline order.
+
+        Lets a virtual clock drive timed rechecks without waiting on the HA loop.
+        """
+        fired: list[str] = []
+        while True:
+            now = self._clock.monotonic()
+            due = [job for job in self._jobs.values() if job.due_monotonic <= now]
+            if not due:
+                return fired
+            job = min(due, key=lambda item: item.due_monotonic)
+            self.cancel(job.job_id)
+            self._last_fired_at[job.job_id] = now
+            fired.append(job.job_id)
+            await self._on_job_due(job.job_id)
+
     async def async_shutdown(self) -> None:
         self.cancel_owner()
 
     def diagnostics(self) -> dict[str, object]:
-        now = time.monotonic()
+        now = self._clock.monotonic()
         pending = []
         for job in self._jobs.values():
             pending.append(
@@ -88,13 +108,13 @@ class RuntimeScheduler:
     def _schedule(self, job: ScheduledRuntimeJob) -> None:
         self.cancel(job.job_id)
         self._jobs[job.job_id] = job
-        delay = max(0.1, job.due_monotonic - time.monotonic())
+        delay = max(0.1, job.due_monotonic - self._clock.monotonic())
 
         @callback
         def _handle_due(_now) -> None:
             self._unsubs.pop(job.job_id, None)
             self._jobs.pop(job.job_id, None)
-            self._last_fired_at[job.job_id] = time.monotonic()
+            self._last_fired_at[job.job_id] = self._clock.monotonic()
             self._hass.async_create_task(self._on_job_due(job.job_id))
 
         self._unsubs[job.job_id] = async_call_later(self._hass, delay, _handle_due)
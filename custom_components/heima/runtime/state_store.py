@@ -14,6 +14,7 @@ class CanonicalState:
     sensors: dict[str, Any] = field(default_factory=dict)
     sensor_attributes: dict[str, dict[str, Any]] = field(default_factory=dict)
     selects: dict[str, str | None] = field(default_factory=dict)
+    changed_keys: set[str] = field(default_factory=set, repr=False)
 
     def get_binary(self, key: str) -> bool | None:
         return self.binary_sensors.get(key)
@@ -29,16 +30,30 @@ class CanonicalState:
         return dict(attrs) if attrs is not None else None
 
     def set_binary(self, key: str, value: bool | None) -> None:
+        if key not in self.binary_sensors or self.binary_sensors[key] != value:
+            self.changed_keys.add(key)
         self.binary_sensors[key] = value
 
     def set_sensor(self, key: str, value: Any) -> None:
+        if key not in self.sensors or self.sensors[key] != value:
+            self.changed_keys.add(key)
         self.sensors[key] = value
 
     def set_sensor_attributes(self, key: str, value: dict[str, Any] | None) -> None:
         if value is None:
-            self.sensor_attributes.pop(key, None)
+            if self.sensor_attributes.pop(key, None) is not None:
+                self.changed_keys.add(key)
             return
+        if self.sensor_attributes.get(key) != value:
+            self.changed_keys.add(key)
         self.sensor_attributes[key] = dict(value)
 
     def set_select(self, key: str, value: str) -> None:
+        if key not in self.selects or self.selects[key] != value:
+            self.changed_keys.add(key)
         self.selects[key] = value
+
+    def pop_changed_keys(self) -> set[str]:
+        """Return the keys whose value or attributes changed since the last call."""
+        changed, self.changed_keys = self.changed_keys, set()
+        return changed
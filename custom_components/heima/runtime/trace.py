@@ -0,0 +1,61 @@
+"""Diagnostic traces built on every evaluation or only when diagnostics are read."""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+TRACE_MODE_OFF = "off"
+TRACE_MODE_SAMPLED = "sampled"
+TRACE_MODE_FULL = "full"
+
+
+class LazyTrace:
+    """A trace kept as its renderer and the (immutable) values it renders."""
+
+    __slots__ = ("_render", "_args")
+
+    def __init__(self, render: Callable[..., dict[str, Any]], *args: Any) -> None:
+        self._render = render
+        self._args = args
+
+    def render(self) -> dict[str, Any]:
+        return self._render(*self._args)
+
+
+def render_trace(trace: Any) -> Any:
+    """Return ``trace`` as a dict, rendering it first if it is lazy."""
+    return trace.render() if isinstance(trace, LazyTrace) else trace
+
+
+class TracePolicy:
+    """Decides per evaluation whether trace dicts are built eagerly.
+
+    ``off`` keeps lazy traces only, ``sampled`` builds them eagerly on one
+    evaluation in ``sample_every`` and ``full`` on every evaluation. Rendered
+    content is the same in every mode; only when it is built differs.
+    """
+
+    def __init__(self, mode: str = TRACE_MODE_OFF, sample_every: int = 1) -> None:
+        self.mode = mode
+        self.sample_every = max(1, int(sample_every))
+        self.eager = mode == TRACE_MODE_FULL
+        self._evaluations = 0
+        self._eager_evaluations = 0
+
+    def begin_evaluation(self) -> None:
+        self._evaluations += 1
+        if self.mode == TRACE_MODE_SAMPLED:
+            self.eager = (self._evaluations - 1) % self.sample_every == 0
+        if self.eager:
+            self._eager_evaluations += 1
+
+    def trace(self, render: Callable[..., dict[str, Any]], *args: Any) -> dict[str, Any] | LazyTrace:
+        return render(*args) if self.eager else LazyTrace(render, *args)
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "sample_every": self.sample_every,
+            "evaluations": self._evaluations,
+            "eager_evaluations": self._eager_evaluations,
+        }
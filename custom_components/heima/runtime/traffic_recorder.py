@@ -0,0 +1,131 @@
+"""Compact on-disk recording of the traffic that drives Heima evaluations.
+
+A recording is a gzip stream of JSON lines. The first line is a header with the
+config entry options, the initial state of every tracked entity and the
+engine's external inputs (selects, manual holds, house-state override). Each
+following line is a compact array whose first two items are a record kind and
+the offset in seconds from the start of the recording:
+
+- ``["s", t, entity_id, state, attributes | null]``: tracked state change
+- ``["r", t, reason, external_inputs]``: explicit evaluation request
+- ``["j", t, job_id]``: scheduler firing
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+TRAFFIC_LOG_VERSION = 1
+RECORD_STATE = "s"
+RECORD_REQUEST = "r"
+RECORD_JOB = "j"
+
+# Attributes are only kept for domains whose attributes the engine reads.
+_ATTRIBUTE_DOMAINS = ("climate.",)
+_FLUSH_EVERY = 200
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _state_payload(state: Any) -> list[Any] | None:
+    if state is None:
+        return None
+    attributes = None
+    if str(getattr(state, "entity_id", "")).startswith(_ATTRIBUTE_DOMAINS):
+        attributes = dict(getattr(state, "attributes", {}) or {})
+    return [state.state, attributes]
+
+
+@dataclass
+class TrafficRecorder:
+    """Buffers traffic records; the owner flushes them to ``path``."""
+
+    path: Path
+    started_monotonic: float = field(default_factory=time.monotonic)
+    records: int = 0
+    _buffer: list[str] = field(default_factory=list)
+
+    def header(
+        self,
+        *,
+        entry_id: str,
+        options: dict[str, Any],
+        states: dict[str, Any],
+        external_inputs: dict[str, Any],
+    ) -> None:
+        self._buffer.append(
+            _dumps(
+                {
+                    "version": TRAFFIC_LOG_VERSION,
+                    "entry_id": entry_id,
+                    "started_at": datetime.now(timezone.utc).isoformat(),
+                    "options": options,
+                    "states": {
+                        entity_id: _state_payload(state) for entity_id, state in sorted(states.items())
+                    },
+                    "external_inputs": external_inputs,
+                }
+            )
+        )
+
+    def _offset(self) -> float:
+        return round(time.monotonic() - self.started_monotonic, 3)
+
+    def _append(self, record: list[Any]) -> None:
+        self._buffer.append(_dumps(record))
+        self.records += 1
+
+    def record_state(self, entity_id: str, state: Any) -> None:
+        payload = _state_payload(state) or [None, None]
+        self._append([RECORD_STATE, self._offset(), entity_id, *payload])
+
+    def record_request(self, reason: str, external_inputs: dict[str, Any]) -> None:
+        self._append([RECORD_REQUEST, self._offset(), reason, external_inputs])
+
+    def record_job(self, job_id: str) -> None:
+        self._append([RECORD_JOB, self._offset(), job_id])
+
+    @property
+    def needs_flush(self) -> bool:
+        return len(self._buffer) >= _FLUSH_EVERY
+
+    def take_buffer(self) -> list[str]:
+        lines, self._buffer = self._buffer, []
+        return lines
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {"path": str(self.path), "records": self.records, "buffered": len(self._buffer)}
+
+
+def write_traffic_lines(path: Path, lines: list[str]) -> None:
+    """Append lines as a new gzip member (blocking; run in an executor)."""
+    if not lines:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8") as handle:
+        handle.write("\n".join(lines) + "\n")
+
+
+def read_traffic_log(path: str | Path) -> tuple[dict[str, Any], Iterator[list[Any]]]:
+    """Return the header and an iterator over the records of a recording."""
+    handle = gzip.open(path, "rt", encoding="utf-8")
+    header = json.loads(handle.readline())
+    if header.get("version") != TRAFFIC_LOG_VERSION:
+        handle.close()
+        raise ValueError(f"Unsupported Heima traffic log version: {header.get('version')!r}")
+
+    def _records() -> Iterator[list[Any]]:
+        with handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    return header, _records()
@@ -7,18 +7,21 @@ from typing import Any
 from collections.abc import Iterable
 
 import voluptuous as vol
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     HOUSE_STATES_CANONICAL,
     SERVICE_COMMAND,
+    SERVICE_QUERY_HISTORY,
     SERVICE_SET_MODE,
     SERVICE_SET_OVERRIDE,
 )
 from .coordinator import HeimaCoordinator
+from .runtime.history import DEFAULT_SNAPSHOT_HISTORY_SIZE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,12 +49,28 @@ SET_OVERRIDE_SCHEMA = vol.Schema(
     }
 )
 
+QUERY_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("since"): cv.datetime,
+        vol.Optional("until"): cv.datetime,
+        vol.Optional("room"): cv.string,
+        vol.Optional("reason"): cv.string,
+        vol.Optional("changed_only", default=False): cv.boolean,
+        vol.Optional("limit", default=200): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=DEFAULT_SNAPSHOT_HISTORY_SIZE)
+        ),
+    }
+)
+
 SUPPORTED_COMMANDS = {
     "recompute_now",
     "set_lighting_intent",
     "set_security_intent",
     "set_room_lighting_hold",
     "notify_event",
+    "start_recording",
+    "stop_recording",
 }
 
 
@@ -201,6 +220,17 @@ async def async_register_services(hass: HomeAssistant) -> None:
                 )
             return
 
+        if command == "start_recording":
+            for coordinator in coordinators:
+                path = await coordinator.async_start_recording()
+                _LOGGER.debug("Heima recording for %s: %s", coordinator.entry.entry_id, path)
+            return
+
+        if command == "stop_recording":
+            for coordinator in coordinators:
+                await coordinator.async_stop_recording()
+            return
+
     async def _handle_set_mode(call: ServiceCall) -> None:
         payload = dict(call.data)
         mode = str(payload.get("mode", "")).strip()
@@ -242,8 +272,41 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
         raise ServiceValidationError(f"Unsupported override scope '{scope}'")
 
+    async def _handle_query_history(call: ServiceCall) -> ServiceResponse:
+        payload = dict(call.data)
+        coordinators = _coordinators_for_target(hass, payload)
+        if not coordinators:
+            raise ServiceValidationError("No active Heima config entries found")
+        since = payload.get("since")
+        until = payload.get("until")
+        results = []
+        for coordinator in coordinators:
+            entries = coordinator.engine.query_history(
+                since=dt_util.as_utc(since) if since else None,
+                until=dt_util.as_utc(until) if until else None,
+                room=payload.get("room"),
+                reason=payload.get("reason"),
+                changed_only=bool(payload.get("changed_only", False)),
+                limit=payload.get("limit"),
+            )
+            results.append(
+                {
+                    "entry_id": coordinator.entry.entry_id,
+                    "current": coordinator.engine.snapshot.as_dict(),
+                    "entries": [entry.as_dict() for entry in entries],
+                }
+            )
+        return {"results": results}
+
     hass.services.async_register(DOMAIN, SERVICE_COMMAND, _handle_command, schema=COMMAND_SCHEMA)
     hass.services.async_register(DOMAIN, SERVICE_SET_MODE, _handle_set_mode, schema=SET_MODE_SCHEMA)
     hass.services.async_register(
         DOMAIN, SERVICE_SET_OVERRIDE, _handle_set_override, schema=SET_OVERRIDE_SCHEMA
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        _handle_query_history,
+        schema=QUERY_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+
+from benchmarks.engine_hot_path import BENCHMARKS, main, run_benchmarks
+from benchmarks.synthetic_house import HouseSize, build_house, build_options
+
+
+def test_synthetic_house_options_bind_every_generated_entity():
+    size = HouseSize(rooms=12, people=3, zones=4)
+    house = build_house(size)
+
+    options = build_options(size)
+    assert len(options["rooms"]) == 12
+    assert sorted(room for zone in options["lighting_zones"] for room in zone["rooms"]) == sorted(
+        room["room_id"] for room in options["rooms"]
+    )
+    assert all(house.states.get(entity_id) is not None for entity_id in house.engine.tracked_entity_ids())
+
+
+def test_benchmark_report_is_machine_readable(tmp_path):
+    report = run_benchmarks([HouseSize(rooms=5, people=1, zones=1)], iterations=2)
+    assert {result["benchmark"] for result in report["results"]} == set(BENCHMARKS)
+    assert all(result["mean_ms"] > 0 for result in report["results"])
+
+    output = tmp_path / "bench.json"
+    assert main(["--rooms", "5", "--iterations", "2", "--benchmark", "build_apply_plan", "--output", str(output)]) == 0
+    payload = json.loads(output.read_text())
+    assert payload["schema_version"] == 1
+    assert payload["results"][0]["size"]["rooms"] == 5
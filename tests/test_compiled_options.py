@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from custom_components.heima.runtime.compiled_options import CompiledOptions
+
+
+def _options() -> dict:
+    return {
+        "rooms": [
+            {
+                "room_id": "kitchen",
+                "occupancy_mode": "derived",
+                "sources": ["binary_sensor.kitchen_motion"],
+                "logic": "weighted_quorum",
+                "source_weights": {"binary_sensor.kitchen_motion": "2", "binary_sensor.kitchen_door": "bad"},
+                "weight_threshold": "1.5",
+                "max_on_s": "900",
+                "area_id": " kitchen_area ",
+            },
+            {"room_id": "garage", "occupancy_mode": "none"},
+            {"room_id": "", "sources": ["binary_sensor.ignored"]},
+        ],
+        "lighting_zones": [
+            {"zone_id": "day", "rooms": ["kitchen", "garage"]},
+            {"zone_id": "all", "rooms": ["kitchen"]},
+        ],
+        "lighting_apply_mode": "bogus",
+        "house_signals": {"guest_mode": " input_boolean.guest ", "vacation_mode": ""},
+        "notifications": {
+            "enabled_event_categories": ["people"],
+            "occupancy_mismatch_policy": "nope",
+        },
+    }
+
+
+def test_compiled_options_resolves_rooms_and_zone_indexes():
+    config = CompiledOptions.from_options(_options())
+
+    assert [room.room_id for room in config.rooms] == ["kitchen", "garage"]
+    kitchen = config.rooms_by_id["kitchen"]
+    assert kitchen.on_dwell_s == 5
+    assert kitchen.off_dwell_s == 120
+    assert kitchen.max_on_s == 900
+    assert kitchen.area_id == "kitchen_area"
+    assert kitchen.source_weights == {"binary_sensor.kitchen_motion": 2.0}
+    assert kitchen.weight_threshold == 1.5
+    assert config.rooms_by_id["garage"].weight_threshold is None
+    assert config.room_occupancy_mode("garage") == "none"
+    assert config.room_occupancy_mode("unknown") == "derived"
+    assert config.derived_room_ids == ["kitchen"]
+
+    assert config.zone_rooms["day"] == ("kitchen", "garage")
+    assert config.zones[0].occupancy_capable_rooms == ("kitchen",)
+    assert config.zones_for_rooms({"kitchen"}) == {"day", "all"}
+    assert config.zones_for_rooms({"garage"}) == {"day"}
+
+
+def test_compiled_options_normalizes_modes_and_is_immutable():
+    config = CompiledOptions.from_options(_options())
+
+    assert config.lighting_apply_mode == "scene"
+    assert dict(config.house_signal_entities) == {"guest_mode": "input_boolean.guest"}
+    assert config.notifications.enabled_event_categories == frozenset({"people", "system"})
+    assert config.notifications.occupancy_mismatch.policy == "smart"
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.lighting_apply_mode = "delegate"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        config.zone_rooms["night"] = ()  # type: ignore[index]
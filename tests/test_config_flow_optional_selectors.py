@@ -145,6 +145,7 @@ def test_notifications_payload_parses_recipients_groups_and_route_targets():
             ),
             "recipient_groups": "family=stefano,laura\ninvalid=missing",
             "route_targets": "family\nstefano\nmissing",
+            "category_route_targets": "security=stefano,missing\nunknown_category=family",
             "enabled_event_categories": [],
             "dedup_window_s": 60,
             "rate_limit_per_key_s": 300,
@@ -156,6 +157,7 @@ def test_notifications_payload_parses_recipients_groups_and_route_targets():
     }
     assert normalized["recipient_groups"] == {"family": ["stefano", "laura"]}
     assert normalized["route_targets"] == ["family", "stefano"]
+    assert normalized["category_route_targets"] == {"security": ["stefano"]}
 
 
 def test_people_payload_parses_weighted_quorum_group_fields():
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.heima.const import DOMAIN
+
+
+def _entry(options: dict) -> MockConfigEntry:
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Heima",
+        data={},
+        options=options,
+    )
+
+
+@pytest.mark.asyncio
+async def test_coordinator_subscribes_only_to_tracked_entities(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    entry = _entry(
+        {
+            "rooms": [
+                {
+                    "room_id": "studio",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.studio_presence"],
+                    "logic": "any_of",
+                    "on_dwell_s": 0,
+                    "off_dwell_s": 0,
+                }
+            ]
+        }
+    )
+    entry.add_to_hass(hass)
+    hass.states.async_set("binary_sensor.studio_presence", "off")
+    hass.states.async_set("sensor.unrelated", "1")
+    await hass.async_block_till_done()
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    diag = coordinator.state_subscription_diagnostics()
+    assert diag["entity_ids"] == ["binary_sensor.studio_presence"]
+    assert diag["tracked_entities"] == 1
+    assert diag["untracked_entities"] >= 1
+
+    hass.states.async_set("sensor.unrelated", "2")
+    await hass.async_block_till_done()
+    assert coordinator.state_subscription_diagnostics()["callbacks_received"] == 0
+
+    hass.states.async_set("binary_sensor.studio_presence", "on")
+    await hass.async_block_till_done()
+    assert coordinator.state_subscription_diagnostics()["callbacks_received"] == 1
+    assert coordinator.evaluation_queue.diagnostics()["stats"]["last_batch_reasons"] == [
+        "state_changed:binary_sensor.studio_presence"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_listens_to_same_state_reports_of_staleness_tracked_sources(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    entry = _entry(
+        {
+            "rooms": [
+                {
+                    "room_id": "studio",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.studio_mmwave"],
+                    "logic": "any_of",
+                    "on_dwell_s": 0,
+                    "off_dwell_s": 0,
+                    "source_stale_s": 600,
+                },
+                {
+                    "room_id": "kitchen",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.kitchen_presence"],
+                    "logic": "any_of",
+                },
+            ]
+        }
+    )
+    entry.add_to_hass(hass)
+    hass.states.async_set("binary_sensor.studio_mmwave", "on")
+    hass.states.async_set("binary_sensor.kitchen_presence", "on")
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator.state_subscription_diagnostics()["reported_entity_ids"] == ["binary_sensor.studio_mmwave"]
+
+    # Same state again: Home Assistant fires state_reported, not state_changed.
+    hass.states.async_set("binary_sensor.studio_mmwave", "on")
+    hass.states.async_set("binary_sensor.kitchen_presence", "on")
+    await hass.async_block_till_done()
+
+    assert coordinator.state_subscription_diagnostics()["callbacks_received"] == 1
+    assert coordinator.evaluation_queue.diagnostics()["stats"]["last_batch_reasons"] == [
+        "state_reported:binary_sensor.studio_mmwave"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_resubscribe_is_incremental(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+    monkeypatch,
+):
+    entry = _entry(
+        {
+            "rooms": [
+                {
+                    "room_id": "studio",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.studio_presence", "binary_sensor.studio_motion"],
+                    "logic": "any_of",
+                }
+            ]
+        }
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    monkeypatch.setattr(
+        coordinator.engine,
+        "tracked_entity_ids",
+        lambda: {"binary_sensor.studio_presence", "binary_sensor.kitchen_presence"},
+    )
+    coordinator._resubscribe_state_changes()
+
+    diag = coordinator.state_subscription_diagnostics()
+    assert diag["entity_ids"] == ["binary_sensor.kitchen_presence", "binary_sensor.studio_presence"]
+    assert diag["last_rebuild"] == {"added": 1, "removed": 1}
+
+    hass.states.async_set("binary_sensor.studio_motion", "on")
+    hass.states.async_set("binary_sensor.kitchen_presence", "on")
+    await hass.async_block_till_done()
+    assert coordinator.state_subscription_diagnostics()["callbacks_received"] == 1
+
+
+@pytest.mark.asyncio
+async def test_coordinator_writes_only_entities_with_changed_state(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    entry = _entry(
+        {
+            "rooms": [
+                {
+                    "room_id": "studio",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.studio_presence"],
+                    "logic": "any_of",
+                    "on_dwell_s": 0,
+                    "off_dwell_s": 0,
+                }
+            ]
+        }
+    )
+    entry.add_to_hass(hass)
+    hass.states.async_set("binary_sensor.studio_presence", "off")
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    assert coordinator.engine.state.changed_keys == set()
+
+    hass.states.async_set("binary_sensor.studio_presence", "on")
+    await hass.async_block_till_done()
+
+    assert hass.states.get("binary_sensor.heima_occupancy_studio").state == "on"
+    writes = coordinator.entity_write_diagnostics()
+    assert 0 < writes["written"] < writes["skipped"]
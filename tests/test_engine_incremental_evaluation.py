@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.heima.runtime.clock import VirtualClock
+from custom_components.heima.runtime.engine import HeimaEngine
+
+
+class _FakeStates:
+    def __init__(self, values: dict[str, str] | None = None):
+        self._values = dict(values or {})
+
+    def get(self, entity_id: str):
+        value = self._values.get(entity_id)
+        if value is None:
+            return None
+        return SimpleNamespace(state=value)
+
+    def set(self, entity_id: str, value: str) -> None:
+        self._values[entity_id] = value
+
+
+class _FakeServices:
+    def has_service(self, domain, service):
+        return False
+
+    async def async_call(self, domain, service, data, blocking=False):
+        return None
+
+
+class _FakeBus:
+    def async_fire(self, event_type, data):
+        return None
+
+
+def _options() -> dict:
+    return {
+        "people_named": [
+            {
+                "slug": "alex",
+                "presence_method": "quorum",
+                "sources": ["binary_sensor.alex_phone"],
+                "required": 1,
+            }
+        ],
+        "rooms": [
+            {
+                "room_id": "kitchen",
+                "occupancy_mode": "derived",
+                "sources": ["binary_sensor.kitchen_motion"],
+                "logic": "any_of",
+                "on_dwell_s": 0,
+                "off_dwell_s": 0,
+            },
+            {
+                "room_id": "bathroom",
+                "occupancy_mode": "derived",
+                "sources": ["binary_sensor.bathroom_motion"],
+                "logic": "any_of",
+                "on_dwell_s": 0,
+                "off_dwell_s": 0,
+            },
+        ],
+        "lighting_zones": [
+            {"zone_id": "day", "rooms": ["kitchen"]},
+            {"zone_id": "night", "rooms": ["bathroom"]},
+        ],
+        "house_signals": {"guest_mode": "input_boolean.guest_mode"},
+    }
+
+
+def _engine(states: _FakeStates, *, clock: VirtualClock | None = None) -> HeimaEngine:
+    hass = SimpleNamespace(states=states, services=_FakeServices(), bus=_FakeBus())
+    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=_options()), clock=clock)
+    engine._build_default_state()
+    return engine
+
+
+def _evaluate(engine: HeimaEngine, changed: set[str] | None = None):
+    engine._snapshot = engine._compute_snapshot(reason="test", changed_entity_ids=changed)
+    return engine._snapshot
+
+
+def test_incremental_evaluation_recomputes_only_dirty_nodes():
+    states = _FakeStates(
+        {
+            "binary_sensor.alex_phone": "on",
+            "binary_sensor.kitchen_motion": "off",
+            "binary_sensor.bathroom_motion": "off",
+            "input_boolean.guest_mode": "off",
+        }
+    )
+    engine = _engine(states)
+    _evaluate(engine)
+    assert engine.diagnostics()["incremental"]["last_evaluation"]["mode"] == "full"
+
+    states.set("binary_sensor.bathroom_motion", "on")
+    snapshot = _evaluate(engine, {"binary_sensor.bathroom_motion"})
+
+    assert snapshot.occupied_rooms == ["bathroom"]
+    assert snapshot.anyone_home is True
+    trace = engine.diagnostics()["incremental"]["last_evaluation"]
+    assert trace["mode"] == "incremental"
+    assert trace["changed_entity_ids"] == ["binary_sensor.bathroom_motion"]
+    assert set(trace["recomputed_nodes"]) == {"room:bathroom", "house_state", "zone:night"}
+    assert "room:kitchen" in trace["reused_nodes"]
+    assert "person:alex" in trace["reused_nodes"]
+    assert "zone:day" in trace["reused_nodes"]
+    assert "heating" in trace["reused_nodes"]
+    assert engine.state.get_binary("heima_occ_bathroom") is True
+
+
+def test_incremental_evaluation_house_state_change_recomputes_zones_and_heating():
+    states = _FakeStates(
+        {
+            "binary_sensor.alex_phone": "on",
+            "binary_sensor.kitchen_motion": "on",
+            "binary_sensor.bathroom_motion": "off",
+            "input_boolean.guest_mode": "off",
+        }
+    )
+    engine = _engine(states)
+    _evaluate(engine)
+
+    states.set("input_boolean.guest_mode", "on")
+    snapshot = _evaluate(engine, {"input_boolean.guest_mode"})
+
+    assert snapshot.house_state == "guest"
+    trace = engine.diagnostics()["incremental"]["last_evaluation"]
+    assert {"house_signal:guest_mode", "zone:day", "zone:night", "heating"} <= set(
+        trace["recomputed_nodes"]
+    )
+    assert "room:kitchen" in trace["reused_nodes"]
+    assert snapshot.occupied_rooms == ["kitchen"]
+
+
+def test_incremental_evaluation_matches_full_evaluation_results():
+    values = {
+        "binary_sensor.alex_phone": "off",
+        "binary_sensor.kitchen_motion": "off",
+        "binary_sensor.bathroom_motion": "off",
+        "input_boolean.guest_mode": "off",
+    }
+    incremental_states = _FakeStates(values)
+    full_states = _FakeStates(values)
+    incremental = _engine(incremental_states)
+    full = _engine(full_states)
+    _evaluate(incremental)
+    _evaluate(full)
+
+    for entity_id, value in (
+        ("binary_sensor.alex_phone", "on"),
+        ("binary_sensor.kitchen_motion", "on"),
+        ("input_boolean.guest_mode", "on"),
+        ("binary_sensor.kitchen_motion", "off"),
+    ):
+        incremental_states.set(entity_id, value)
+        full_states.set(entity_id, value)
+        inc_snapshot = _evaluate(incremental, {entity_id})
+        full_snapshot = _evaluate(full)
+        assert inc_snapshot.house_state == full_snapshot.house_state
+        assert inc_snapshot.occupied_rooms == full_snapshot.occupied_rooms
+        assert inc_snapshot.lighting_intents == full_snapshot.lighting_intents
+        assert inc_snapshot.people_count == full_snapshot.people_count
+
+
+@pytest.mark.asyncio
+async def test_input_fingerprint_skips_no_op_evaluations():
+    clock = VirtualClock()
+    states = _FakeStates(
+        {
+            "binary_sensor.alex_phone": "on",
+            "binary_sensor.kitchen_motion": "off",
+            "binary_sensor.bathroom_motion": "off",
+            "input_boolean.guest_mode": "off",
+        }
+    )
+    engine = _engine(states, clock=clock)
+    await engine.async_evaluate("initialize")
+    first = engine.snapshot
+
+    await engine.async_evaluate("state_changed:binary_sensor.alex_phone", skip_if_unchanged=True)
+    assert engine.snapshot is first
+    assert engine.diagnostics()["fingerprint"]["hits"] == 1
+    assert engine.diagnostics()["fingerprint"]["last_result"] == "hit"
+
+    engine.set_house_state_override(mode="vacation", enabled=True, source="test")
+    await engine.async_evaluate("state_changed:input_boolean.guest_mode", skip_if_unchanged=True)
+    assert engine.snapshot.house_state == "vacation"
+    assert engine.diagnostics()["fingerprint"]["last_result"] == "miss:inputs_changed"
+
+    engine._timed_rechecks["occupancy:dwell:kitchen"] = {"due_monotonic": clock.monotonic() + 5}
+    engine._input_fingerprint = engine._compute_input_fingerprint()
+    clock.advance(10)
+    await engine.async_evaluate("scheduler:occupancy:dwell:kitchen", skip_if_unchanged=True)
+    assert engine.diagnostics()["fingerprint"]["last_result"] == "miss:timer_matured"
+    assert engine.diagnostics()["fingerprint"]["misses"] == 2
+
+    await engine.async_evaluate("service:recompute_now")
+    assert engine.snapshot.notes == "reason=service:recompute_now"
+    assert engine.diagnostics()["fingerprint"]["misses"] == 2
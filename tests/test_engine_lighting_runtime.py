@@ -44,8 +44,8 @@ class _FakeServices:
             raise ServiceNotFound(domain, service)
         self.calls.append((domain, service, dict(data), blocking))
 
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
 
 def _entry_with_options(options: dict) -> SimpleNamespace:
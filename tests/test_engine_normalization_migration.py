@@ -3,6 +3,7 @@ from __future__ import annotations
 from types import SimpleNamespace
 
 from custom_components.heima.runtime.engine import HeimaEngine
+from custom_components.heima.runtime.normalization import InputNormalizer
 from custom_components.heima.runtime.normalization.contracts import DerivedObservation, build_observation
 
 
@@ -18,8 +19,8 @@ class _FakeStates:
 
 
 class _FakeServices:
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
     async def async_call(self, domain, service, data, blocking=False):
         return None
@@ -30,13 +31,14 @@ class _FakeBus:
         return None
 
 
-class _FakeNormalizer:
+class _FakeNormalizer(InputNormalizer):
     def __init__(self):
+        super().__init__(SimpleNamespace(states=_FakeStates()))
         self.presence_calls: list[str | None] = []
         self.boolean_calls: list[str | None] = []
         self.derive_calls: list[tuple[str, str, dict]] = []
 
-    def presence(self, entity_id: str | None):
+    def presence(self, entity_id: str | None, *, stale_after_s=None):
         self.presence_calls.append(entity_id)
         return build_observation(
             kind="presence",
@@ -78,6 +80,14 @@ class _FakeNormalizer:
             reason="derived",
         )
 
+    def _run_fusion(self, fusion, inputs):
+        # Route compiled fusions through the recording derive() with the facade-level config.
+        cfg = {"plugin_id": fusion.plugin_id, **fusion.strategy_cfg, "fallback_state": fusion.fallback_state}
+        return self.derive(kind=fusion.kind, inputs=inputs, strategy_cfg=cfg, context=fusion.context)
+
+    def derive_many(self, calls):
+        return [self._run_fusion(fusion, inputs) for fusion, inputs in calls]
+
     def diagnostics(self):
         return {"derive_calls": len(self.derive_calls)}
 
@@ -101,15 +111,14 @@ class _FailSafeCaptureNormalizer(_FakeNormalizer):
         )
 
 
-def _engine(state_values: dict[str, str] | None = None) -> HeimaEngine:
+def _engine(state_values: dict[str, str] | None = None, *, normalizer=None) -> HeimaEngine:
     hass = SimpleNamespace(states=_FakeStates(state_values), services=_FakeServices(), bus=_FakeBus())
-    return HeimaEngine(hass=hass, entry=SimpleNamespace(options={}))
+    return HeimaEngine(hass=hass, entry=SimpleNamespace(options={}), normalizer=normalizer)
 
 
 def test_is_presence_on_uses_input_normalizer_facade():
-    engine = _engine()
     fake = _FakeNormalizer()
-    engine._normalizer = fake  # internal swap for migration regression test
+    engine = _engine(normalizer=fake)
 
     assert engine._is_presence_on("binary_sensor.room") is True
     assert engine._is_presence_on("binary_sensor.other") is False
@@ -117,9 +126,8 @@ def test_is_presence_on_uses_input_normalizer_facade():
 
 
 def test_is_on_any_uses_boolean_signal_normalizer_facade():
-    engine = _engine()
     fake = _FakeNormalizer()
-    engine._normalizer = fake
+    engine = _engine(normalizer=fake)
 
     result = engine._is_on_any(["binary_sensor.work_window", "binary_sensor.relax_mode"])
 
@@ -128,9 +136,8 @@ def test_is_on_any_uses_boolean_signal_normalizer_facade():
 
 
 def test_compute_group_presence_uses_quorum_plugin():
-    engine = _engine()
     fake = _FakeNormalizer()
-    engine._normalizer = fake
+    engine = _engine(normalizer=fake)
 
     fused, active_count = engine._compute_group_presence(
         ["binary_sensor.room", "binary_sensor.other"], required=1
@@ -152,18 +159,16 @@ def test_compute_group_presence_uses_quorum_plugin():
 
 
 def test_is_entity_home_uses_presence_normalizer():
-    engine = _engine()
     fake = _FakeNormalizer()
-    engine._normalizer = fake
+    engine = _engine(normalizer=fake)
 
     assert engine._is_entity_home("binary_sensor.room") is True
     assert engine._is_entity_home("binary_sensor.other") is False
 
 
 def test_engine_diagnostics_include_normalizer_diagnostics():
-    engine = _engine()
     fake = _FakeNormalizer()
-    engine._normalizer = fake
+    engine = _engine(normalizer=fake)
 
     diagnostics = engine.diagnostics()
 
@@ -171,9 +176,8 @@ def test_engine_diagnostics_include_normalizer_diagnostics():
 
 
 def test_compute_group_presence_requests_fail_safe_off_fallback():
-    engine = _engine()
     fake = _FailSafeCaptureNormalizer()
-    engine._normalizer = fake
+    engine = _engine(normalizer=fake)
 
     fused, active_count = engine._compute_group_presence(
         ["binary_sensor.room", "binary_sensor.other"], required=1
@@ -221,9 +225,8 @@ def test_compute_group_presence_records_local_trace():
 
 
 def test_compute_group_presence_supports_weighted_quorum_strategy():
-    engine = _engine()
     fake = _FakeNormalizer()
-    engine._normalizer = fake
+    engine = _engine(normalizer=fake)
 
     fused, active_count = engine._compute_group_presence(
         ["binary_sensor.room", "binary_sensor.other"],
@@ -256,9 +259,8 @@ def test_compute_group_presence_supports_weighted_quorum_strategy():
 
 
 def test_compute_house_signal_uses_plugin_fusion_and_trace():
-    engine = _engine({"binary_sensor.relax_mode": "on"})
     fake = _FakeNormalizer()
-    engine._normalizer = fake
+    engine = _engine({"binary_sensor.relax_mode": "on"}, normalizer=fake)
 
     is_on = engine._compute_house_signal("relax_mode", ["binary_sensor.relax_mode"])
 
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from benchmarks.synthetic_house import HouseSize, build_house
+from custom_components.heima.runtime.clock import VirtualClock
+from custom_components.heima.runtime.trace import LazyTrace
+
+_SIZE = HouseSize(rooms=6, people=2, zones=2)
+_TRACE_SECTIONS = ("presence", "house_signals", "occupancy", "security")
+
+
+def _without_ts(value):
+    # Observation timestamps come from wall-clock time, not the engine clock.
+    if isinstance(value, dict):
+        return {key: _without_ts(item) for key, item in value.items() if key != "ts"}
+    if isinstance(value, list):
+        return [_without_ts(item) for item in value]
+    return value
+
+
+def _traces(diagnostics):
+    return _without_ts({section: diagnostics[section] for section in _TRACE_SECTIONS})
+
+
+def test_lazy_traces_render_the_same_diagnostics_as_eager_traces():
+    clock = VirtualClock()
+    lazy = build_house(_SIZE, trace_mode="off", clock=clock)
+    eager = build_house(_SIZE, trace_mode="full", clock=clock)
+    for house in (lazy, eager):
+        house.engine._snapshot = house.engine._compute_snapshot(reason="test")
+
+    assert all(isinstance(trace, LazyTrace) for trace in lazy.engine._occupancy_room_trace.values())
+    assert not any(isinstance(trace, LazyTrace) for trace in eager.engine._occupancy_room_trace.values())
+    assert _traces(lazy.engine.diagnostics()) == _traces(eager.engine.diagnostics())
+    assert lazy.engine.diagnostics()["occupancy"]["room_trace"]["room_0"]["source_observations"]
+
+
+def test_sampled_traces_are_built_eagerly_once_every_n_evaluations():
+    house = build_house(_SIZE, trace_mode="sampled")
+    house.engine._entry.options["trace_sample_every"] = 3
+    house.engine._load_compiled_options()
+
+    eager = []
+    for _ in range(6):
+        house.engine._snapshot = house.engine._compute_snapshot(reason="test")
+        eager.append(not isinstance(house.engine._occupancy_room_trace["room_0"], LazyTrace))
+
+    assert eager == [True, False, False, True, False, False]
+    assert house.engine.diagnostics()["traces"] == {
+        "mode": "sampled",
+        "sample_every": 3,
+        "evaluations": 6,
+        "eager_evaluations": 2,
+    }
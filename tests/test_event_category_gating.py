@@ -38,8 +38,8 @@ class _FakeServices:
     async def async_call(self, domain, service, data, blocking=False):
         self.calls.append((domain, service, dict(data), blocking))
 
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
 
 def _engine(notifications: dict | None = None) -> HeimaEngine:
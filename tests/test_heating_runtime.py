@@ -4,6 +4,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from custom_components.heima.runtime.clock import VirtualClock
 from custom_components.heima.runtime.engine import HeimaEngine
 
 
@@ -43,8 +44,8 @@ class _FakeServices:
     async def async_call(self, domain, service, data, blocking=False):
         self.calls.append((domain, service, dict(data), blocking))
 
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
 
 def _entry_with_options(options: dict) -> SimpleNamespace:
@@ -580,3 +581,38 @@ async def test_heating_runtime_emits_vacation_bindings_unavailable_event_once_pe
     payloads = [payload for event_type, payload in engine._hass.bus.events if event_type == "heima_event"]
     unavailable = [payload for payload in payloads if payload["type"] == "heating.vacation_bindings_unavailable"]
     assert len(unavailable) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_heating_apply_schedules_recheck_at_window_end():
+    clock = VirtualClock()
+    options = {
+        "heating": {
+            "climate_entity": "climate.test_thermostat",
+            "apply_mode": "set_temperature",
+            "temperature_step": 0.5,
+            "override_branches": {"away": {"branch": "fixed_target", "target_temperature": 20.0}},
+        }
+    }
+    hass = SimpleNamespace(
+        states=_FakeStates({"climate.test_thermostat": ("heat", {"temperature": 18.0})}),
+        services=_FakeServices(),
+        bus=_FakeBus(),
+    )
+    engine = HeimaEngine(hass=hass, entry=_entry_with_options(options), clock=clock)
+    engine._build_default_state()
+
+    await engine.async_evaluate(reason="initialize")
+    applied_at = engine._heating_last_apply_ts
+    assert applied_at == clock.monotonic()
+
+    # The thermostat has not caught up yet, so the same target is rate-limited.
+    clock.advance(10)
+    await engine.async_evaluate(reason="service:recompute_now")
+    assert engine.state.get_sensor("heima_heating_reason") == "apply_rate_limited"
+    job = engine.scheduled_runtime_jobs()["heating:rate_limit"]
+    assert job.due_monotonic == applied_at + 60
+
+    # An unrelated incremental pass keeps the recheck armed.
+    await engine.async_evaluate(reason="state_changed:sensor.unrelated", changed_entity_ids=["sensor.unrelated"])
+    assert "heating:rate_limit" in engine.scheduled_runtime_jobs()
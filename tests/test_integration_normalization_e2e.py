@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import threading
 
 import pytest
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.heima.const import DOMAIN, SERVICE_SET_MODE
-from custom_components.heima.runtime.normalization import InputNormalizer, NormalizationFusionRegistry
+from custom_components.heima.coordinator import HeimaCoordinator
+from custom_components.heima.runtime.normalization import (
+    DerivedObservation,
+    InputNormalizer,
+    NormalizationFusionRegistry,
+)
 from custom_components.heima.runtime.engine import HeimaEngine
 from custom_components.heima.services import async_register_services
 
@@ -50,6 +57,51 @@ class _ExplodingAnyOfPlugin:
         raise RuntimeError("boom")
 
 
+class _AsyncAnyOfPlugin:
+    plugin_id = "builtin.any_of"
+    plugin_api_version = 2
+    supported_kinds = ("presence",)
+    execution = "async"
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def async_derive(self, *, kind, inputs, strategy_cfg=None, context=None):
+        await self.release.wait()
+        on = any(obs.state == "on" for obs in inputs)
+        return DerivedObservation(
+            kind=kind,
+            state="on" if on else "off",
+            confidence=100,
+            raw_state=None,
+            source_entity_id=None,
+            reason="async_model",
+        )
+
+
+class _BlockingExecutorAnyOfPlugin:
+    plugin_id = "builtin.any_of"
+    plugin_api_version = 2
+    supported_kinds = ("presence",)
+    execution = "executor"
+    time_budget_s = 0.05
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def derive(self, *, kind, inputs, strategy_cfg=None, context=None):
+        self.release.wait(5)
+        on = any(obs.state == "on" for obs in inputs)
+        return DerivedObservation(
+            kind=kind,
+            state="on" if on else "off",
+            confidence=100,
+            raw_state=None,
+            source_entity_id=None,
+            reason="executor_model",
+        )
+
+
 @pytest.mark.asyncio
 async def test_e2e_room_occupancy_dwell_transitions_after_timer(
     hass: HomeAssistant,
@@ -356,6 +408,7 @@ async def test_e2e_anonymous_weighted_quorum_uses_weights_and_group_trace(
 async def test_e2e_room_occupancy_plugin_failure_uses_fail_safe_off_fallback(
     hass: HomeAssistant,
     enable_custom_integrations,
+    monkeypatch,
 ):
     entry = _entry(
         {
@@ -376,13 +429,17 @@ async def test_e2e_room_occupancy_plugin_failure_uses_fail_safe_off_fallback(
     hass.states.async_set("binary_sensor.room_presence", "on")
     await hass.async_block_till_done()
 
+    registry = NormalizationFusionRegistry()
+    registry.register(_ExplodingAnyOfPlugin())
+    monkeypatch.setattr(
+        "custom_components.heima.HeimaCoordinator",
+        functools.partial(HeimaCoordinator, normalizer=InputNormalizer(hass, fusion_registry=registry)),
+    )
+
     assert await hass.config_entries.async_setup(entry.entry_id)
     await hass.async_block_till_done()
 
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
-    registry = NormalizationFusionRegistry()
-    registry.register(_ExplodingAnyOfPlugin())
-    coordinator.engine._normalizer = InputNormalizer(hass, fusion_registry=registry)
 
     await coordinator.async_request_evaluation(reason="test:plugin_failure")
     await hass.async_block_till_done()
@@ -396,6 +453,111 @@ async def test_e2e_room_occupancy_plugin_failure_uses_fail_safe_off_fallback(
     assert trace["fused_observation"]["evidence"]["fallback"] == "off"
 
 
+@pytest.mark.asyncio
+async def test_e2e_deferred_fusion_runs_in_background_and_rechecks_when_ready(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+    monkeypatch,
+):
+    entry = _entry(
+        {
+            "rooms": [
+                {
+                    "room_id": "studio",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.room_presence"],
+                    "logic": "any_of",
+                    "on_dwell_s": 0,
+                    "off_dwell_s": 0,
+                }
+            ]
+        }
+    )
+    entry.add_to_hass(hass)
+    hass.states.async_set("binary_sensor.room_presence", "on")
+    await hass.async_block_till_done()
+
+    plugin = _AsyncAnyOfPlugin()
+    registry = NormalizationFusionRegistry()
+    registry.register(plugin)
+    monkeypatch.setattr(
+        "custom_components.heima.HeimaCoordinator",
+        functools.partial(HeimaCoordinator, normalizer=InputNormalizer(hass, fusion_registry=registry)),
+    )
+
+    # Setup completes while the plugin run is still pending in the background.
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    trace = coordinator.engine.diagnostics()["occupancy"]["room_trace"]["studio"]
+    assert trace["fused_observation"]["reason"] == "plugin_pending_fallback"
+
+    plugin.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert any(job["job_id"] == "fusion:deferred" for job in coordinator.scheduler.diagnostics()["pending_jobs"])
+
+    assert await coordinator.scheduler.async_run_due_jobs() == ["fusion:deferred"]
+    await hass.async_block_till_done()
+
+    assert _room_entity_state(hass, "studio").state == "on"
+    trace = coordinator.engine.diagnostics()["occupancy"]["room_trace"]["studio"]
+    assert trace["fused_observation"]["reason"] == "async_model"
+    assert coordinator.engine.query_history(reason="scheduler:fusion:deferred")
+
+
+@pytest.mark.asyncio
+async def test_e2e_late_executor_fusion_result_replaces_the_budget_fallback(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+    monkeypatch,
+):
+    entry = _entry(
+        {
+            "rooms": [
+                {
+                    "room_id": "studio",
+                    "occupancy_mode": "derived",
+                    "sources": ["binary_sensor.room_presence"],
+                    "logic": "any_of",
+                    "on_dwell_s": 0,
+                    "off_dwell_s": 0,
+                }
+            ]
+        }
+    )
+    entry.add_to_hass(hass)
+    hass.states.async_set("binary_sensor.room_presence", "on")
+    await hass.async_block_till_done()
+
+    plugin = _BlockingExecutorAnyOfPlugin()
+    registry = NormalizationFusionRegistry()
+    registry.register(plugin)
+    monkeypatch.setattr(
+        "custom_components.heima.HeimaCoordinator",
+        functools.partial(HeimaCoordinator, normalizer=InputNormalizer(hass, fusion_registry=registry)),
+    )
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    # The thread outlives its budget: the fallback is applied on the fusion:deferred recheck.
+    await asyncio.sleep(0.1)
+    await coordinator.scheduler.async_run_due_jobs()
+    await hass.async_block_till_done()
+    trace = coordinator.engine.diagnostics()["occupancy"]["room_trace"]["studio"]
+    assert trace["fused_observation"]["reason"] == "plugin_error_fallback"
+    assert coordinator.engine.has_deferred_fusions_in_flight
+
+    # The runner waits for the thread and re-arms the recheck with its late result.
+    plugin.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert any(job["job_id"] == "fusion:deferred" for job in coordinator.scheduler.diagnostics()["pending_jobs"])
+    assert await coordinator.scheduler.async_run_due_jobs() == ["fusion:deferred"]
+    await hass.async_block_till_done()
+
+    assert _room_entity_state(hass, "studio").state == "on"
+    trace = coordinator.engine.diagnostics()["occupancy"]["room_trace"]["studio"]
+    assert trace["fused_observation"]["reason"] == "executor_model"
+
+
 @pytest.mark.asyncio
 async def test_e2e_security_smart_uses_boolean_plugin_corroboration_trace(
     hass: HomeAssistant,
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime
 from types import SimpleNamespace
 
 import pytest
 
+from custom_components.heima.runtime.clock import VirtualClock
 from custom_components.heima.runtime.normalization import InputNormalizer, NormalizationFusionRegistry
 from custom_components.heima.runtime.normalization.builtins import register_builtin_fusion_plugins
-from custom_components.heima.runtime.normalization.contracts import DerivedObservation, build_observation
+from custom_components.heima.runtime.normalization.contracts import (
+    DerivedObservation,
+    FusionGroup,
+    NormalizedObservation,
+    build_observation,
+)
 
 
 class _ExplodingFusionPlugin:
@@ -259,3 +270,317 @@ def test_derive_plugin_failure_supports_explicit_off_fallback_state():
     assert result.evidence["fallback"] == "off"
     diagnostics = normalizer.diagnostics()
     assert diagnostics["last_derive"]["fallback_state"] == "off"
+
+
+def test_compiled_fusion_binds_plugin_once_and_keeps_fallback_handling():
+    registry = NormalizationFusionRegistry()
+    register_builtin_fusion_plugins(registry)
+    normalizer = InputNormalizer(_hass(), fusion_registry=registry)
+    inputs = [
+        build_observation(
+            kind="presence",
+            state="on",
+            confidence=100,
+            raw_state="on",
+            source_entity_id="binary_sensor.a",
+            reason="test",
+        )
+    ]
+
+    fusion = normalizer.compile_fusion(
+        kind="presence",
+        strategy_cfg={"plugin_id": "builtin.any_of", "fallback_state": "off"},
+        context={"room_id": "studio"},
+    )
+    assert fusion.plugin is registry.get("builtin.any_of")
+    assert fusion.strategy_cfg == {}
+    assert fusion(inputs).state == "on"
+
+    unsupported = normalizer.compile_fusion(
+        kind="security",
+        strategy_cfg={"plugin_id": "builtin.any_of", "fallback_state": "off"},
+    )
+    result = unsupported(inputs)
+    assert result.state == "off"
+    assert result.reason == "plugin_error_fallback"
+    diagnostics = normalizer.diagnostics()
+    assert diagnostics["derive_calls"] == 2
+    assert diagnostics["last_plugin_error"]["error_type"] == "ValueError"
+
+
+class _DeriveOnlyFusionPlugin:
+    plugin_id = "test.derive_only"
+    plugin_api_version = 1
+    supported_kinds = ("presence",)
+
+    def derive(self, *, kind, inputs, strategy_cfg=None, context=None):
+        if context.get("explode"):
+            raise RuntimeError("boom")
+        return DerivedObservation(
+            kind=kind,
+            state=inputs[0].state,
+            confidence=100,
+            raw_state=None,
+            source_entity_id=None,
+            reason="derive_only",
+        )
+
+
+def test_derive_many_batches_builtins_and_adapts_derive_only_plugins():
+    registry = NormalizationFusionRegistry()
+    register_builtin_fusion_plugins(registry)
+    registry.register(_DeriveOnlyFusionPlugin())
+    normalizer = InputNormalizer(
+        _hass({"binary_sensor.a": "on", "binary_sensor.b": "off"}), fusion_registry=registry
+    )
+    a = normalizer.presence("binary_sensor.a")
+    b = normalizer.presence("binary_sensor.b")
+    any_of = normalizer.compile_fusion(kind="presence", strategy_cfg={"plugin_id": "builtin.any_of"})
+    all_of = normalizer.compile_fusion(kind="presence", strategy_cfg={"plugin_id": "builtin.all_of"})
+    quorum = normalizer.compile_fusion(kind="presence", strategy_cfg={"plugin_id": "builtin.quorum", "required": 2})
+
+    results = normalizer.derive_many([(any_of, [a, b]), (quorum, [a, b]), (all_of, [a]), (any_of, [b])])
+    assert [result.state for result in results] == ["on", "unknown", "on", "off"]
+    assert results[1].evidence["required"] == 2
+    assert [result.state for result in results] == [
+        fusion(inputs).state for fusion, inputs in [(any_of, [a, b]), (quorum, [a, b]), (all_of, [a]), (any_of, [b])]
+    ]
+
+    ok = normalizer.compile_fusion(kind="presence", strategy_cfg={"plugin_id": "test.derive_only"})
+    bad = normalizer.compile_fusion(
+        kind="presence",
+        strategy_cfg={"plugin_id": "test.derive_only", "fallback_state": "off"},
+        context={"explode": True},
+    )
+    adapted = normalizer.derive_many([(ok, [a]), (bad, [a]), (ok, [b])])
+    assert [result.state for result in adapted] == ["on", "off", "off"]
+    assert adapted[1].reason == "plugin_error_fallback"
+    diagnostics = normalizer.diagnostics()
+    assert diagnostics["derive_batches"] == 1
+    assert diagnostics["derive_plugin_errors"] == 1
+
+
+def test_batched_boolean_fusion_matches_scalar_derive():
+    rng = random.Random(7)
+    registry = NormalizationFusionRegistry()
+    register_builtin_fusion_plugins(registry)
+    pool = [
+        build_observation(
+            kind="presence",
+            state=rng.choice(["on", "off", "unknown"]),
+            confidence=100,
+            raw_state=None,
+            source_entity_id=f"binary_sensor.s{index}",
+            reason="test",
+        )
+        for index in range(40)
+    ]
+    groups = [
+        FusionGroup(inputs=rng.choices(pool, k=rng.randint(0, 6)), strategy_cfg={"required": rng.randint(1, 3)})
+        for _ in range(60)
+    ]
+
+    for plugin_id in ("builtin.any_of", "builtin.all_of", "builtin.quorum", "builtin.weighted_quorum"):
+        plugin = registry.get(plugin_id)
+        batched = registry.derive_many(plugin_id=plugin_id, kind="presence", groups=groups)
+        scalar = [
+            plugin.derive(kind="presence", inputs=group.inputs, strategy_cfg=group.strategy_cfg)
+            for group in groups
+        ]
+        strip = lambda obs: {key: value for key, value in obs.as_dict().items() if key != "ts"}
+        assert [strip(obs) for obs in batched] == [strip(obs) for obs in scalar]
+
+
+def test_input_normalizer_memoizes_unchanged_entities_across_evaluations():
+    states = _FakeStates({"binary_sensor.motion": "on", "alarm_control_panel.home": "armed_night"})
+    normalizer = InputNormalizer(SimpleNamespace(states=states))
+
+    first = normalizer.presence("binary_sensor.motion")
+    assert normalizer.presence("binary_sensor.motion") is first
+    assert normalizer.boolean_signal("binary_sensor.motion").kind == "boolean_signal"
+
+    normalizer.begin_evaluation()
+    assert normalizer.presence("binary_sensor.motion") is first
+    states._values["binary_sensor.motion"] = "off"
+    assert normalizer.presence("binary_sensor.motion").state == "off"
+
+    mapping = {"armed_away_value": "armed_night"}
+    assert normalizer.security("alarm_control_panel.home", mapping).state == "armed_away"
+    assert normalizer.security("alarm_control_panel.home").state == "unknown"
+
+    memo = normalizer.diagnostics()["observation_memo"]
+    assert (memo["hits"], memo["misses"], memo["size"]) == (2, 5, 5)
+    assert memo["last_evaluation"] == {"hits": 1, "misses": 3}
+
+
+def test_input_normalizer_memo_is_bounded_lru():
+    states = _FakeStates({f"binary_sensor.m{n}": "on" for n in range(3)})
+    normalizer = InputNormalizer(SimpleNamespace(states=states), observation_memo_size=2)
+
+    normalizer.presence("binary_sensor.m0")
+    normalizer.presence("binary_sensor.m1")
+    normalizer.presence("binary_sensor.m0")
+    normalizer.presence("binary_sensor.m2")
+
+    memo = normalizer.diagnostics()["observation_memo"]
+    assert (memo["size"], memo["max_size"], memo["evictions"]) == (2, 2, 1)
+    normalizer.presence("binary_sensor.m0")
+    assert normalizer.diagnostics()["observation_memo"]["hits"] == 2
+
+
+def test_observations_are_slotted_and_format_timestamps_lazily():
+    obs = build_observation(
+        kind="presence",
+        state="on",
+        confidence=100,
+        raw_state="on",
+        source_entity_id="binary_sensor.motion",
+        reason="".join(["state_", "match_on"]),
+    )
+    assert not hasattr(obs, "__dict__")
+    assert isinstance(obs.observed_at, float)
+    assert obs.reason is sys.intern("state_match_on")
+
+    data = obs.as_dict()
+    assert "observed_at" not in data
+    assert datetime.fromisoformat(data["ts"]).tzinfo is not None
+    assert data["ts"] == obs.ts
+
+
+def test_observations_still_accept_deprecated_ts_keyword():
+    with pytest.warns(DeprecationWarning, match="observed_at"):
+        obs = DerivedObservation(
+            kind="presence",
+            state="on",
+            confidence=80,
+            raw_state=None,
+            source_entity_id=None,
+            ts="2026-01-02T03:04:05+00:00",
+            plugin_id="custom.legacy",
+        )
+    assert obs.observed_at == datetime.fromisoformat("2026-01-02T03:04:05+00:00").timestamp()
+    assert obs.ts == "2026-01-02T03:04:05+00:00"
+    assert obs.plugin_id == "custom.legacy"
+
+    with pytest.warns(DeprecationWarning):
+        naive = NormalizedObservation("presence", "off", 100, None, None, ts="2026-01-02T03:04:05")
+    assert naive.ts == "2026-01-02T03:04:05+00:00"
+    assert not hasattr(naive, "__dict__")
+
+
+def test_input_normalizer_stamps_observations_from_its_clock():
+    clock = VirtualClock()
+    states = _FakeStates({"binary_sensor.motion": "on", "binary_sensor.door": "off"})
+    normalizer = InputNormalizer(SimpleNamespace(states=states), clock=clock)
+
+    motion = normalizer.presence("binary_sensor.motion")
+    assert motion.ts == clock.utcnow().isoformat()
+
+    clock.advance(90)
+    door = normalizer.presence("binary_sensor.door")
+    assert door.as_dict()["ts"] == clock.utcnow().isoformat()
+
+    fused = normalizer.derive(kind="presence", inputs=[motion, door], strategy_cfg={"plugin_id": "builtin.any_of"})
+    assert fused.observed_at == door.observed_at
+    missing = normalizer.derive(kind="presence", inputs=[motion], strategy_cfg={"plugin_id": "missing.plugin"})
+    assert missing.ts == clock.utcnow().isoformat()
+
+
+class _AsyncFusionPlugin:
+    plugin_id = "test.async_model"
+    plugin_api_version = 1
+    supported_kinds = ("presence",)
+    execution = "async"
+
+    async def async_derive(self, *, kind, inputs, strategy_cfg=None, context=None):
+        await asyncio.sleep(0)
+        return DerivedObservation(
+            kind=kind,
+            state="on" if any(obs.state == "on" for obs in inputs) else "off",
+            confidence=80,
+            raw_state=None,
+            source_entity_id=None,
+            reason="model",
+        )
+
+    def derive(self, *, kind, inputs, strategy_cfg=None, context=None):
+        raise AssertionError("async plugins must not run inline")
+
+
+class _SlowExecutorFusionPlugin(_DeriveOnlyFusionPlugin):
+    plugin_id = "test.slow_executor"
+    execution = "executor"
+    time_budget_s = 0.01
+
+    def derive(self, *, kind, inputs, strategy_cfg=None, context=None):
+        time.sleep(0.2)
+        return super().derive(kind=kind, inputs=inputs, strategy_cfg=strategy_cfg, context=context)
+
+
+def test_deferred_fusion_plugins_run_outside_the_snapshot_within_their_budget():
+    registry = NormalizationFusionRegistry()
+    registry.register(_AsyncFusionPlugin())
+    registry.register(_SlowExecutorFusionPlugin())
+    with pytest.raises(ValueError, match="async_derive"):
+        registry.register(SimpleNamespace(plugin_id="test.bad", execution="async", supported_kinds=()))
+
+    async def _scenario():
+        loop = asyncio.get_running_loop()
+        hass = _hass({"binary_sensor.a": "on", "binary_sensor.b": "off"})
+        hass.async_add_executor_job = lambda job: loop.run_in_executor(None, job)
+        normalizer = InputNormalizer(hass, fusion_registry=registry)
+        inputs = [normalizer.presence("binary_sensor.a")]
+        model = normalizer.compile_fusion(
+            kind="presence", strategy_cfg={"plugin_id": "test.async_model", "fallback_state": "off"}
+        )
+        slow = normalizer.compile_fusion(kind="presence", strategy_cfg={"plugin_id": "test.slow_executor"})
+
+        pending = model(inputs)
+        assert (pending.state, pending.reason) == ("off", "plugin_pending_fallback")
+        assert slow(inputs).state == "unknown"
+        assert normalizer.has_deferred_pending
+
+        assert await normalizer.async_run_deferred() is True
+        assert (model(inputs).state, model(inputs).reason) == ("on", "model")
+        timed_out = slow(inputs)
+        assert timed_out.reason == "plugin_error_fallback"
+        assert timed_out.evidence["error_type"] == "TimeoutError"
+        # Unchanged inputs reuse the stored results instead of queueing another run.
+        assert not normalizer.has_deferred_pending
+        assert await normalizer.async_run_deferred() is False
+
+        # The timed-out thread is still running: new inputs wait instead of starting a second one.
+        moved = [normalizer.presence("binary_sensor.b")]
+        slow(moved)
+        assert await normalizer.async_run_deferred() is False
+        assert normalizer.has_deferred_pending
+        assert normalizer.has_executor_runs_in_flight
+        assert normalizer.diagnostics()["deferred_fusion"]["in_flight_skips"] == 1
+
+        # Its late result is for inputs that moved on, so it is dropped.
+        await normalizer.async_wait_executor_runs()
+        assert slow(inputs).reason == "plugin_error_fallback"
+        assert normalizer.diagnostics()["deferred_fusion"]["late_results"] == 0
+
+        # The queued run times out too; this time the late result is still current and replaces the fallback.
+        await normalizer.async_run_deferred()
+        assert slow(moved).reason == "plugin_error_fallback"
+        await normalizer.async_wait_executor_runs()
+        assert not normalizer.has_executor_runs_in_flight
+        assert await normalizer.async_run_deferred() is True
+        assert (slow(moved).state, slow(moved).reason) == ("off", "derive_only")
+        assert not normalizer.has_deferred_pending
+        return normalizer.diagnostics()
+
+    diagnostics = asyncio.run(_scenario())
+    assert diagnostics["deferred_fusion"]["budget_exceeded"] == 2
+    assert diagnostics["deferred_fusion"]["late_results"] == 1
+    assert diagnostics["deferred_fusion"]["hits"] == 7
+    latency = diagnostics["plugin_latency"]
+    assert latency["test.async_model"]["runs"] == 1
+    assert latency["test.async_model"]["budget_exceeded"] == 0
+    assert latency["test.slow_executor"]["budget_exceeded"] == 2
+    assert {item["plugin_id"]: item["execution"] for item in diagnostics["registered_plugins"]} == {
+        "test.async_model": "async",
+        "test.slow_executor": "executor",
+    }
@@ -1,25 +1,50 @@
+import asyncio
 from types import SimpleNamespace
 
 import pytest
+from homeassistant.const import EVENT_SERVICE_REGISTERED
+from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ServiceNotFound
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.heima.const import DOMAIN
+from custom_components.heima.runtime.clock import VirtualClock
 from custom_components.heima.runtime.contracts import HeimaEvent
-from custom_components.heima.runtime.notifications import HeimaEventPipeline
+from custom_components.heima.runtime.notifications import (
+    HeimaEventPipeline,
+    NotificationRouting,
+    _EventKeyTable,
+    compile_notification_routing,
+)
+
+_NO_ROUTES = NotificationRouting()
+_TEST_ROUTING = compile_notification_routing(routes=["mobile_app_test"])
+
+
+class _FakeHass(SimpleNamespace):
+    def async_create_background_task(self, target, name, eager_start=True):
+        return asyncio.get_running_loop().create_task(target, name=name)
 
 
 class _FakeBus:
     def __init__(self):
         self.events = []
+        self.listeners = {}
 
     def async_fire(self, event_type, data):
         self.events.append((event_type, data))
 
+    def async_listen(self, event_type, listener):
+        self.listeners.setdefault(event_type, []).append(listener)
+        return lambda: self.listeners[event_type].remove(listener)
+
 
 class _FakeServices:
     def __init__(self, available: dict[str, object] | None = None, fail_once: set[str] | None = None):
         self.calls = []
         self.available = dict(available or {})
         self.fail_once = set(fail_once or set())
+        self.lookups = 0
 
     async def async_call(self, domain, service, data, blocking=False):
         if domain == "notify" and service in self.fail_once:
@@ -27,20 +52,21 @@ class _FakeServices:
             raise ServiceNotFound(domain, service)
         self.calls.append((domain, service, data, blocking))
 
-    def async_services(self):
-        return {"notify": dict(self.available)}
+    def has_service(self, domain, service):
+        self.lookups += 1
+        return domain == "notify" and service in self.available
 
 
 @pytest.mark.asyncio
 async def test_event_pipeline_deduplicates(monkeypatch):
     bus = _FakeBus()
     services = _FakeServices()
-    hass = SimpleNamespace(bus=bus, services=services)
+    hass = _FakeHass(bus=bus, services=services)
     pipeline = HeimaEventPipeline(hass)
 
     t = 100.0
     monkeypatch.setattr(
-        "custom_components.heima.runtime.notifications.time.monotonic",
+        "time.monotonic",
         lambda: t,
     )
 
@@ -53,7 +79,7 @@ async def test_event_pipeline_deduplicates(monkeypatch):
     )
     emitted = await pipeline.async_emit(
         event,
-        routes=[],
+        routing=_NO_ROUTES,
         dedup_window_s=60,
         rate_limit_per_key_s=300,
     )
@@ -69,7 +95,7 @@ async def test_event_pipeline_deduplicates(monkeypatch):
             title=event.title,
             message=event.message,
         ),
-        routes=[],
+        routing=_NO_ROUTES,
         dedup_window_s=60,
         rate_limit_per_key_s=300,
     )
@@ -82,12 +108,12 @@ async def test_event_pipeline_deduplicates(monkeypatch):
 async def test_event_pipeline_rate_limits_after_dedup_window(monkeypatch):
     bus = _FakeBus()
     services = _FakeServices()
-    hass = SimpleNamespace(bus=bus, services=services)
+    hass = _FakeHass(bus=bus, services=services)
     pipeline = HeimaEventPipeline(hass)
 
     t = 100.0
     monkeypatch.setattr(
-        "custom_components.heima.runtime.notifications.time.monotonic",
+        "time.monotonic",
         lambda: t,
     )
 
@@ -102,7 +128,7 @@ async def test_event_pipeline_rate_limits_after_dedup_window(monkeypatch):
                 title="hold",
                 message="hold",
             ),
-            routes=[],
+            routing=_NO_ROUTES,
             dedup_window_s=60,
             rate_limit_per_key_s=300,
         )
@@ -119,7 +145,7 @@ async def test_event_pipeline_rate_limits_after_dedup_window(monkeypatch):
 async def test_event_pipeline_defers_missing_notify_route_without_failing():
     bus = _FakeBus()
     services = _FakeServices(available={})
-    hass = SimpleNamespace(bus=bus, services=services)
+    hass = _FakeHass(bus=bus, services=services)
     pipeline = HeimaEventPipeline(hass)
 
     emitted = await pipeline.async_emit(
@@ -130,13 +156,14 @@ async def test_event_pipeline_defers_missing_notify_route_without_failing():
             title="t",
             message="m",
         ),
-        routes=["mobile_app_test"],
+        routing=_TEST_ROUTING,
         dedup_window_s=0,
         rate_limit_per_key_s=0,
     )
 
     assert emitted is True
     assert len(bus.events) == 1
+    await pipeline.async_drain()
     assert services.calls == []
     assert pipeline.stats.notify_route_unavailable >= 1
 
@@ -145,7 +172,7 @@ async def test_event_pipeline_defers_missing_notify_route_without_failing():
 async def test_event_pipeline_retries_deferred_route_when_service_appears():
     bus = _FakeBus()
     services = _FakeServices(available={})
-    hass = SimpleNamespace(bus=bus, services=services)
+    hass = _FakeHass(bus=bus, services=services)
     pipeline = HeimaEventPipeline(hass)
 
     first = HeimaEvent(
@@ -157,10 +184,11 @@ async def test_event_pipeline_retries_deferred_route_when_service_appears():
     )
     await pipeline.async_emit(
         first,
-        routes=["mobile_app_test"],
+        routing=_TEST_ROUTING,
         dedup_window_s=0,
         rate_limit_per_key_s=0,
     )
+    await pipeline.async_drain()
     assert services.calls == []
 
     services.available["mobile_app_test"] = object()
@@ -173,10 +201,11 @@ async def test_event_pipeline_retries_deferred_route_when_service_appears():
     )
     await pipeline.async_emit(
         second,
-        routes=[],
+        routing=_NO_ROUTES,
         dedup_window_s=0,
         rate_limit_per_key_s=0,
     )
+    await pipeline.async_drain()
 
     notify_calls = [c for c in services.calls if c[0] == "notify" and c[1] == "mobile_app_test"]
     assert len(notify_calls) == 1
@@ -195,7 +224,7 @@ async def test_event_pipeline_resolves_recipient_aliases_and_groups():
             "mobile_app_legacy": object(),
         }
     )
-    hass = SimpleNamespace(bus=bus, services=services)
+    hass = _FakeHass(bus=bus, services=services)
     pipeline = HeimaEventPipeline(hass)
 
     await pipeline.async_emit(
@@ -206,16 +235,19 @@ async def test_event_pipeline_resolves_recipient_aliases_and_groups():
             title="Targets",
             message="targets",
         ),
-        routes=["mobile_app_legacy"],
-        recipients={
-            "stefano": ["mobile_app_phone_stefano", "mobile_app_mac_stefano"],
-            "laura": ["mobile_app_laura"],
-        },
-        recipient_groups={"family": ["stefano", "laura"]},
-        route_targets=["family", "stefano", "missing"],
+        routing=compile_notification_routing(
+            routes=["mobile_app_legacy"],
+            recipients={
+                "stefano": ["mobile_app_phone_stefano", "mobile_app_mac_stefano"],
+                "laura": ["mobile_app_laura"],
+            },
+            recipient_groups={"family": ["stefano", "laura"]},
+            route_targets=["family", "stefano", "missing"],
+        ),
         dedup_window_s=0,
         rate_limit_per_key_s=0,
     )
+    await pipeline.async_drain()
 
     called_services = [service for domain, service, _data, _blocking in services.calls if domain == "notify"]
     assert called_services == [
@@ -225,3 +257,408 @@ async def test_event_pipeline_resolves_recipient_aliases_and_groups():
         "mobile_app_laura",
     ]
     assert pipeline.stats.notify_target_resolution_errors == 1
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_delivers_from_background_worker():
+    release = asyncio.Event()
+
+    class _SlowServices(_FakeServices):
+        async def async_call(self, domain, service, data, blocking=False):
+            await release.wait()
+            await super().async_call(domain, service, data, blocking)
+
+    bus = _FakeBus()
+    services = _SlowServices(available={"mobile_app_test": object()})
+    hass = _FakeHass(bus=bus, services=services)
+    pipeline = HeimaEventPipeline(hass)
+
+    emitted = await pipeline.async_emit(
+        HeimaEvent(type="debug.slow", key="debug.slow", severity="info", title="slow", message="slow"),
+        routing=_TEST_ROUTING,
+        dedup_window_s=0,
+        rate_limit_per_key_s=0,
+    )
+
+    # The bus event is fired inline; the notify call waits on the worker.
+    assert emitted is True
+    assert bus.events
+    assert services.calls == []
+
+    release.set()
+    await pipeline.async_drain()
+
+    assert [c[1] for c in services.calls] == ["mobile_app_test"]
+    stats = pipeline.stats.as_dict()
+    assert stats["notify_queue_depth"] == 0
+    assert stats["notify_queue_max_depth"] == 1
+    assert stats["notify_delivery_mean_ms"] is not None
+    assert stats["notify_delivery_max_ms"] >= 0
+    await pipeline.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_moves_queue_overflow_to_deferred_deliveries():
+    services = _FakeServices(available={"mobile_app_test": object()})
+    pipeline = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services))
+
+    # The worker has not run yet, so the 257th delivery overflows the queue.
+    for index in range(257):
+        await pipeline.async_emit(
+            HeimaEvent(type="debug.burst", key=f"debug.burst.{index}", severity="info", title=str(index), message="m"),
+            routing=_TEST_ROUTING,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+        )
+    stats = pipeline.stats.as_dict()
+    assert stats["notify_queue_overflowed"] == 1
+    assert stats["notify_queue_depth"] == 256
+    assert stats["notify_route_deferred_depth"] == 1
+
+    await pipeline.async_drain()
+
+    # The overflowed delivery is retried first, then the queue is delivered in order.
+    assert [c[2]["title"] for c in services.calls] == [str(index) for index in range(257)]
+    assert pipeline.stats.notify_route_deferred_dropped == 0
+    await pipeline.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_looks_up_each_deferred_route_once_per_flush():
+    services = _FakeServices(available={})
+    pipeline = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services))
+    routing = compile_notification_routing(routes=["mobile_app_a", "mobile_app_b"])
+    for index in range(50):
+        await pipeline.async_emit(
+            HeimaEvent(type="debug.outage", key=f"debug.outage.{index}", severity="info", title="t", message="m"),
+            routing=routing,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+        )
+    await pipeline.async_drain()
+    assert pipeline.stats.notify_route_deferred_depth == 100
+
+    services.lookups = 0
+    services.available["mobile_app_b"] = object()
+    await pipeline.async_emit(
+        HeimaEvent(type="debug.bus", key="debug.bus", severity="info", title="t", message="m"),
+        routing=_NO_ROUTES,
+        dedup_window_s=0,
+        rate_limit_per_key_s=0,
+    )
+    await pipeline.async_drain()
+
+    assert services.lookups == 2
+    assert [c[1] for c in services.calls] == ["mobile_app_b"] * 50
+    assert pipeline.stats.notify_route_deferred_depth == 50
+    await pipeline.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_collapses_deferred_retry_requests_into_one_flush():
+    services = _FakeServices(available={})
+    pipeline = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services))
+    await pipeline.async_emit(
+        HeimaEvent(type="debug.first", key="debug.first", severity="info", title="first", message="m"),
+        routing=_TEST_ROUTING,
+        dedup_window_s=0,
+        rate_limit_per_key_s=0,
+    )
+    await pipeline.async_drain()
+    assert pipeline.stats.notify_route_unavailable == 1
+
+    for index in range(300):
+        await pipeline.async_emit(
+            HeimaEvent(type="debug.bus", key=f"debug.bus.{index}", severity="info", title="t", message="m"),
+            routing=_NO_ROUTES,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+        )
+    assert pipeline.stats.notify_queue_depth == 0
+    await pipeline.async_drain()
+
+    assert pipeline.stats.notify_route_unavailable == 2
+    assert pipeline.stats.notify_route_deferred_depth == 1
+    await pipeline.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_expires_and_caps_event_key_tables():
+    bus = _FakeBus()
+    hass = _FakeHass(bus=bus, services=_FakeServices())
+    clock = VirtualClock()
+    pipeline = HeimaEventPipeline(hass, clock=clock)
+    pipeline._keys = _EventKeyTable(max_keys=3)
+
+    async def _emit(key: str) -> bool:
+        return await pipeline.async_emit(
+            HeimaEvent(type="debug.key", key=key, severity="info", title=key, message=key),
+            routing=_NO_ROUTES,
+            dedup_window_s=60,
+            rate_limit_per_key_s=120,
+        )
+
+    assert await _emit("system.override:a->b:set") is True
+    clock.advance(10)
+    assert await _emit("system.override:a->b:set") is False
+    assert pipeline.stats.suppressed_by_key == {"system.override:a->b:set": 1}
+
+    # Untouched for the longest window: the key no longer suppresses and is forgotten.
+    clock.advance(120)
+    assert await _emit("room.bath") is True
+    stats = pipeline.stats.as_dict()
+    assert stats["event_keys_tracked"] == 1
+    assert stats["event_keys_expired"] == 1
+    assert stats["suppressed_by_key"] == {}
+
+    for key in ("room.kitchen", "room.office", "room.hall"):
+        clock.advance(1)
+        assert await _emit(key) is True
+    stats = pipeline.stats.as_dict()
+    assert stats["event_keys_tracked"] == 3
+    assert stats["event_keys_evicted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_digests_routed_events_per_evaluation():
+    bus = _FakeBus()
+    services = _FakeServices(available={"mobile_app_test": object()})
+    hass = _FakeHass(bus=bus, services=services)
+    pipeline = HeimaEventPipeline(hass)
+
+    for key, severity in (("people.arrived", "info"), ("house_state.changed", "info"), ("security.mismatch", "warn")):
+        await pipeline.async_emit(
+            HeimaEvent(type=key, key=key, severity=severity, title=key, message="m"),
+            routing=_TEST_ROUTING,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+            digest_mode="evaluation",
+            digest_bypass_severity="warn",
+        )
+    await pipeline.async_drain()
+
+    # warn bypasses the digest; info events wait for the end of the evaluation.
+    assert [c[2]["title"] for c in services.calls] == ["security.mismatch"]
+    assert len(bus.events) == 3
+
+    pipeline.flush_digests()
+    await pipeline.async_drain()
+
+    assert len(services.calls) == 2
+    digest = services.calls[-1][2]
+    assert digest["title"] == "Heima: 2 events"
+    assert digest["data"]["heima_event_type"] == "system.notification_digest"
+    stats = pipeline.stats.as_dict()
+    assert stats["notify_digest_batched"] == 2
+    assert stats["notify_digest_sent"] == 1
+    assert stats["notify_digest_calls_saved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_window_digest_closes_on_the_injected_clock():
+    services = _FakeServices(available={"mobile_app_test": object()})
+    clock = VirtualClock()
+    pipeline = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services), clock=clock)
+
+    for key in ("people.arrived", "house_state.changed"):
+        await pipeline.async_emit(
+            HeimaEvent(type=key, key=key, severity="info", title=key, message="m"),
+            routing=_TEST_ROUTING,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+            digest_mode="window",
+            digest_window_s=60,
+        )
+    await pipeline.async_drain()
+
+    assert services.calls == []
+    assert pipeline.next_digest_due() == clock.monotonic() + 60
+
+    clock.advance(59)
+    pipeline.flush_digests()
+    await pipeline.async_drain()
+    assert services.calls == []
+
+    clock.advance(1)
+    pipeline.flush_digests()
+    await pipeline.async_drain()
+
+    assert [c[2]["title"] for c in services.calls] == ["Heima: 2 events"]
+    assert pipeline.next_digest_due() is None
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_uses_precompiled_routing_per_category():
+    routing = compile_notification_routing(
+        routes=["mobile_app_legacy", "mobile_app_laura"],
+        recipients={"stefano": ["mobile_app_phone_stefano"], "laura": ["mobile_app_laura"]},
+        recipient_groups={"family": ["stefano", "laura"]},
+        route_targets=["family", "missing"],
+        category_route_targets={"security": ["stefano", "missing"]},
+    )
+    assert routing.routes == ("mobile_app_legacy", "mobile_app_laura", "mobile_app_phone_stefano")
+    assert routing.routes_for("security") == ("mobile_app_phone_stefano",)
+    assert routing.undefined_targets == ("missing",)
+
+    services = _FakeServices(
+        available={"mobile_app_legacy": object(), "mobile_app_laura": object(), "mobile_app_phone_stefano": object()}
+    )
+    hass = _FakeHass(bus=_FakeBus(), services=services)
+    pipeline = HeimaEventPipeline(hass)
+    for event_type in ("security.armed_away_but_home", "people.arrived"):
+        await pipeline.async_emit(
+            HeimaEvent(type=event_type, key=event_type, severity="info", title=event_type, message="m"),
+            routing=routing,
+            category=event_type.split(".", 1)[0],
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+        )
+    await pipeline.async_drain()
+
+    assert [c[1] for c in services.calls] == [
+        "mobile_app_phone_stefano",
+        "mobile_app_legacy",
+        "mobile_app_laura",
+        "mobile_app_phone_stefano",
+    ]
+    # Undefined targets are counted once for the routing table, not once per event.
+    assert pipeline.stats.notify_target_resolution_errors == 1
+
+
+class _FakeStore:
+    def __init__(self, data=None):
+        self.data = data
+        self.delayed_saves = 0
+
+    async def async_load(self):
+        return self.data
+
+    def async_delay_save(self, data_func, delay=0):
+        self.delayed_saves += 1
+        self.data = data_func()
+
+    async def async_save(self, data):
+        self.data = data
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_persists_and_restores_deferred_deliveries():
+    clock = VirtualClock()
+    store = _FakeStore()
+    services = _FakeServices(available={})
+    pipeline = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services), clock=clock)
+    pipeline.configure_deferred(capacity=10, ttl_s=3600)
+    await pipeline.async_restore_deferred(store)
+
+    for key in ("people.arrived", "security.armed_away_but_home"):
+        await pipeline.async_emit(
+            HeimaEvent(type=key, key=key, severity="info", title=key, message="m", context={"n": 1}),
+            routing=_TEST_ROUTING,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+        )
+        await pipeline.async_drain()
+        clock.advance(1800)
+    await pipeline.async_shutdown()
+
+    assert store.delayed_saves == 2
+    assert [row[2] for row in store.data["deliveries"]] == ["people.arrived", "security.armed_away_but_home"]
+
+    # After the restart the first delivery is past its TTL; the second is sent once the route exists.
+    clock.advance(600)
+    services.available["mobile_app_test"] = object()
+    restarted = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services), clock=clock)
+    restarted.configure_deferred(capacity=10, ttl_s=3600)
+    await restarted.async_restore_deferred(store)
+    await restarted.async_drain()
+
+    assert [(c[1], c[2]["title"]) for c in services.calls] == [("mobile_app_test", "security.armed_away_but_home")]
+    stats = restarted.stats.as_dict()
+    assert stats["notify_route_deferred_restored"] == 2
+    assert stats["notify_route_deferred_expired"] == 1
+    assert stats["notify_route_deferred_depth"] == 0
+    assert store.data == {"deliveries": []}
+    await restarted.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_shutdown_saves_queued_deliveries_and_open_digests():
+    store = _FakeStore()
+    services = _FakeServices(available={"mobile_app_test": object()})
+    pipeline = HeimaEventPipeline(_FakeHass(bus=_FakeBus(), services=services), clock=VirtualClock())
+    await pipeline.async_restore_deferred(store)
+
+    await pipeline.async_emit(
+        HeimaEvent(type="people.arrived", key="people.arrived", severity="info", title="arrived", message="m"),
+        routing=_TEST_ROUTING,
+        dedup_window_s=0,
+        rate_limit_per_key_s=0,
+    )
+    for key in ("house_state.changed", "lighting.scene_applied"):
+        await pipeline.async_emit(
+            HeimaEvent(type=key, key=key, severity="info", title=key, message="m"),
+            routing=_TEST_ROUTING,
+            dedup_window_s=0,
+            rate_limit_per_key_s=0,
+            digest_mode="window",
+            digest_window_s=600,
+        )
+    # Shut down before the worker ran and while the digest window is still open.
+    await pipeline.async_shutdown()
+
+    assert services.calls == []
+    assert [row[5] for row in store.data["deliveries"]] == ["arrived", "Heima: 2 events"]
+    assert pipeline.stats.notify_route_deferred_depth == 2
+    assert pipeline.stats.notify_queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_retries_deferred_deliveries_when_a_notify_service_registers():
+    bus = _FakeBus()
+    services = _FakeServices(available={})
+    pipeline = HeimaEventPipeline(_FakeHass(bus=bus, services=services), clock=VirtualClock())
+    await pipeline.async_restore_deferred(_FakeStore())
+
+    await pipeline.async_emit(
+        HeimaEvent(type="people.arrived", key="people.arrived", severity="info", title="arrived", message="m"),
+        routing=_TEST_ROUTING,
+        dedup_window_s=0,
+        rate_limit_per_key_s=0,
+    )
+    await pipeline.async_drain()
+    assert pipeline.stats.notify_route_deferred_depth == 1
+
+    (listener,) = bus.listeners[EVENT_SERVICE_REGISTERED]
+    listener(SimpleNamespace(data={"domain": "light", "service": "turn_on"}))
+    await pipeline.async_drain()
+    assert pipeline.stats.notify_route_retried == 0
+
+    services.available["mobile_app_test"] = object()
+    listener(SimpleNamespace(data={"domain": "notify", "service": "mobile_app_test"}))
+    await pipeline.async_drain()
+
+    assert [(c[1], c[2]["title"]) for c in services.calls] == [("mobile_app_test", "arrived")]
+    assert pipeline.stats.notify_route_retried == 1
+    assert pipeline.stats.notify_route_deferred_depth == 0
+
+    await pipeline.async_shutdown()
+    assert bus.listeners[EVENT_SERVICE_REGISTERED] == []
+
+
+@pytest.mark.asyncio
+async def test_removing_the_entry_deletes_its_deferred_notification_store(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+    hass_storage,
+):
+    entry = MockConfigEntry(domain=DOMAIN, title="Heima", data={}, options={})
+    entry.add_to_hass(hass)
+    key = f"{DOMAIN}.{entry.entry_id}.deferred_notifications"
+    hass_storage[key] = {"version": 1, "minor_version": 1, "key": key, "data": {"deliveries": []}}
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert key not in hass_storage
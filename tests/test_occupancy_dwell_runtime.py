@@ -4,6 +4,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from custom_components.heima.runtime.clock import VirtualClock
 from custom_components.heima.runtime.engine import HeimaEngine
 from custom_components.heima.runtime.normalization import InputNormalizer, NormalizationFusionRegistry
 
@@ -52,21 +53,30 @@ class _FakeServices:
     async def async_call(self, domain, service, data, blocking=False):
         self.calls.append((domain, service, dict(data), blocking))
 
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
 
-def _engine(states: _MutableStates, options: dict) -> HeimaEngine:
+def _engine(
+    states: _MutableStates,
+    options: dict,
+    *,
+    clock: VirtualClock | None = None,
+    fusion_registry=None,
+) -> HeimaEngine:
     hass = SimpleNamespace(states=states, services=_FakeServices(), bus=_FakeBus())
-    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=options))
+    clock = clock or VirtualClock()
+    normalizer = None
+    if fusion_registry is not None:
+        normalizer = InputNormalizer(hass, fusion_registry=fusion_registry, clock=clock)
+    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=options), clock=clock, normalizer=normalizer)
     engine._build_default_state()
     return engine
 
 
 @pytest.mark.asyncio
-async def test_room_on_dwell_delays_transition_from_off_to_on(monkeypatch):
-    t = 0.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: t)
+async def test_room_on_dwell_delays_transition_from_off_to_on():
+    clock = VirtualClock()
     states = _MutableStates({"binary_sensor.room_presence": "off"})
     engine = _engine(
         states,
@@ -82,27 +92,27 @@ async def test_room_on_dwell_delays_transition_from_off_to_on(monkeypatch):
                 }
             ]
         },
+        clock=clock,
     )
 
     snap = engine._compute_snapshot(reason="t0")
     assert "room" not in snap.occupied_rooms
 
-    t = 1.0
+    clock.advance(1)
     states.set("binary_sensor.room_presence", "on")
     snap = engine._compute_snapshot(reason="t1")
     assert "room" not in snap.occupied_rooms
     delay = engine.next_dwell_recheck_delay_s()
     assert delay is not None and delay > 0
 
-    t = 12.0
+    clock.advance(11)
     snap = engine._compute_snapshot(reason="t12")
     assert "room" in snap.occupied_rooms
 
 
 @pytest.mark.asyncio
-async def test_room_off_dwell_delays_transition_from_on_to_off(monkeypatch):
-    t = 0.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: t)
+async def test_room_off_dwell_delays_transition_from_on_to_off():
+    clock = VirtualClock()
     states = _MutableStates({"binary_sensor.room_presence": "on"})
     engine = _engine(
         states,
@@ -118,25 +128,25 @@ async def test_room_off_dwell_delays_transition_from_on_to_off(monkeypatch):
                 }
             ]
         },
+        clock=clock,
     )
 
     snap = engine._compute_snapshot(reason="t0")
     assert "room" in snap.occupied_rooms
 
-    t = 1.0
+    clock.advance(1)
     states.set("binary_sensor.room_presence", "off")
     snap = engine._compute_snapshot(reason="t1")
     assert "room" in snap.occupied_rooms
 
-    t = 12.0
+    clock.advance(11)
     snap = engine._compute_snapshot(reason="t12")
     assert "room" not in snap.occupied_rooms
 
 
 @pytest.mark.asyncio
-async def test_room_max_on_forces_off_and_emits_event(monkeypatch):
-    t = 0.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: t)
+async def test_room_max_on_forces_off_and_emits_event():
+    clock = VirtualClock()
     states = _MutableStates({"binary_sensor.room_presence": "on"})
     engine = _engine(
         states,
@@ -153,12 +163,13 @@ async def test_room_max_on_forces_off_and_emits_event(monkeypatch):
                 }
             ]
         },
+        clock=clock,
     )
 
     snap = engine._compute_snapshot(reason="t0")
     assert "room" in snap.occupied_rooms
 
-    t = 6.0
+    clock.advance(6)
     snap = engine._compute_snapshot(reason="t6")
     assert "room" not in snap.occupied_rooms
     await engine._emit_queued_events()
@@ -168,9 +179,7 @@ async def test_room_max_on_forces_off_and_emits_event(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_room_weighted_quorum_uses_threshold_for_effective_occupancy(monkeypatch):
-    t = 0.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: t)
+async def test_room_weighted_quorum_uses_threshold_for_effective_occupancy():
     states = _MutableStates(
         {
             "binary_sensor.room_presence_a": "on",
@@ -212,9 +221,7 @@ async def test_room_weighted_quorum_uses_threshold_for_effective_occupancy(monke
 
 
 @pytest.mark.asyncio
-async def test_room_weighted_quorum_uses_configured_source_weights_in_trace(monkeypatch):
-    t = 0.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: t)
+async def test_room_weighted_quorum_uses_configured_source_weights_in_trace():
     states = _MutableStates(
         {
             "binary_sensor.room_presence_a": "on",
@@ -263,10 +270,10 @@ async def test_room_weighted_quorum_uses_configured_source_weights_in_trace(monk
 
 
 @pytest.mark.asyncio
-async def test_room_occupancy_fusion_failure_uses_fail_safe_off_fallback(monkeypatch):
-    t = 0.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: t)
+async def test_room_occupancy_fusion_failure_uses_fail_safe_off_fallback():
     states = _MutableStates({"binary_sensor.room_presence": "on"})
+    registry = NormalizationFusionRegistry()
+    registry.register(_ExplodingAnyOfPlugin())
     engine = _engine(
         states,
         {
@@ -281,10 +288,8 @@ async def test_room_occupancy_fusion_failure_uses_fail_safe_off_fallback(monkeyp
                 }
             ]
         },
+        fusion_registry=registry,
     )
-    registry = NormalizationFusionRegistry()
-    registry.register(_ExplodingAnyOfPlugin())
-    engine._normalizer = InputNormalizer(engine._hass, fusion_registry=registry)
 
     snap = engine._compute_snapshot(reason="t0")
 
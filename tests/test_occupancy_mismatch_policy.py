@@ -4,6 +4,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from custom_components.heima.runtime.clock import VirtualClock
 from custom_components.heima.runtime.engine import HeimaEngine
 
 
@@ -38,17 +39,22 @@ class _FakeServices:
     async def async_call(self, domain, service, data, blocking=False):
         self.calls.append((domain, service, dict(data), blocking))
 
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
 
-def _engine(options: dict, state_values: dict[str, str] | None = None) -> HeimaEngine:
+def _engine(
+    options: dict,
+    state_values: dict[str, str] | None = None,
+    *,
+    clock: VirtualClock | None = None,
+) -> HeimaEngine:
     hass = SimpleNamespace(
         states=_FakeStates(state_values),
         bus=_FakeBus(),
         services=_FakeServices(),
     )
-    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=options))
+    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=options), clock=clock or VirtualClock())
     engine._build_default_state()
     return engine
 
@@ -81,7 +87,7 @@ def _event_types(engine: HeimaEngine) -> list[str]:
 
 
 @pytest.mark.asyncio
-async def test_occupancy_mismatch_smart_suppresses_when_coverage_too_low(monkeypatch):
+async def test_occupancy_mismatch_smart_suppresses_when_coverage_too_low():
     engine = _engine(
         _base_options_with_person_and_rooms(
             1,
@@ -95,7 +101,6 @@ async def test_occupancy_mismatch_smart_suppresses_when_coverage_too_low(monkeyp
         {"binary_sensor.room1_presence": "off"},
     )
     engine.state.set_select("heima_person_stefano_override", "force_home")
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: 100.0)
 
     await _eval(engine)
 
@@ -103,9 +108,8 @@ async def test_occupancy_mismatch_smart_suppresses_when_coverage_too_low(monkeyp
 
 
 @pytest.mark.asyncio
-async def test_occupancy_mismatch_smart_requires_persistence(monkeypatch):
-    current_t = 100.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: current_t)
+async def test_occupancy_mismatch_smart_requires_persistence():
+    clock = VirtualClock()
     engine = _engine(
         _base_options_with_person_and_rooms(
             2,
@@ -120,6 +124,7 @@ async def test_occupancy_mismatch_smart_requires_persistence(monkeypatch):
             "binary_sensor.room1_presence": "off",
             "binary_sensor.room2_presence": "off",
         },
+        clock=clock,
     )
     engine.state.set_select("heima_person_stefano_override", "force_home")
 
@@ -128,14 +133,13 @@ async def test_occupancy_mismatch_smart_requires_persistence(monkeypatch):
     delay = engine.next_dwell_recheck_delay_s()
     assert delay is not None and delay > 0
 
-    current_t = 750.0
+    clock.advance(650)
     await _eval(engine)
     assert "occupancy.inconsistency_home_no_room" in _event_types(engine)
 
 
 @pytest.mark.asyncio
-async def test_occupancy_mismatch_strict_emits_immediately(monkeypatch):
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: 100.0)
+async def test_occupancy_mismatch_strict_emits_immediately():
     engine = _engine(
         _base_options_with_person_and_rooms(
             0,
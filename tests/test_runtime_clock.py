@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.heima.runtime.clock import SYSTEM_CLOCK, VirtualClock
+from custom_components.heima.runtime.contracts import HeimaEvent
+from custom_components.heima.runtime.engine import HeimaEngine
+from custom_components.heima.runtime.notifications import HeimaEventPipeline, NotificationRouting
+from custom_components.heima.runtime.scheduler import RuntimeScheduler, ScheduledRuntimeJob
+
+
+class _States:
+    def __init__(self, values: dict[str, str]):
+        self._values = dict(values)
+
+    def get(self, entity_id: str):
+        value = self._values.get(entity_id)
+        return SimpleNamespace(state=value) if value is not None else None
+
+    def set(self, entity_id: str, value: str) -> None:
+        self._values[entity_id] = value
+
+
+class _Services:
+    def has_service(self, domain, service):
+        return False
+
+    async def async_call(self, domain, service, data, blocking=False):
+        return None
+
+
+class _Bus:
+    def __init__(self):
+        self.events: list[str] = []
+
+    def async_fire(self, event_type, data):
+        self.events.append(data.get("type", event_type))
+
+
+def test_virtual_clock_moves_only_forward_and_keeps_wall_time_in_step():
+    clock = VirtualClock()
+    start_utc = clock.utcnow()
+    clock.advance(90)
+    clock.advance_to(clock.monotonic() - 30)
+    assert clock.elapsed_s == 90
+    assert (clock.utcnow() - start_utc).total_seconds() == 90
+    with pytest.raises(ValueError):
+        clock.advance(-1)
+    assert abs(SYSTEM_CLOCK.monotonic() - time.monotonic()) < 1
+
+
+def test_engine_simulates_hours_of_dwell_and_max_on_on_a_virtual_clock():
+    clock = VirtualClock()
+    states = _States({"binary_sensor.room_presence": "off"})
+    hass = SimpleNamespace(states=states, services=_Services(), bus=_Bus())
+    engine = HeimaEngine(
+        hass=hass,
+        entry=SimpleNamespace(
+            options={
+                "rooms": [
+                    {
+                        "room_id": "room",
+                        "sources": ["binary_sensor.room_presence"],
+                        "on_dwell_s": 600,
+                        "off_dwell_s": 0,
+                        "max_on_s": 3 * 3600,
+                    }
+                ]
+            }
+        ),
+        clock=clock,
+    )
+    engine._build_default_state()
+    engine._compute_snapshot(reason="t0")
+
+    states.set("binary_sensor.room_presence", "on")
+    assert "room" not in engine._compute_snapshot(reason="motion").occupied_rooms
+    clock.advance(engine.next_dwell_recheck_delay_s())
+    assert "room" in engine._compute_snapshot(reason="dwell").occupied_rooms
+
+    clock.advance(3 * 3600)
+    snapshot = engine._compute_snapshot(reason="max_on")
+    assert "room" not in snapshot.occupied_rooms
+    assert engine.diagnostics()["occupancy"]["room_trace"]["room"]["forced_off_by_max_on"] is True
+    assert snapshot.ts == clock.utcnow().isoformat()
+
+
+@pytest.mark.asyncio
+async def test_event_pipeline_rate_limit_follows_the_virtual_clock():
+    clock = VirtualClock()
+    bus = _Bus()
+    pipeline = HeimaEventPipeline(SimpleNamespace(bus=bus, services=_Services()), clock=clock)
+    event = HeimaEvent(type="system.test", key="k", severity="info", title="t", message="m")
+
+    async def emit() -> bool:
+        return await pipeline.async_emit(
+            event, routing=NotificationRouting(), dedup_window_s=0, rate_limit_per_key_s=3600
+        )
+
+    assert await emit() is True
+    clock.advance(3599)
+    assert await emit() is False
+    clock.advance(1)
+    assert await emit() is True
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_due_jobs_on_the_virtual_clock(hass):
+    clock = VirtualClock()
+    fired: list[str] = []
+
+    async def _on_due(job_id: str) -> None:
+        fired.append(job_id)
+
+    scheduler = RuntimeScheduler(hass, entry_id="entry", on_job_due=_on_due, clock=clock)
+    now = clock.monotonic()
+    scheduler.sync_jobs(
+        {
+            "b": ScheduledRuntimeJob("b", "test", "entry", now + 7200, "b"),
+            "a": ScheduledRuntimeJob("a", "test", "entry", now + 60, "a"),
+        }
+    )
+
+    assert await scheduler.async_run_due_jobs() == []
+    clock.advance(8 * 3600)
+    assert await scheduler.async_run_due_jobs() == ["a", "b"]
+    assert fired == ["a", "b"]
+    assert scheduler.diagnostics()["pending_jobs"] == []
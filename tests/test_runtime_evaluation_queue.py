@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.heima.runtime.evaluation_queue import EvaluationQueue
+
+
+@pytest.mark.asyncio
+async def test_evaluation_queue_coalesces_triggers_behind_running_evaluation(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    batches: list[tuple[str, ...]] = []
+
+    async def _run(reasons: tuple[str, ...]) -> None:
+        batches.append(reasons)
+        if len(batches) == 1:
+            started.set()
+            await release.wait()
+
+    queue = EvaluationQueue(hass, run=_run)
+
+    queue.request("state_changed:binary_sensor.a")
+    await started.wait()
+
+    queue.request("state_changed:binary_sensor.b")
+    queue.request("scheduler:occupancy:dwell:studio")
+    queue.request("state_changed:binary_sensor.b")
+    assert queue.diagnostics()["running"] is True
+    assert queue.diagnostics()["pending_reasons"] == [
+        "state_changed:binary_sensor.b",
+        "scheduler:occupancy:dwell:studio",
+    ]
+
+    release.set()
+    await hass.async_block_till_done()
+
+    assert batches == [
+        ("state_changed:binary_sensor.a",),
+        ("state_changed:binary_sensor.b", "scheduler:occupancy:dwell:studio"),
+    ]
+    stats = queue.diagnostics()["stats"]
+    assert stats["requested"] == 4
+    assert stats["coalesced"] == 2
+    assert stats["evaluations"] == 2
+    assert stats["max_batch_size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_evaluation_queue_async_request_waits_for_covering_batch(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    batches: list[tuple[str, ...]] = []
+
+    async def _run(reasons: tuple[str, ...]) -> None:
+        batches.append(reasons)
+
+    queue = EvaluationQueue(hass, run=_run, debounce_s=0.05)
+
+    await asyncio.gather(
+        queue.async_request("service:command:recompute_now"),
+        queue.async_request("state_changed:binary_sensor.a"),
+    )
+
+    assert batches == [("service:command:recompute_now", "state_changed:binary_sensor.a")]
+
+
+@pytest.mark.asyncio
+async def test_evaluation_queue_propagates_failure_to_waiters_only(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    async def _run(reasons: tuple[str, ...]) -> None:
+        raise RuntimeError("boom")
+
+    queue = EvaluationQueue(hass, run=_run)
+
+    with pytest.raises(RuntimeError):
+        await queue.async_request("test:awaited")
+
+    queue.request("test:fire_and_forget")
+    await hass.async_block_till_done()
+
+    assert queue.diagnostics()["stats"]["failures"] == 2
+    assert queue.diagnostics()["running"] is False
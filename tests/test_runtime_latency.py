@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.heima.runtime.engine import HeimaEngine
+from custom_components.heima.runtime.latency import (
+    EVALUATION_STAGES,
+    EvaluationLatency,
+    RollingHistogram,
+    StageClock,
+    merge_reasons,
+    reason_prefix,
+)
+
+
+class _FakeStates:
+    def get(self, entity_id: str):
+        return SimpleNamespace(state="off")
+
+
+class _FakeServices:
+    def has_service(self, domain, service):
+        return False
+
+    async def async_call(self, domain, service, data, blocking=False):
+        return None
+
+
+class _FakeBus:
+    def async_fire(self, event_type, data):
+        return None
+
+
+def test_rolling_histogram_percentiles_use_last_window_samples():
+    histogram = RollingHistogram(window=100)
+    for value in range(1, 201):
+        histogram.add(float(value))
+
+    result = histogram.percentiles()
+    assert result["count"] == 200
+    assert result["p50"] == 150.0
+    assert result["p95"] == 195.0
+    assert result["p99"] == 199.0
+    assert result["max"] == 200.0
+    assert RollingHistogram().percentiles()["p50"] is None
+
+
+def test_stage_clock_accumulates_repeated_stages_and_groups_reasons():
+    ticks = iter([0.0, 0.001, 0.003, 0.006])
+    clock = StageClock(clock=lambda: next(ticks))
+    clock.lap("people")
+    clock.lap("events")
+    clock.lap("people")
+
+    assert clock.stages == pytest.approx({"people": 4.0, "events": 2.0})
+    assert clock.total_ms() == pytest.approx(6.0)
+
+    latency = EvaluationLatency()
+    latency.record("state_changed:binary_sensor.x", clock)
+    diag = latency.diagnostics()
+    assert diag["reasons"]["state_changed"]["people"]["count"] == 1
+    assert diag["stages"]["total"]["p50"] == pytest.approx(6.0)
+    assert reason_prefix("initialize") == "other"
+    assert reason_prefix("service:recompute_now") == "service"
+    merged = merge_reasons(("state_changed:binary_sensor.x", "service:recompute_now", "state_changed:binary_sensor.x"))
+    assert merged == "state_changed:binary_sensor.x + service:recompute_now"
+    assert reason_prefix(merged) == "service+state_changed"
+
+
+@pytest.mark.asyncio
+async def test_engine_records_stage_latency_and_updates_optional_sensor():
+    hass = SimpleNamespace(states=_FakeStates(), services=_FakeServices(), bus=_FakeBus())
+    engine = HeimaEngine(
+        hass=hass,
+        entry=SimpleNamespace(
+            options={
+                "engine_latency_sensor": True,
+                "rooms": [{"room_id": "studio", "sources": ["binary_sensor.studio"]}],
+            }
+        ),
+    )
+    engine._build_default_state()
+    await engine.async_evaluate("scheduler:occupancy:dwell:studio")
+
+    latency = engine.diagnostics()["latency"]
+    assert set(latency["last"]["stages_ms"]) == set(EVALUATION_STAGES)
+    assert latency["reasons"]["scheduler"]["total"]["count"] == 1
+    assert engine.state.get_sensor("heima_engine_latency") is not None
+    assert engine.state.get_sensor_attributes("heima_engine_latency")["count"] == 1
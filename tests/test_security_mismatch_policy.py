@@ -4,6 +4,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from custom_components.heima.runtime.clock import VirtualClock
 from custom_components.heima.runtime.engine import HeimaEngine
 
 
@@ -32,16 +33,21 @@ class _FakeBus:
 
 
 class _FakeServices:
-    def async_services(self):
-        return {"notify": {}}
+    def has_service(self, domain, service):
+        return False
 
     async def async_call(self, domain, service, data, blocking=False):
         return None
 
 
-def _engine(options: dict, state_values: dict[str, str] | None = None) -> HeimaEngine:
+def _engine(
+    options: dict,
+    state_values: dict[str, str] | None = None,
+    *,
+    clock: VirtualClock | None = None,
+) -> HeimaEngine:
     hass = SimpleNamespace(states=_FakeStates(state_values), bus=_FakeBus(), services=_FakeServices())
-    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=options))
+    engine = HeimaEngine(hass=hass, entry=SimpleNamespace(options=options), clock=clock or VirtualClock())
     engine._build_default_state()
     return engine
 
@@ -77,8 +83,7 @@ def _base_options(notifications: dict[str, object]) -> dict[str, object]:
 
 
 @pytest.mark.asyncio
-async def test_security_mismatch_smart_suppresses_without_corroboration(monkeypatch):
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: 100.0)
+async def test_security_mismatch_smart_suppresses_without_corroboration():
     engine = _engine(
         _base_options(
             {
@@ -104,9 +109,8 @@ async def test_security_mismatch_smart_suppresses_without_corroboration(monkeypa
 
 
 @pytest.mark.asyncio
-async def test_security_mismatch_smart_requires_persistence_with_corroboration(monkeypatch):
-    current_t = 100.0
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: current_t)
+async def test_security_mismatch_smart_requires_persistence_with_corroboration():
+    clock = VirtualClock()
     engine = _engine(
         _base_options(
             {
@@ -119,6 +123,7 @@ async def test_security_mismatch_smart_requires_persistence_with_corroboration(m
             "alarm_control_panel.home": "armed_away",
             "binary_sensor.soggiorno_presence": "on",
         },
+        clock=clock,
     )
     engine.state.set_select("heima_person_stefano_override", "force_home")
 
@@ -130,14 +135,13 @@ async def test_security_mismatch_smart_requires_persistence_with_corroboration(m
     delay = engine.next_dwell_recheck_delay_s()
     assert delay is not None and delay > 0
 
-    current_t = 450.0
+    clock.advance(350)
     await _eval(engine)
     assert "security.armed_away_but_home" in _event_types(engine)
 
 
 @pytest.mark.asyncio
-async def test_security_mismatch_strict_emits_immediately_without_corroboration(monkeypatch):
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: 100.0)
+async def test_security_mismatch_strict_emits_immediately_without_corroboration():
     engine = _engine(
         _base_options(
             {
@@ -159,8 +163,7 @@ async def test_security_mismatch_strict_emits_immediately_without_corroboration(
 
 
 @pytest.mark.asyncio
-async def test_security_mismatch_uses_normalized_custom_armed_away_mapping(monkeypatch):
-    monkeypatch.setattr("custom_components.heima.runtime.engine.time.monotonic", lambda: 100.0)
+async def test_security_mismatch_uses_normalized_custom_armed_away_mapping():
     options = _base_options(
         {
             "enabled_event_categories": ["security", "people"],
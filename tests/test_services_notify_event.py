@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from types import SimpleNamespace
 
 import pytest
 
-from custom_components.heima.const import DOMAIN, SERVICE_COMMAND, SERVICE_SET_MODE
+from custom_components.heima.const import DOMAIN, SERVICE_COMMAND, SERVICE_QUERY_HISTORY, SERVICE_SET_MODE
 from custom_components.heima.runtime.engine import HeimaEngine
+from custom_components.heima.runtime.latency import merge_reasons
 from custom_components.heima.services import async_register_services
 
 
@@ -25,6 +27,11 @@ class _FakeStates:
         return _FakeStateObj(value)
 
 
+class _FakeHass(SimpleNamespace):
+    def async_create_background_task(self, target, name, eager_start=True):
+        return asyncio.get_running_loop().create_task(target, name=name)
+
+
 class _FakeBus:
     def __init__(self):
         self.events: list[tuple[str, dict]] = []
@@ -37,22 +44,19 @@ class _FakeBus:
 class _FakeServicesRegistry:
     def __init__(self):
         self._handlers: dict[tuple[str, str], object] = {}
+        self.schemas: dict[tuple[str, str], object] = {}
         self.calls: list[tuple[str, str, dict, bool]] = []
 
-    def async_register(self, domain, service, handler, schema=None):
+    def async_register(self, domain, service, handler, schema=None, supports_response=None):
         self._handlers[(domain, service)] = handler
+        self.schemas[(domain, service)] = schema
 
     async def async_call(self, domain, service, data, blocking=False):
         self.calls.append((domain, service, dict(data), blocking))
         return None
 
-    def async_services(self):
-        return {
-            "notify": {
-                "mobile_app_test": object(),
-                "mobile_app_alias_test": object(),
-            }
-        }
+    def has_service(self, domain, service):
+        return domain == "notify" and service in {"mobile_app_test", "mobile_app_alias_test"}
 
     def handler(self, domain, service):
         return self._handlers[(domain, service)]
@@ -105,7 +109,7 @@ class _FakeCoordinator:
 @pytest.mark.asyncio
 async def test_heima_command_notify_event_uses_pipeline_and_updates_sensors(monkeypatch):
     services = _FakeServicesRegistry()
-    hass = SimpleNamespace(
+    hass = _FakeHass(
         data={DOMAIN: {}},
         services=services,
         bus=_FakeBus(),
@@ -152,6 +156,8 @@ async def test_heima_command_notify_event_uses_pipeline_and_updates_sensors(monk
         )
     )
 
+    await engine.async_drain_notifications()
+
     # Event bus fired through pipeline
     assert hass.bus.events
     assert hass.bus.events[-1][0] == "heima_event"
@@ -178,7 +184,7 @@ async def test_heima_command_notify_event_uses_pipeline_and_updates_sensors(monk
 @pytest.mark.asyncio
 async def test_heima_set_mode_sets_and_clears_final_house_state_override(monkeypatch):
     services = _FakeServicesRegistry()
-    hass = SimpleNamespace(
+    hass = _FakeHass(
         data={DOMAIN: {}},
         services=services,
         bus=_FakeBus(),
@@ -217,3 +223,61 @@ async def test_heima_set_mode_sets_and_clears_final_house_state_override(monkeyp
         if event_type == "heima_event" and payload["type"] == "system.house_state_override_changed"
     ]
     assert override_events[-1]["context"]["action"] == "clear"
+
+
+@pytest.mark.asyncio
+async def test_heima_query_history_returns_filtered_snapshot_deltas(monkeypatch):
+    services = _FakeServicesRegistry()
+    states = _FakeStates()
+    hass = SimpleNamespace(data={DOMAIN: {}}, services=services, bus=_FakeBus(), states=states)
+    entry = SimpleNamespace(
+        entry_id="entry1",
+        options={
+            "rooms": [
+                {"room_id": room_id, "sources": [f"binary_sensor.{room_id}"], "on_dwell_s": 0, "off_dwell_s": 0}
+                for room_id in ("kitchen", "study")
+            ]
+        },
+    )
+    engine = HeimaEngine(hass=hass, entry=entry)
+    engine._build_default_state()
+    coordinator = _FakeCoordinator(engine)
+
+    await async_register_services(hass)
+    monkeypatch.setattr(
+        "custom_components.heima.services._coordinators_for_target",
+        lambda _hass, _target: [coordinator],
+    )
+
+    await engine.async_evaluate(reason="initialize")
+    states._values["binary_sensor.kitchen"] = "on"
+    await engine.async_evaluate(reason="state_changed:binary_sensor.kitchen")
+    states._values["binary_sensor.study"] = "on"
+    await engine.async_evaluate(reason="state_changed:binary_sensor.study")
+    # A coalesced batch: the service reason is not the first one merged.
+    await engine.async_evaluate(reason=merge_reasons(("state_changed:sensor.outdoor", "service:recompute_now")))
+    states._values["binary_sensor.kitchen"] = "off"
+    await engine.async_evaluate(reason="state_changed:binary_sensor.kitchen")
+
+    handler = services.handler(DOMAIN, SERVICE_QUERY_HISTORY)
+    schema = services.schemas[(DOMAIN, SERVICE_QUERY_HISTORY)]
+    response = await handler(SimpleNamespace(data=schema({"room": "kitchen"})))
+    (result,) = response["results"]
+    assert result["entry_id"] == "entry1"
+    assert result["current"]["occupied_rooms"] == ["study"]
+    assert [(item["rooms_occupied"], item["rooms_vacated"]) for item in result["entries"]] == [
+        (["kitchen"], []),
+        ([], ["kitchen"]),
+    ]
+
+    response = await handler(SimpleNamespace(data=schema({"reason": "service:"})))
+    (entry_delta,) = response["results"][0]["entries"]
+    assert entry_delta["house_state"] is None
+    assert entry_delta["rooms_occupied"] == entry_delta["rooms_vacated"] == []
+
+    response = await handler(SimpleNamespace(data=schema({"changed_only": True, "limit": 2})))
+    assert [item["reason"] for item in response["results"][0]["entries"]] == [
+        "state_changed:binary_sensor.study",
+        "state_changed:binary_sensor.kitchen",
+    ]
+    assert engine.diagnostics()["history"]["size"] == 5
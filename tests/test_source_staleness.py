@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.heima.runtime.clock import VirtualClock
+from custom_components.heima.runtime.engine import HeimaEngine
+from custom_components.heima.runtime.normalization import InputNormalizer
+
+
+class _States:
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._values: dict[str, SimpleNamespace] = {}
+
+    def get(self, entity_id: str):
+        return self._values.get(entity_id)
+
+    def set(self, entity_id: str, value: str, *, age_s: float = 0) -> None:
+        # Like Home Assistant: reporting the same state again only moves last_reported.
+        now = self._clock.utcnow() - timedelta(seconds=age_s)
+        current = self._values.get(entity_id)
+        if current is not None and current.state == value:
+            current.last_reported = now
+            return
+        self._values[entity_id] = SimpleNamespace(state=value, last_updated=now, last_reported=now)
+
+
+class _Services:
+    def has_service(self, domain, service):
+        return False
+
+    async def async_call(self, domain, service, data, blocking=False):
+        return None
+
+
+class _Bus:
+    def async_fire(self, event_type, data):
+        return None
+
+
+def test_presence_observation_turns_stale_from_last_reported():
+    clock = VirtualClock()
+    states = _States(clock)
+    states.set("binary_sensor.motion", "on", age_s=50)
+    normalizer = InputNormalizer(SimpleNamespace(states=states), clock=clock)
+
+    assert normalizer.presence("binary_sensor.motion", stale_after_s=60).stale is False
+    assert normalizer.presence("binary_sensor.motion").stale is False
+    assert normalizer.seconds_until_stale("binary_sensor.motion", 60) == 10
+
+    clock.advance(10)
+    assert normalizer.presence("binary_sensor.motion", stale_after_s=60).stale is True
+    assert normalizer.seconds_until_stale("binary_sensor.motion", 60) is None
+
+    # A healthy sensor re-reporting the same state keeps last_updated but is fresh again.
+    states.set("binary_sensor.motion", "on")
+    assert states.get("binary_sensor.motion").last_updated == clock.utcnow() - timedelta(seconds=60)
+    assert normalizer.presence("binary_sensor.motion", stale_after_s=60).stale is False
+    assert normalizer.seconds_until_stale("binary_sensor.motion", 60) == 60
+
+
+def test_room_with_stuck_source_goes_off_when_the_source_turns_stale():
+    clock = VirtualClock()
+    states = _States(clock)
+    states.set("binary_sensor.dead_motion", "on")
+    states.set("binary_sensor.door", "off", age_s=30)
+    engine = HeimaEngine(
+        hass=SimpleNamespace(states=states, services=_Services(), bus=_Bus()),
+        entry=SimpleNamespace(
+            options={
+                "rooms": [
+                    {
+                        "room_id": "studio",
+                        "sources": ["binary_sensor.dead_motion", "binary_sensor.door"],
+                        "logic": "any_of",
+                        "on_dwell_s": 0,
+                        "off_dwell_s": 0,
+                        "source_stale_s": 3600,
+                    }
+                ]
+            }
+        ),
+        clock=clock,
+    )
+    engine._build_default_state()
+
+    assert "studio" in engine._compute_snapshot(reason="t0").occupied_rooms
+    jobs = engine.scheduled_runtime_jobs()
+    assert jobs["occupancy:stale:studio"].due_monotonic == clock.monotonic() + 3570
+
+    # The door turns stale first: the room stays on and the timer moves to the motion sensor.
+    clock.advance(3570)
+    assert "studio" in engine._compute_snapshot(reason="scheduler:occupancy:stale:studio").occupied_rooms
+    assert engine.next_dwell_recheck_delay_s() == 30
+
+    clock.advance(30)
+    snapshot = engine._compute_snapshot(reason="scheduler:occupancy:stale:studio")
+    assert "studio" not in snapshot.occupied_rooms
+    trace = engine.diagnostics()["occupancy"]["room_trace"]["studio"]
+    assert trace["fused_observation"]["reason"] == "all_inputs_stale"
+    assert "occupancy:stale:studio" not in engine.scheduled_runtime_jobs()
+
+
+@pytest.mark.asyncio
+async def test_same_state_report_revives_a_stale_room_despite_fingerprint():
+    clock = VirtualClock()
+    states = _States(clock)
+    states.set("binary_sensor.motion", "on")
+    engine = HeimaEngine(
+        hass=SimpleNamespace(states=states, services=_Services(), bus=_Bus()),
+        entry=SimpleNamespace(
+            options={
+                "rooms": [
+                    {
+                        "room_id": "studio",
+                        "sources": ["binary_sensor.motion"],
+                        "logic": "any_of",
+                        "on_dwell_s": 0,
+                        "off_dwell_s": 0,
+                        "source_stale_s": 60,
+                    }
+                ]
+            }
+        ),
+        clock=clock,
+    )
+    engine._build_default_state()
+
+    await engine.async_evaluate("initialize")
+    assert "studio" in engine.snapshot.occupied_rooms
+
+    clock.advance(61)
+    await engine.async_evaluate("scheduler:occupancy:stale:studio", skip_if_unchanged=True)
+    assert "studio" not in engine.snapshot.occupied_rooms
+
+    # Same raw state and last_updated, new last_reported: the fingerprint must not report a hit.
+    states.set("binary_sensor.motion", "on")
+    await engine.async_evaluate("state_reported:binary_sensor.motion", skip_if_unchanged=True)
+    assert engine.diagnostics()["fingerprint"]["last_result"] == "miss:inputs_changed"
+    assert "studio" in engine.snapshot.occupied_rooms
+    trace = engine.diagnostics()["occupancy"]["room_trace"]["studio"]
+    assert trace["fused_observation"]["state"] == "on"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.replay import replay_file, replay_records
+from custom_components.heima.const import DOMAIN
+from custom_components.heima.runtime.traffic_recorder import read_traffic_log
+
+
+def _options() -> dict:
+    return {
+        "rooms": [
+            {
+                "room_id": "studio",
+                "occupancy_mode": "derived",
+                "sources": ["binary_sensor.studio_presence"],
+                "logic": "any_of",
+                "on_dwell_s": 0,
+                "off_dwell_s": 0,
+            }
+        ],
+        "people_named": [
+            {
+                "slug": "alex",
+                "presence_method": "quorum",
+                "sources": ["binary_sensor.alex_phone"],
+                "required": 1,
+            }
+        ],
+    }
+
+
+def _read_log(path: str) -> tuple[dict, list[list]]:
+    header, records = read_traffic_log(path)
+    return header, list(records)
+
+
+@pytest.mark.asyncio
+async def test_recorded_traffic_replays_to_the_same_decisions(
+    hass: HomeAssistant,
+    enable_custom_integrations,
+):
+    entry = MockConfigEntry(domain=DOMAIN, title="Heima", data={}, options=_options())
+    entry.add_to_hass(hass)
+    hass.states.async_set("binary_sensor.studio_presence", "off")
+    hass.states.async_set("binary_sensor.alex_phone", "off")
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    await hass.services.async_call(DOMAIN, "command", {"command": "start_recording"}, blocking=True)
+    assert coordinator.recording
+    path = coordinator.recording_diagnostics()["path"]
+
+    hass.states.async_set("binary_sensor.alex_phone", "on")
+    await hass.async_block_till_done()
+    hass.states.async_set("binary_sensor.studio_presence", "on")
+    await hass.async_block_till_done()
+    await hass.services.async_call(DOMAIN, "set_mode", {"mode": "guest", "state": True}, blocking=True)
+    await hass.async_block_till_done()
+    await hass.services.async_call(DOMAIN, "command", {"command": "stop_recording"}, blocking=True)
+    assert not coordinator.recording
+
+    header, records = await hass.async_add_executor_job(_read_log, path)
+    assert header["states"]["binary_sensor.alex_phone"] == ["off", None]
+    assert [record[0] for record in records] == ["s", "s", "r"]
+    assert records[2][3]["house_state_override"] == "guest"
+
+    report = await hass.async_add_executor_job(replay_file, path)
+    assert report.state_changes == 2
+    assert report.requests == 1
+    assert report.final_house_state == coordinator.engine.snapshot.house_state == "guest"
+
+
+def test_replay_fires_engine_rechecks_on_the_virtual_clock():
+    options = _options()
+    options["rooms"][0]["on_dwell_s"] = 30
+    header = {
+        "version": 1,
+        "entry_id": "replay",
+        "options": options,
+        "states": {
+            "binary_sensor.studio_presence": ["off", None],
+            "binary_sensor.alex_phone": ["on", None],
+        },
+        "external_inputs": {},
+    }
+    records = [
+        ["s", 10.0, "binary_sensor.studio_presence", "on", None],
+        ["s", 3600.0, "binary_sensor.alex_phone", "on", None],
+    ]
+
+    report = replay_records(header, records)
+
+    assert report.engine_scheduler_firings >= 1
+    assert report.virtual_span_s == pytest.approx(3600.0)
+    assert report.wall_s < 5
+    assert report.as_dict()["decisions"] >= 2